@@ -0,0 +1,274 @@
+"""
+Incrementele, ontdubbelde opslag van herhaalde FlightAware-scrapes.
+
+Elke scrape levert grotendeels dezelfde trackpunten opnieuw op. TrackStore
+hasht elk punt op (FlightNumber, Time, Latitude, Longitude) en bewaart alleen
+punten die nog niet gezien zijn, gesorteerd per vlucht en tijd in parquet.
+Van een groeiend CSV-bestand (zoals 40_Vluchten.csv) wordt alleen het stuk na
+de vorige ingest gelezen.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from adsb_tracks import normaliseer_tracks
+from csv_lader import TRACK_SCHEMA, csv_opties
+from meetpunten import span, tel
+from sensornet_sync import DEFAULT_STORE_DIR
+
+DEFAULT_TRACK_DIR = os.path.join(DEFAULT_STORE_DIR, 'adsb_tracks')
+
+# Na zoveel losse part-bestanden worden ze samengevoegd tot één bestand
+COMPACT_AFTER_PARTS = 20
+# Rijgroepen klein genoeg dat een filter op FlightNumber de rest kan overslaan
+ROW_GROUP_SIZE = 50_000
+# Zoveel bytes vanaf het begin van een bron bepalen of hij opnieuw is geschreven
+VINGERAFDRUK_BYTES = 64 * 1024
+
+SLEUTEL_KOLOMMEN = ['FlightNumber', 'Time', 'Latitude', 'Longitude']
+SORTEER_KOLOMMEN = ['FlightNumber', 'Time']
+
+# Streamlit-sessies draaien in threads van hetzelfde proces
+_ingest_lock = threading.Lock()
+
+
+def punt_hashes(tracks):
+    """64-bit hash per trackpunt over SLEUTEL_KOLOMMEN."""
+    sleutels = pd.DataFrame({
+        'FlightNumber': tracks['FlightNumber'].astype(str).to_numpy(),
+        'Time': tracks['Time'].astype('datetime64[s, UTC]').astype('int64').to_numpy(),
+        'Latitude': tracks['Latitude'].to_numpy(np.float64),
+        'Longitude': tracks['Longitude'].to_numpy(np.float64),
+    })
+    return pd.util.hash_pandas_object(sleutels, index=False).to_numpy(np.uint64)
+
+
+def _vingerafdruk(f, lengte):
+    """sha1 van de eerste 'lengte' bytes van het open bestand 'f'."""
+    f.seek(0)
+    return hashlib.sha1(f.read(lengte)).hexdigest()
+
+
+def _herschreven(f, stat, bron_state):
+    """
+    Of de bron sinds de vorige ingest opnieuw is geschreven in plaats van
+    aangevuld: kleiner geworden, gewijzigd zonder te groeien, of met een ander
+    begin dan bij de vorige ingest.
+    """
+    if stat.st_size < bron_state['offset']:
+        return True
+    if stat.st_mtime_ns == bron_state.get('mtime_ns'):
+        return False
+    if stat.st_size == bron_state['offset']:
+        return True
+    kop = bron_state.get('kop')
+    return kop is not None and _vingerafdruk(f, kop['lengte']) != kop['sha1']
+
+
+class TrackStore:
+    """
+    Ontdubbelde, per vlucht gesorteerde parquet-store van ADS-B trackpunten.
+
+    state.json bewaart per bronbestand tot welke byte het al is ingelezen, met
+    de mtime en een vingerafdruk van het begin om herschrijven te herkennen;
+    hashes.npy bevat de gesorteerde hashes van alle opgeslagen punten.
+    """
+
+    def __init__(self, store_dir=DEFAULT_TRACK_DIR):
+        self.store_dir = store_dir
+        self.state_path = os.path.join(store_dir, 'state.json')
+        self.hashes_path = os.path.join(store_dir, 'hashes.npy')
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return {'sources': {}, 'parts': 0, 'rows': 0}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)  # Atomisch, zodat een crash de state niet corrumpeert
+
+    def _load_hashes(self):
+        if not os.path.exists(self.hashes_path):
+            return np.empty(0, dtype=np.uint64)
+        return np.load(self.hashes_path)
+
+    def _save_hashes(self, hashes):
+        tmp_path = self.hashes_path + '.tmp.npy'
+        np.save(tmp_path, hashes)
+        os.replace(tmp_path, self.hashes_path)
+
+    def _part_paths(self):
+        if not os.path.isdir(self.store_dir):
+            return []
+        paths = sorted(
+            os.path.join(self.store_dir, name)
+            for name in os.listdir(self.store_dir)
+            if name.startswith('part-') and name.endswith('.parquet')
+        )
+        # Na een compactie die na het vervangen is onderbroken bevat het nieuwe bestand de oude parts al
+        compactie = self.load_state().get('compactie')
+        if compactie and os.path.exists(os.path.join(self.store_dir, compactie['doel'])):
+            paths = [path for path in paths if os.path.basename(path) not in compactie['vervangen']]
+        return paths
+
+    def _rond_compactie_af(self):
+        """Ruimt de resten op van een onderbroken compactie (zie compact)."""
+        state = self.load_state()
+        compactie = state.pop('compactie', None)
+        if compactie is None:
+            return
+        doel = os.path.join(self.store_dir, compactie['doel'])
+        if os.path.exists(doel):
+            resten = [os.path.join(self.store_dir, naam) for naam in compactie['vervangen']]
+        else:
+            resten = [doel + '.tmp']
+        for pad in resten:
+            if os.path.exists(pad):
+                os.remove(pad)
+        self._save_state(state)
+
+    # ------------------------------------------------------------------
+    # Lezen en schrijven
+    # ------------------------------------------------------------------
+    @span('tracks_laden')
+    def load(self, flights=None, columns=None, filters=None):
+        """
+        Leest de opgeslagen trackpunten in, gesorteerd op vlucht en tijd, eventueel
+        alleen voor 'flights' en de rijen die aan 'filters' voldoen (zie pd.read_parquet).
+        """
+        paths = self._part_paths()
+        if not paths:
+            return pd.DataFrame(columns=list(columns or SLEUTEL_KOLOMMEN))
+        filters = list(filters or [])
+        if flights is not None:
+            filters.append(('FlightNumber', 'in', list(flights)))
+        filters = filters or None
+        frames = [pd.read_parquet(path, columns=columns, filters=filters) for path in paths]
+        tracks = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        if len(frames) > 1:
+            # Punten uit verschillende parts kunnen door elkaar liggen
+            tracks = tracks.sort_values(SORTEER_KOLOMMEN, kind='stable', ignore_index=True)
+        for kolom in tracks.columns:
+            if tracks[kolom].dtype == object or pd.api.types.is_string_dtype(tracks[kolom]):
+                tracks[kolom] = tracks[kolom].astype('category')
+        return tracks
+
+    def append(self, tracks):
+        """
+        Voegt genormaliseerde trackpunten toe (zie adsb_tracks.normaliseer_tracks).
+        Punten die al in de store staan of dubbel in 'tracks' voorkomen worden
+        overgeslagen. Geeft het aantal nieuw opgeslagen punten terug.
+        """
+        tracks = tracks[tracks['Time'].notna() & tracks['FlightNumber'].notna()]
+        if tracks.empty:
+            return 0
+        hashes = punt_hashes(tracks)
+        _, eerste = np.unique(hashes, return_index=True)
+        eerste.sort()
+        bekend = self._load_hashes()
+        eerste = eerste[~np.isin(hashes[eerste], bekend, assume_unique=True)]
+        if len(eerste) == 0:
+            return 0
+
+        nieuw = tracks.iloc[eerste].sort_values(SORTEER_KOLOMMEN, kind='stable')
+        state = self.load_state()
+        os.makedirs(self.store_dir, exist_ok=True)
+        part_path = os.path.join(self.store_dir, f'part-{state["parts"] + 1:06d}.parquet')
+        nieuw.to_parquet(part_path, index=False, row_group_size=ROW_GROUP_SIZE)
+        self._save_hashes(np.union1d(bekend, hashes[eerste]))
+        state.update(parts=state['parts'] + 1, rows=state['rows'] + len(nieuw))
+        self._save_state(state)
+
+        if len(self._part_paths()) > COMPACT_AFTER_PARTS:
+            self.compact()
+        return len(nieuw)
+
+    def compact(self):
+        """
+        Voegt alle part-bestanden samen tot één bestand, gesorteerd op vlucht en tijd.
+
+        Het nieuwe bestand wordt onder een tijdelijke naam geschreven. Daarna
+        komt in de state welke parts het vervangt, en pas dan wordt het op zijn
+        plaats gezet en worden de oude parts verwijderd. Een crash laat zo
+        nooit een half bestand of dubbele rijen achter.
+        """
+        self._rond_compactie_af()
+        paths = self._part_paths()
+        if len(paths) <= 1:
+            return
+        data = self.load()
+        state = self.load_state()
+        doel = f'part-{state["parts"] + 1:06d}.parquet'
+        target = os.path.join(self.store_dir, doel)
+        # Zonder .parquet-extensie, zodat load() een half geschreven bestand nooit meeleest
+        tmp_path = target + '.tmp'
+        data.to_parquet(tmp_path, index=False, row_group_size=ROW_GROUP_SIZE)
+        state.update(parts=state['parts'] + 1,
+                     compactie={'doel': doel, 'vervangen': [os.path.basename(path) for path in paths]})
+        self._save_state(state)
+        os.replace(tmp_path, target)
+        self._rond_compactie_af()
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+    @span('tracks_ingest')
+    def ingest(self, csv_path):
+        """
+        Leest de regels van 'csv_path' die na de vorige ingest zijn bijgekomen en
+        voegt de nieuwe punten toe. Is het bestand opnieuw geschreven (kleiner
+        geworden, gewijzigd zonder te groeien of met een ander begin), dan wordt
+        het helemaal gelezen; dubbele punten vallen dan alsnog weg. Geeft het aantal nieuw opgeslagen punten terug.
+        """
+        with _ingest_lock:
+            return self._ingest(os.path.abspath(csv_path))
+
+    def _ingest(self, bron):
+        state = self.load_state()
+        bron_state = state['sources'].get(bron, {'offset': 0, 'columns': None})
+        stat = os.stat(bron)
+
+        with open(bron, 'rb') as f:
+            if bron_state['offset'] and _herschreven(f, stat, bron_state):
+                tel('trackbronnen_herschreven')
+                bron_state = {'offset': 0, 'columns': None}
+            if stat.st_size == bron_state['offset']:
+                return 0
+            f.seek(bron_state['offset'])
+            nieuw = f.read()
+            # Alleen volledige regels; een half geschreven laatste regel komt de volgende keer mee
+            einde = nieuw.rfind(b'\n') + 1
+            if einde == 0:
+                return 0
+            lengte = min(VINGERAFDRUK_BYTES, bron_state['offset'] + einde)
+            kop = {'lengte': lengte, 'sha1': _vingerafdruk(f, lengte)}
+        if bron_state['columns'] is None:
+            ruw = pd.read_csv(io.BytesIO(nieuw[:einde]), **csv_opties(TRACK_SCHEMA, projectie=False))
+            bron_state['columns'] = list(ruw.columns)
+        else:
+            ruw = pd.read_csv(io.BytesIO(nieuw[:einde]), header=None, names=bron_state['columns'],
+                              **csv_opties(TRACK_SCHEMA, projectie=False))
+
+        toegevoegd = self.append(normaliseer_tracks(ruw))
+        tel('trackpunten_gelezen', len(ruw))
+        tel('trackpunten_toegevoegd', toegevoegd)
+
+        # append() kan de state hebben aangepast, dus opnieuw laden
+        state = self.load_state()
+        bron_state.update(offset=bron_state['offset'] + einde, mtime_ns=stat.st_mtime_ns, kop=kop)
+        state['sources'][bron] = bron_state
+        self._save_state(state)
+        return toegevoegd
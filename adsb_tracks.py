@@ -0,0 +1,98 @@
+"""
+Normaliseert FlightAware ADS-B scrapes (zoals 40_Vluchten.csv) naar typed kolommen.
+
+'Time' staat in de scrape als "Mon 07:13:52 AM" in de tijdzone van de bron
+(Etc/GMT+3), zonder datum. De datum wordt teruggerekend vanaf 'ScrapeTime':
+het punt ligt op de laatste dag met die weekdag op of vóór het scrape-moment.
+Het resultaat heeft 'Time' en 'ScrapeTime' als UTC-datetimes, koers,
+snelheid, hoogte en klimsnelheid als float32 en de tekstkolommen als
+categorieën.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from csv_lader import TRACK_SCHEMA, lees_csv
+from meetpunten import span, tel
+
+# Tijdzone waarin FlightAware de 'Time'-kolom toont
+BRON_TIJDZONE = 'Etc/GMT+3'
+# Tijdzone van de machine die de scrapes maakt ('ScrapeTime')
+SCRAPE_TIJDZONE = 'Europe/Amsterdam'
+
+WEEKDAG_AFKORTINGEN = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+NUMERIEKE_KOLOMMEN = ['Course', 'Speed_kts', 'Speed_mph', 'Altitude_feet', 'ClimbRate']
+CATEGORISCHE_KOLOMMEN = ['ReportingFacility', 'FlightType', 'FlightNumber']
+
+_cache = {}  # absoluut pad -> ((mtime, grootte), DataFrame)
+_cache_lock = threading.Lock()
+
+
+def _getal(waarden):
+    """'3,047' -> 3047.0, '→ 95°' -> 95.0, ontbrekend -> NaN (als float32)."""
+    if pd.api.types.is_numeric_dtype(waarden):
+        return waarden.astype(np.float32)
+    getallen = waarden.astype('str').str.extract(r'(-?[\d,]+(?:\.\d+)?)', expand=False).str.replace(',', '', regex=False)
+    return pd.to_numeric(getallen, errors='coerce').astype(np.float32)
+
+
+def absolute_tijden(tijd, scrape_tijd, bron_tijdzone=BRON_TIJDZONE, scrape_tijdzone=SCRAPE_TIJDZONE):
+    """
+    Zet 'Time'-waarden als "Mon 07:13:52 AM" om naar UTC-datetimes, met de datum
+    afgeleid van de bijbehorende 'ScrapeTime'. Onleesbare waarden worden NaT.
+    """
+    tijd = pd.Series(tijd).astype('str')
+    scrape = pd.to_datetime(pd.Series(scrape_tijd, index=tijd.index), errors='coerce')
+    if scrape.dt.tz is None:
+        scrape = scrape.dt.tz_localize(scrape_tijdzone, ambiguous='NaT', nonexistent='NaT')
+    # Het scrape-moment als lokale tijd van de bron, zonder tijdzone
+    scrape_lokaal = scrape.dt.tz_convert(bron_tijdzone).dt.tz_localize(None)
+
+    weekdag = pd.Categorical(tijd.str[:3], categories=WEEKDAG_AFKORTINGEN).codes
+    klok = pd.to_datetime(tijd.str[4:].str.strip(), format='%I:%M:%S %p', errors='coerce')
+    tijd_van_dag = klok - klok.dt.normalize()
+
+    dagen_terug = (scrape_lokaal.dt.weekday.to_numpy() - weekdag) % 7
+    lokaal = scrape_lokaal.dt.normalize() - pd.to_timedelta(dagen_terug, unit='D') + tijd_van_dag
+    # Zelfde weekdag maar later op de dag dan de scrape: dat was een week eerder
+    lokaal = lokaal.where(~(lokaal > scrape_lokaal), lokaal - pd.Timedelta(days=7))
+    lokaal = lokaal.where(weekdag >= 0)
+    return lokaal.dt.tz_localize(bron_tijdzone).dt.tz_convert('UTC')
+
+
+def normaliseer_tracks(ruw, bron_tijdzone=BRON_TIJDZONE, scrape_tijdzone=SCRAPE_TIJDZONE):
+    """Normaliseert een ingelezen scrape. De ruwe DataFrame blijft ongewijzigd."""
+    tracks = ruw.copy()
+    tracks['Time'] = absolute_tijden(ruw['Time'], ruw['ScrapeTime'], bron_tijdzone, scrape_tijdzone)
+    scrape = pd.to_datetime(ruw['ScrapeTime'], errors='coerce')
+    tracks['ScrapeTime'] = scrape.dt.tz_localize(scrape_tijdzone, ambiguous='NaT', nonexistent='NaT').dt.tz_convert('UTC')
+    for kolom in NUMERIEKE_KOLOMMEN:
+        if kolom in tracks.columns:
+            tracks[kolom] = _getal(tracks[kolom])
+    for kolom in CATEGORISCHE_KOLOMMEN:
+        if kolom in tracks.columns:
+            tracks[kolom] = tracks[kolom].astype('category')
+    return tracks
+
+
+def laad_tracks(pad, bron_tijdzone=BRON_TIJDZONE, scrape_tijdzone=SCRAPE_TIJDZONE):
+    """
+    Leest en normaliseert een scrape-CSV. Het resultaat wordt per proces bewaard
+    tot het bestand verandert (mtime of grootte), en wordt als ondiepe kopie
+    teruggegeven.
+    """
+    pad = os.path.abspath(pad)
+    stat = os.stat(pad)
+    sleutel = (stat.st_mtime_ns, stat.st_size, bron_tijdzone, scrape_tijdzone)
+    with _cache_lock:
+        entry = _cache.get(pad)
+        if entry is None or entry[0] != sleutel:
+            tel('tracks_cache_misses')
+            with span('tracks_normaliseren'):
+                entry = (sleutel, normaliseer_tracks(lees_csv(pad, TRACK_SCHEMA), bron_tijdzone, scrape_tijdzone))
+            _cache[pad] = entry
+        else:
+            tel('tracks_cache_hits')
+        return entry[1].copy(deep=False)
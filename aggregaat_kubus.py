@@ -0,0 +1,194 @@
+"""
+Voorgeaggregeerde kubus over de events, zodat grafieken niet elke rerun
+opnieuw over alle ruwe rijen groeperen.
+
+Per cel (date, hour, weekday, location_short, type, manufacturer) staan
+count, sum, min, max en de som van kwadraten van lasmax_dB en SEL_dB. Dat is
+genoeg om gemiddelde, min, max en standaardafwijking voor elke combinatie van
+dimensies op te rollen, en nieuwe events kunnen erbij worden opgeteld zonder
+de kubus opnieuw op te bouwen.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from compacte_tabellen import tijden
+from meetpunten import span, tel
+from sensornet_sync import DEFAULT_STORE_DIR
+from vliegtuig_types import koppel_type_dimensie
+
+KUBUS_DIMENSIES = ['date', 'hour', 'weekday', 'location_short', 'type', 'manufacturer']
+METINGEN = ['lasmax_dB', 'SEL_dB']
+WEEKDAGEN = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+_kubussen = {}
+_kubussen_lock = threading.Lock()
+
+
+def na_high_water_mark(events, tot_tijd, tot_id):
+    """
+    Geeft de events na de high-water mark (tot_tijd, tot_id) terug, samen met de
+    nieuwe mark. Zonder mark (None) tellen alle events als nieuw.
+    """
+    if 'time' not in events.columns or events.empty:
+        return events.iloc[:0], (tot_tijd, tot_id)
+    tijd = tijden(events)
+    ids = events['id'] if 'id' in events.columns else pd.Series(0, index=events.index)
+    if tot_tijd is not None:
+        nieuw = (tijd > tot_tijd) | ((tijd == tot_tijd) & (ids > tot_id))
+        events, tijd, ids = events[nieuw], tijd[nieuw], ids[nieuw]
+        if events.empty:
+            return events, (tot_tijd, tot_id)
+    # Als datetime64 sorteren; to_numpy() zonder dtype geeft bij tijdzones een object-array per Timestamp
+    laatste = np.lexsort((ids.to_numpy(), tijd.to_numpy('datetime64[ns]')))[-1]
+    return events, (tijd.iloc[laatste], ids.iloc[laatste])
+
+
+def _aggregeer(events):
+    """Aggregeert ruwe events tot kubuscellen."""
+    tijd = tijden(events)
+    cellen = pd.DataFrame({
+        'date': tijd.dt.normalize().to_numpy(),
+        'hour': tijd.dt.hour.to_numpy(np.int8),
+        'weekday': tijd.dt.weekday.to_numpy(np.int8),
+    })
+    for kolom in ('location_short', 'type'):
+        waarden = events[kolom] if kolom in events.columns else pd.Series(np.nan, index=events.index)
+        cellen[kolom] = waarden.astype('category').array
+    cellen['manufacturer'] = koppel_type_dimensie(cellen, ['manufacturer'])['manufacturer'].array
+
+    aggregaties = {}
+    for meting in METINGEN:
+        if meting not in events.columns:
+            continue
+        waarden = events[meting].to_numpy(dtype=np.float64)
+        cellen[meting] = waarden
+        cellen[meting + '_kwadraat'] = waarden ** 2
+        aggregaties.update({
+            f'{meting}_count': (meting, 'count'),
+            f'{meting}_sum': (meting, 'sum'),
+            f'{meting}_min': (meting, 'min'),
+            f'{meting}_max': (meting, 'max'),
+            f'{meting}_sumsq': (meting + '_kwadraat', 'sum'),
+        })
+    return cellen.groupby(KUBUS_DIMENSIES, observed=True, dropna=False).agg(**aggregaties).reset_index()
+
+
+def _combineer(cellen):
+    """Telt kubuscellen met dezelfde dimensies bij elkaar op."""
+    samenvoegen = {'count': 'sum', 'sum': 'sum', 'sumsq': 'sum', 'min': 'min', 'max': 'max'}
+    functies = {
+        kolom: samenvoegen[kolom.rsplit('_', 1)[1]]
+        for kolom in cellen.columns if kolom not in KUBUS_DIMENSIES
+    }
+    cellen = cellen.groupby(KUBUS_DIMENSIES, observed=True, dropna=False).agg(functies).reset_index()
+    # pd.concat maakt van categorieën met verschillende waarden gewone kolommen
+    for kolom in ('location_short', 'type', 'manufacturer'):
+        cellen[kolom] = cellen[kolom].astype('category')
+    return cellen
+
+
+def rollup(cellen, dims, meting):
+    """
+    Rolt kubuscellen op naar de gegeven dimensies. Geeft per groep count, mean,
+    min, max en std (steekproef) van 'meting' terug.
+    """
+    groepen = cellen.groupby(dims, observed=True).agg(
+        count=(f'{meting}_count', 'sum'),
+        som=(f'{meting}_sum', 'sum'),
+        sumsq=(f'{meting}_sumsq', 'sum'),
+        min=(f'{meting}_min', 'min'),
+        max=(f'{meting}_max', 'max'),
+    )
+    groepen = groepen[groepen['count'] > 0]
+    n = groepen['count']
+    groepen['mean'] = groepen['som'] / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variantie = (groepen['sumsq'] - n * groepen['mean'] ** 2) / (n - 1)
+    groepen['std'] = np.sqrt(variantie.clip(lower=0))
+    return groepen[['count', 'mean', 'min', 'max', 'std']].reset_index()
+
+
+class AggregaatKubus:
+    """Incrementeel bijgewerkte aggregaatkubus over een eventtabel."""
+
+    def __init__(self, cellen=None, tot_tijd=None, tot_id=None):
+        self.cellen = cellen
+        # High-water mark van de events die al in de kubus zitten
+        self.tot_tijd = tot_tijd
+        self.tot_id = tot_id
+        self._lock = threading.Lock()
+
+    def update(self, events):
+        """Telt nieuwe events op bij de kubus (alleen de nieuwe rijen worden geaggregeerd)."""
+        if events.empty:
+            return
+        nieuw = _aggregeer(events)
+        self.cellen = nieuw if self.cellen is None else _combineer(pd.concat([self.cellen, nieuw], ignore_index=True))
+
+    def bij_werken(self, events):
+        """
+        Werkt de kubus bij met de events die nieuwer zijn dan de high-water mark
+        (zoals de sync-store ze aanlevert: nieuwe events komen er achteraan bij).
+        Veilig om elke rerun opnieuw met het hele frame aan te roepen.
+        """
+        with self._lock:
+            events, mark = na_high_water_mark(events, self.tot_tijd, self.tot_id)
+            if events.empty:
+                tel('kubus_zonder_nieuwe_events')
+                return
+            with span('kubus_bijwerken', rijen=len(events)):
+                self.update(events)
+            tel('kubus_rijen_geaggregeerd', len(events))
+            self.tot_tijd, self.tot_id = mark
+
+    @classmethod
+    def samenvoegen(cls, kubussen):
+        """
+        Voegt kubussen over losse stukken events (bijvoorbeeld per dag) samen tot één
+        kubus, met de hoogste high-water mark. Lege kubussen worden overgeslagen.
+        """
+        kubussen = [kubus for kubus in kubussen if kubus.cellen is not None]
+        if not kubussen:
+            return cls()
+        cellen = _combineer(pd.concat([kubus.cellen for kubus in kubussen], ignore_index=True))
+        laatste = max(kubussen, key=lambda kubus: (kubus.tot_tijd, kubus.tot_id))
+        return cls(cellen, laatste.tot_tijd, laatste.tot_id)
+
+    def rollup(self, dims, meting):
+        return rollup(self.cellen, dims, meting)
+
+    def cellen_met(self, kolommen):
+        """De kubuscellen met extra kolommen uit de typedimensie (bijvoorbeeld 'family' of 'passagiers')."""
+        return koppel_type_dimensie(self.cellen, kolommen)
+
+    def opslaan(self, pad):
+        self.cellen.to_parquet(pad, index=False)
+        with open(pad + '.json', 'w') as f:
+            json.dump({'tot_tijd': str(self.tot_tijd), 'tot_id': int(self.tot_id)}, f)
+
+    @classmethod
+    def laden(cls, pad):
+        if not os.path.exists(pad):
+            return cls()
+        with open(pad + '.json') as f:
+            mark = json.load(f)
+        cellen = pd.read_parquet(pad)
+        # Parquet kent geen seconden en leest 'date' als milliseconden; terug naar de eenheid van _aggregeer
+        cellen['date'] = cellen['date'].astype('datetime64[s]')
+        return cls(cellen, pd.Timestamp(mark['tot_tijd']), mark['tot_id'])
+
+
+def gedeelde_kubus(naam, store_dir=DEFAULT_STORE_DIR):
+    """
+    Geeft een kubus terug die door alle sessies en reruns van dit proces wordt
+    gedeeld. Staat er een vooraf berekende kubus (zie batch_aggregaten.py) in
+    'store_dir', dan begint hij daarmee en worden alleen latere events erbij geteld.
+    """
+    with _kubussen_lock:
+        if naam not in _kubussen:
+            _kubussen[naam] = AggregaatKubus.laden(os.path.join(store_dir, f'kubus-{naam}.parquet'))
+        return _kubussen[naam]
@@ -0,0 +1,341 @@
+"""
+Rekent de aggregaten van het dashboard vooraf uit, zonder Streamlit-sessie,
+over een periode en per dag parallel in aparte processen.
+
+    python batch_aggregaten.py --van 2025-01-01 --tot 2025-04-01 --werkers 8
+
+Elke werker leest alleen de events en trackpunten van zijn eigen (UTC-)dag uit
+de parquet-stores en schrijft naar <uitvoer>/dagen/<datum>/:
+
+    kubus.parquet         kubuscellen van die dag (zie aggregaat_kubus)
+    sel_per_type.npz      SEL_dB-statistieken per vliegtuigtype (zie streaming_stats)
+    koppelingen.parquet   events met het dichtstbijzijnde trackpunt van hun callsign
+    geluidskaart.parquet  SEL_dB van de gekoppelde events per uur en rastercel (zie geluidskaart)
+    blootstelling.parquet energiesommen SELd/SELe/SELn/SELden per meetpunt en dag (zie blootstelling)
+    klaar.json            aantallen; een dag die al volledig in de store stond
+                          wordt bij een volgende run overgeslagen (tenzij --opnieuw)
+
+Daarna worden alle afgeronde dagen in <uitvoer>/dagen samengevoegd, ook die
+van eerdere runs, zodat een run over een deel van de periode (een backfill)
+de andere dagen niet kwijtraakt. De kubus, de SEL-statistieken, de
+geluidskaart en de blootstelling komen in de store te staan als
+kubus-sensornet.parquet, stats-sensornet_SEL_dB.npz,
+geluidskaart-sensornet.parquet en blootstelling-sensornet.parquet, waar het
+dashboard ze bij het opstarten laadt (gedeelde_kubus, gedeelde_statistieken,
+gedeelde_geluidskaart en gedeelde_blootstelling) en alleen nog latere events
+bijtelt. Ontbreekt er een dag tussen de eerste dag in de event-store en de
+laatste afgeronde dag, dan zou het dashboard die dag nooit meer bijtellen; de
+store blijft dan ongemoeid en alleen de tabellen worden geschreven. De
+tabellen in <uitvoer> zijn direct met pd.read_parquet te lezen:
+
+    fabrikanten.parquet       lasmax_dB per fabrikant
+    modellen.parquet          lasmax_dB per fabrikant en model
+    sel_per_type.parquet      SEL_dB per type, met passagiers en passagierscategorie
+    sel_per_categorie.parquet kwartielen en snorharen van SEL_dB per passagierscategorie
+    per_dag.parquet           SEL_dB per datum
+    per_weekdag.parquet       SEL_dB per weekdag
+    koppelingen.parquet       alle gekoppelde events
+    lden_per_dag.parquet      Lday, Levening, Lnight en Lden per meetpunt en dag
+    lden_per_jaar.parquet     dezelfde niveaus per meetpunt en jaar
+"""
+import argparse
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from adsb_sync import DEFAULT_TRACK_DIR, TrackStore
+from aggregaat_kubus import WEEKDAGEN, AggregaatKubus, rollup
+from blootstelling import ENERGIE_KOLOMMEN, Blootstelling
+from compacte_tabellen import tijden
+from geluidskaart import GeluidsKaart
+from meetpunten import configureer_log, span
+from sensornet_data import DASHBOARD_QUERY, make_query, store_for
+from sensornet_sync import DEFAULT_STORE_DIR, SensornetSync
+from streaming_stats import GroepsStatistieken
+from vliegtuig_types import koppel_type_dimensie, type_dimensie
+from vlucht_koppeling import DEFAULT_TOLERANTIE, koppel_events_aan_tracks
+
+DEFAULT_UITVOER = os.path.join(DEFAULT_STORE_DIR, 'aggregaten')
+# De namen waaronder het dashboard de kubus en de statistieken laadt
+KUBUS_NAAM = 'sensornet'
+STATISTIEKEN_NAAM = 'sensornet_SEL_dB'
+KAART_NAAM = 'sensornet'
+BLOOTSTELLING_NAAM = 'sensornet'
+
+EVENT_KOLOMMEN = ['id', 'time', 'location_short', 'callsign', 'type', 'lasmax_dB', 'SEL_dB', 'distance'] + ENERGIE_KOLOMMEN
+TRACK_KOLOMMEN = ['FlightNumber', 'Time', 'Latitude', 'Longitude', 'Altitude_feet']
+
+DAG = 24 * 3600
+
+BatchOpdracht = namedtuple('BatchOpdracht', ['event_store', 'track_store', 'uitvoer', 'tolerantie_s', 'volledig_tot'])
+BatchOpdracht.__doc__ = 'Wat een werker nodig heeft; alleen paden en getallen, zodat hij goedkoop naar een proces gaat.'
+
+
+def _dag_map(uitvoer, dag):
+    return os.path.join(uitvoer, 'dagen', f'{dag:%Y-%m-%d}')
+
+
+def _schrijf_parquet(tabel, pad):
+    tmp_pad = pad + '.tmp'
+    tabel.to_parquet(tmp_pad, index=False)
+    os.replace(tmp_pad, pad)  # Atomisch, zodat het dashboard nooit een half bestand leest
+
+
+def _schrijf_json(gegevens, pad):
+    tmp_pad = pad + '.tmp'
+    with open(tmp_pad, 'w') as f:
+        json.dump(gegevens, f)
+    os.replace(tmp_pad, pad)
+
+
+def _lees_klaar(uitvoer, dag):
+    pad = os.path.join(_dag_map(uitvoer, dag), 'klaar.json')
+    if not os.path.exists(pad):
+        return None
+    with open(pad) as f:
+        return json.load(f)
+
+
+def _afgeronde_dagen(uitvoer):
+    """De dagen in <uitvoer>/dagen met een klaar.json, oplopend."""
+    map_ = os.path.join(uitvoer, 'dagen')
+    if not os.path.isdir(map_):
+        return []
+    return sorted(
+        pd.Timestamp(naam) for naam in os.listdir(map_) if os.path.exists(os.path.join(map_, naam, 'klaar.json'))
+    )
+
+
+def _ontbrekende_dagen(events, afgerond):
+    """
+    De dagen zonder klaar.json van de eerste dag in de event-store tot en met de
+    laatste afgeronde dag. Het dashboard telt alleen events na de high-water mark
+    bij, dus een kubus met zo'n gat zou die dagen voorgoed missen.
+    """
+    if not afgerond:
+        return []
+    tijd = events.load(columns=['time'])['time']
+    if tijd.empty:
+        return []
+    eerste = pd.Timestamp(int(tijd.min()), unit='s').normalize()
+    return sorted(set(pd.date_range(eerste, afgerond[-1], freq='D')) - set(afgerond))
+
+
+def _werker_start():
+    # Meerdere processen kunnen niet veilig naar hetzelfde roterende log schrijven
+    configureer_log('0')
+
+
+def verwerk_dag(dag, opdracht):
+    """Berekent en schrijft de aggregaten van één UTC-dag. Geeft de inhoud van klaar.json terug."""
+    start = time.perf_counter()
+    begin = int(dag.timestamp())
+    map_ = _dag_map(opdracht.uitvoer, dag)
+    os.makedirs(map_, exist_ok=True)
+    for naam in ('kubus.parquet', 'kubus.parquet.json', 'sel_per_type.npz', 'koppelingen.parquet',
+                 'geluidskaart.parquet', 'geluidskaart.parquet.json',
+                 'blootstelling.parquet', 'blootstelling.parquet.json'):
+        if os.path.exists(os.path.join(map_, naam)):
+            os.remove(os.path.join(map_, naam))
+
+    events = SensornetSync(opdracht.event_store).load(
+        columns=EVENT_KOLOMMEN, filters=[('time', '>=', begin), ('time', '<', begin + DAG)],
+    )
+    klaar = {'dag': f'{dag:%Y-%m-%d}', 'rijen': len(events), 'gekoppeld': 0,
+             'volledig': begin + DAG <= opdracht.volledig_tot}
+
+    if len(events):
+        kubus = AggregaatKubus()
+        kubus.bij_werken(events)
+        kubus.opslaan(os.path.join(map_, 'kubus.parquet'))
+
+        statistieken = GroepsStatistieken()
+        statistieken.bij_werken(events, 'type', 'SEL_dB')
+        statistieken.opslaan(os.path.join(map_, 'sel_per_type.npz'))
+
+        blootstelling = Blootstelling()
+        blootstelling.bij_werken(events)
+        blootstelling.opslaan(os.path.join(map_, 'blootstelling.parquet'))
+
+        # Trackpunten tot 'tolerantie' buiten de dag kunnen nog bij een event horen
+        marge = pd.Timedelta(seconds=opdracht.tolerantie_s)
+        van = pd.Timestamp(begin, unit='s', tz='UTC') - marge
+        tot = pd.Timestamp(begin + DAG, unit='s', tz='UTC') + marge
+        tracks = TrackStore(opdracht.track_store).load(
+            columns=TRACK_KOLOMMEN, filters=[('Time', '>=', van), ('Time', '<', tot)],
+        )
+        if len(tracks):
+            events['time'] = tijden(events).dt.tz_localize('UTC')
+            koppelingen = koppel_events_aan_tracks(
+                events, tracks, tolerantie=marge, track_kolommen=TRACK_KOLOMMEN[2:],
+            )
+            koppelingen = koppelingen[koppelingen['Latitude'].notna()]
+            if len(koppelingen):
+                _schrijf_parquet(koppelingen, os.path.join(map_, 'koppelingen.parquet'))
+                kaart = GeluidsKaart()
+                kaart.bij_werken(koppelingen)
+                if kaart.cellen is not None:
+                    kaart.opslaan(os.path.join(map_, 'geluidskaart.parquet'))
+            klaar['gekoppeld'] = len(koppelingen)
+
+    klaar['duur_s'] = time.perf_counter() - start
+    _schrijf_json(klaar, os.path.join(map_, 'klaar.json'))
+    return klaar
+
+
+def _samenvoegen(dagen, uitvoer, store_dir, publiceren=True):
+    """
+    Voegt de resultaten per dag samen en schrijft de tabellen, en met
+    publiceren=True ook de kubus, statistieken, geluidskaart en blootstelling in de store.
+    """
+    mappen = [_dag_map(uitvoer, dag) for dag in dagen]
+    kubus = AggregaatKubus.samenvoegen(
+        AggregaatKubus.laden(os.path.join(map_, 'kubus.parquet')) for map_ in mappen
+    )
+    if kubus.cellen is None:
+        return kubus
+
+    statistieken = GroepsStatistieken()
+    for map_ in mappen:
+        pad = os.path.join(map_, 'sel_per_type.npz')
+        if os.path.exists(pad):
+            statistieken = statistieken.merge(GroepsStatistieken.laden(pad))
+    statistieken.tot_tijd, statistieken.tot_id = kubus.tot_tijd, kubus.tot_id
+
+    if publiceren:
+        # Eerst naar een tijdelijke naam, zodat een draaiend dashboard geen halve kubus laadt
+        kubus_pad = os.path.join(store_dir, f'kubus-{KUBUS_NAAM}.parquet')
+        kubus.opslaan(kubus_pad + '.tmp')
+        os.replace(kubus_pad + '.tmp.json', kubus_pad + '.json')
+        os.replace(kubus_pad + '.tmp', kubus_pad)
+        stats_pad = os.path.join(store_dir, f'stats-{STATISTIEKEN_NAAM}.npz')
+        statistieken.opslaan(stats_pad + '.tmp.npz')
+        os.replace(stats_pad + '.tmp.npz', stats_pad)
+
+    kaart = GeluidsKaart.samenvoegen(
+        GeluidsKaart.laden(os.path.join(map_, 'geluidskaart.parquet')) for map_ in mappen
+    )
+    if kaart.cellen is not None and publiceren:
+        kaart_pad = os.path.join(store_dir, f'geluidskaart-{KAART_NAAM}.parquet')
+        kaart.opslaan(kaart_pad + '.tmp')
+        os.replace(kaart_pad + '.tmp.json', kaart_pad + '.json')
+        os.replace(kaart_pad + '.tmp', kaart_pad)
+
+    # Een lokale kalenderdag valt over twee UTC-dagen; samenvoegen telt die sommen bij elkaar op
+    blootstelling = Blootstelling.samenvoegen(
+        Blootstelling.laden(os.path.join(map_, 'blootstelling.parquet')) for map_ in mappen
+    )
+    if blootstelling.dagen is not None:
+        if publiceren:
+            blootstelling_pad = os.path.join(store_dir, f'blootstelling-{BLOOTSTELLING_NAAM}.parquet')
+            blootstelling.opslaan(blootstelling_pad + '.tmp')
+            os.replace(blootstelling_pad + '.tmp.json', blootstelling_pad + '.json')
+            os.replace(blootstelling_pad + '.tmp', blootstelling_pad)
+        _schrijf_parquet(blootstelling.per_dag(), os.path.join(uitvoer, 'lden_per_dag.parquet'))
+        _schrijf_parquet(blootstelling.per_jaar(), os.path.join(uitvoer, 'lden_per_jaar.parquet'))
+
+    _schrijf_parquet(kubus.rollup(['manufacturer'], 'lasmax_dB'), os.path.join(uitvoer, 'fabrikanten.parquet'))
+    modellen = koppel_type_dimensie(kubus.cellen, ['model'])
+    _schrijf_parquet(rollup(modellen, ['manufacturer', 'model'], 'lasmax_dB'), os.path.join(uitvoer, 'modellen.parquet'))
+
+    cellen = kubus.cellen_met(['passagiers', 'passagiers_categorie'])
+    cellen = cellen[cellen['passagiers'].notna()]
+    _schrijf_parquet(rollup(cellen, ['type', 'passagiers', 'passagiers_categorie'], 'SEL_dB'),
+                     os.path.join(uitvoer, 'sel_per_type.parquet'))
+    type_categorie = koppel_type_dimensie(pd.DataFrame({'type': statistieken.groepen}), ['passagiers_categorie'])
+    per_categorie = statistieken.samenvoegen(dict(zip(type_categorie['type'], type_categorie['passagiers_categorie'])))
+    _schrijf_parquet(per_categorie.box_statistieken().rename(columns={'groep': 'passagiers_categorie'}),
+                     os.path.join(uitvoer, 'sel_per_categorie.parquet'))
+
+    _schrijf_parquet(kubus.rollup(['date'], 'SEL_dB'), os.path.join(uitvoer, 'per_dag.parquet'))
+    per_weekdag = kubus.rollup(['weekday'], 'SEL_dB')
+    per_weekdag.insert(1, 'weekdag', np.array(WEEKDAGEN)[per_weekdag['weekday']])
+    _schrijf_parquet(per_weekdag, os.path.join(uitvoer, 'per_weekdag.parquet'))
+
+    koppelingen = [
+        pd.read_parquet(pad) for pad in (os.path.join(map_, 'koppelingen.parquet') for map_ in mappen)
+        if os.path.exists(pad)
+    ]
+    if koppelingen:
+        _schrijf_parquet(pd.concat(koppelingen, ignore_index=True), os.path.join(uitvoer, 'koppelingen.parquet'))
+    return kubus
+
+
+@span('batch_aggregaten')
+def draai(van, tot, werkers=None, opnieuw=False, sync=False, store_dir=DEFAULT_STORE_DIR,
+          uitvoer=DEFAULT_UITVOER, track_store=DEFAULT_TRACK_DIR, tolerantie=DEFAULT_TOLERANTIE):
+    """
+    Berekent de aggregaten voor de dagen van 'van' tot 'tot' (datums, UTC, 'tot'
+    niet meegerekend) met 'werkers' processen en voegt ze samen met de dagen van
+    eerdere runs. Geeft per dag van deze run de inhoud van klaar.json terug.
+    """
+    van, tot = pd.Timestamp(van).normalize(), pd.Timestamp(tot).normalize()
+    dagen = list(pd.date_range(van, tot, freq='D', inclusive='left'))
+    query = make_query(int(van.timestamp()), int(tot.timestamp()), DASHBOARD_QUERY.labels,
+                       DASHBOARD_QUERY.fields, DASHBOARD_QUERY.locations)
+    events = store_for(query, store_dir)
+    if sync:
+        with span('sensornet_sync'):
+            events.sync(query.end)
+    state = events.load_state()
+    # Alleen dagen tot de high-water mark van de store zijn af; latere dagen worden altijd opnieuw berekend
+    volledig_tot = state['time'] if state['time'] is not None else 0
+
+    opdracht = BatchOpdracht(events.store_dir, track_store, uitvoer, tolerantie.total_seconds(), volledig_tot)
+    te_doen = [dag for dag in dagen if opnieuw or not (_lees_klaar(uitvoer, dag) or {}).get('volledig')]
+    if te_doen:
+        # De typedimensie vooraf bijwerken, zodat de werkers hem alleen lezen
+        type_dimensie(events.load(columns=['type'], filters=[
+            ('time', '>=', query.start), ('time', '<', query.end)])['type'].dropna().unique())
+
+    werkers = werkers or os.cpu_count()
+    if werkers == 1:
+        for dag in te_doen:
+            _meld(verwerk_dag(dag, opdracht))
+    else:
+        with ProcessPoolExecutor(max_workers=werkers, initializer=_werker_start) as pool:
+            taken = [pool.submit(verwerk_dag, dag, opdracht) for dag in te_doen]
+            for taak in as_completed(taken):
+                _meld(taak.result())
+
+    with span('batch_samenvoegen'):
+        afgerond = _afgeronde_dagen(uitvoer)
+        ontbrekend = _ontbrekende_dagen(events, afgerond)
+        if ontbrekend:
+            print(f'Niet in {store_dir} gezet: {len(ontbrekend)} dagen ontbreken in {uitvoer}, de eerste is '
+                  f'{ontbrekend[0]:%Y-%m-%d}. Draai eerst met --van {ontbrekend[0]:%Y-%m-%d}.', flush=True)
+        _samenvoegen(afgerond, uitvoer, store_dir, publiceren=not ontbrekend)
+    return [_lees_klaar(uitvoer, dag) for dag in dagen]
+
+
+def _meld(klaar):
+    print(f"{klaar['dag']}: {klaar['rijen']:8d} events, {klaar['gekoppeld']:6d} gekoppeld, {klaar['duur_s']:6.2f} s",
+          flush=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--van', default=f'{pd.Timestamp(DASHBOARD_QUERY.start, unit="s"):%Y-%m-%d}',
+                        help='Eerste dag (UTC), standaard het begin van de dataset')
+    parser.add_argument('--tot', default=f'{pd.Timestamp(DASHBOARD_QUERY.end, unit="s"):%Y-%m-%d}',
+                        help='Dag na de laatste dag (UTC)')
+    parser.add_argument('--werkers', type=int, default=None, help='Aantal processen (standaard het aantal CPU\'s)')
+    parser.add_argument('--opnieuw', action='store_true', help='Ook dagen herberekenen die al klaar zijn')
+    parser.add_argument('--sync', action='store_true', help='Eerst nieuwe events van de API ophalen')
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help='Map waarin het dashboard de kubus en statistieken laadt')
+    parser.add_argument('--uitvoer', default=DEFAULT_UITVOER, help='Map voor de resultaten per dag en de tabellen')
+    parser.add_argument('--tracks', default=DEFAULT_TRACK_DIR, help='Map van de TrackStore')
+    parser.add_argument('--tolerantie', type=float, default=DEFAULT_TOLERANTIE.total_seconds(),
+                        help='Maximaal tijdsverschil tussen event en trackpunt in seconden')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    resultaat = draai(args.van, args.tot, args.werkers, args.opnieuw, args.sync, args.store,
+                      args.uitvoer, args.tracks, pd.Timedelta(seconds=args.tolerantie))
+    print(f'{len(resultaat)} dagen, {sum(dag["rijen"] for dag in resultaat)} events, '
+          f'{sum(dag["gekoppeld"] for dag in resultaat)} gekoppeld in {time.perf_counter() - start:.1f} s')
@@ -0,0 +1,76 @@
+"""
+Meet batch_aggregaten op een tijdelijke event-store met synthetische events:
+eerst alle dagen, daarna een backfill van een paar dagen in het midden. De
+backfill voegt alle afgeronde dagen samen en mag de kubus in de store dus
+niet veranderen; zonder de eerdere dagen in <uitvoer> mag hij de store niet
+aanraken.
+
+    python benchmarks/bench_batch.py --events 200000 --dagen 30 --werkers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from synthetische_data import events
+from batch_aggregaten import EVENT_KOLOMMEN, KUBUS_NAAM, draai
+from sensornet_data import DASHBOARD_QUERY, store_for
+
+START = '2025-01-01'
+
+
+def timed(functie, *args, **kwargs):
+    start = time.perf_counter()
+    resultaat = functie(*args, **kwargs)
+    return time.perf_counter() - start, resultaat
+
+
+def kubus(store_dir):
+    pad = os.path.join(store_dir, f'kubus-{KUBUS_NAAM}.parquet')
+    return pd.read_parquet(pad), os.stat(pad).st_mtime_ns
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=200_000)
+    parser.add_argument('--dagen', type=int, default=30)
+    parser.add_argument('--werkers', type=int, default=1)
+    args = parser.parse_args()
+
+    # Zoals de store ze levert: tijd als epoch-seconden, oplopend
+    data = events(args.events, dagen=args.dagen, start=START)[EVENT_KOLOMMEN]
+    data['time'] = pd.to_datetime(data['time']).dt.tz_localize('Europe/Amsterdam', ambiguous='NaT', nonexistent='NaT') \
+        .dt.tz_convert('UTC')
+    data = data[data['time'].notna()].reset_index(drop=True)
+    data['time'] = data['time'].dt.as_unit('s').astype('int64')
+
+    # De eerste lokale uren vallen in UTC nog op de dag ervoor
+    eerste = pd.Timestamp(START) - pd.Timedelta(days=1)
+    tot = eerste + pd.Timedelta(days=args.dagen + 2)
+    backfill = (eerste + pd.Timedelta(days=args.dagen // 2), eerste + pd.Timedelta(days=args.dagen // 2 + 3))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_for(DASHBOARD_QUERY, tmp).append(data)
+        tracks = os.path.join(tmp, 'tracks')
+        uitvoer = os.path.join(tmp, 'aggregaten')
+        print(f'{len(data)} events over {args.dagen} dagen')
+
+        t, _ = timed(draai, eerste, tot, args.werkers, store_dir=tmp, uitvoer=uitvoer, track_store=tracks)
+        print(f'  alle dagen: {t:.2f} s')
+        volledig, _ = kubus(tmp)
+
+        t, _ = timed(draai, *backfill, args.werkers, opnieuw=True, store_dir=tmp, uitvoer=uitvoer, track_store=tracks)
+        print(f'  backfill van 3 dagen: {t:.2f} s')
+        na_backfill, gewijzigd = kubus(tmp)
+        assert_frame_equal(volledig, na_backfill)
+
+        # Een lege <uitvoer> mist de dagen vóór de backfill: de store blijft dan ongemoeid
+        draai(*backfill, args.werkers, store_dir=tmp, uitvoer=os.path.join(tmp, 'leeg'), track_store=tracks)
+        assert kubus(tmp)[1] == gewijzigd
@@ -0,0 +1,69 @@
+"""
+Meet blootstelling (Lden en deelperiodes) op synthetische events: eerst de
+hele periode in één keer, daarna het bijwerken met steeds een klein blok
+nieuwe events, zoals een sync die ze aanlevert. Het bijwerken hoort met de
+grootte van het blok te schalen, niet met de hele tabel.
+
+    python benchmarks/bench_blootstelling.py --events 2000000 --dagen 365 --blok 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from synthetische_data import events
+from blootstelling import Blootstelling
+
+KOLOMMEN = ['id', 'time', 'location_short', 'SELd', 'SELe', 'SELn', 'SELden']
+
+
+def timed(functie, *args):
+    start = time.perf_counter()
+    resultaat = functie(*args)
+    return time.perf_counter() - start, resultaat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=2_000_000)
+    parser.add_argument('--dagen', type=int, default=365)
+    parser.add_argument('--blok', type=int, default=1000, help='Aantal nieuwe events per update')
+    parser.add_argument('--updates', type=int, default=20)
+    args = parser.parse_args()
+
+    # Zoals de store ze levert: tijd als epoch-seconden, oplopend
+    data = events(args.events, dagen=args.dagen, start='2024-06-01')[KOLOMMEN]
+    data['time'] = pd.to_datetime(data['time']).dt.tz_localize('Europe/Amsterdam', ambiguous='NaT', nonexistent='NaT') \
+        .dt.tz_convert('UTC')
+    data = data[data['time'].notna()].reset_index(drop=True)
+    data['time'] = data['time'].dt.as_unit('s').astype('int64')
+    print(f'{len(data)} events over {args.dagen} dagen')
+
+    t_alles, _ = timed(Blootstelling().bij_werken, data)
+    print(f'  alles in één keer: {t_alles:.2f} s')
+
+    # Begin met alles behalve de laatste blokken en voeg die een voor een toe
+    begin = len(data) - args.blok * args.updates
+    blootstelling = Blootstelling()
+    blootstelling.bij_werken(data.iloc[:begin])
+    tijden = []
+    for einde in range(begin + args.blok, len(data) + 1, args.blok):
+        # De nieuwe events los aanleveren; met het hele frame filtert de high-water mark eerst alles
+        t, _ = timed(blootstelling.bij_werken, data.iloc[einde - args.blok:einde])
+        tijden.append(t)
+    print(f'  bijwerken met {args.blok} nieuwe events: mediaan {np.median(tijden) * 1000:.1f} ms')
+
+    for naam, functie in [('per dag', blootstelling.per_dag), ('7 dagen', lambda: blootstelling.voortschrijdend(7)),
+                          ('30 dagen', lambda: blootstelling.voortschrijdend(30)), ('per jaar', blootstelling.per_jaar)]:
+        t, tabel = timed(functie)
+        print(f'  {naam}: {t * 1000:.1f} ms, {len(tabel)} rijen')
+
+    volledig = Blootstelling()
+    volledig.bij_werken(data)
+    assert np.allclose(volledig.per_dag()['Lden'], blootstelling.per_dag()['Lden'], equal_nan=True)
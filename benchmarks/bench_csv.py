@@ -0,0 +1,60 @@
+"""
+Vergelijkt het inlezen van een eventtabel zoals data_klein.csv: pd.read_csv
+met standaardinstellingen tegen csv_lader.lees_csv, koud (CSV parsen en de
+sidecar schrijven) en warm (alleen de parquet-sidecar lezen). Grotere
+bestanden worden gemaakt door de rijen van data_klein.csv te herhalen.
+
+    python benchmarks/bench_csv.py --rijen 7033 1000000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from csv_lader import EVENTS_KLEIN_SCHEMA, clear_cache, lees_csv
+
+
+def maak_csv(pad, rijen):
+    bron = pd.read_csv(os.path.join(ROOT, 'data_klein.csv'), index_col=0)
+    herhalingen = -(-rijen // len(bron))
+    data = pd.concat([bron] * herhalingen, ignore_index=True).iloc[:rijen]
+    data['id'] = range(len(data))
+    data.to_csv(pad)
+
+
+def meet(functie):
+    clear_cache()  # De sidecar meten, niet de geheugencache van het proces
+    start = time.perf_counter()
+    data = functie()
+    return time.perf_counter() - start, data.memory_usage(deep=True).sum()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rijen', type=int, nargs='+', default=[7033, 1_000_000])
+    args = parser.parse_args()
+
+    print(f'{"rijen":>9} {"variant":>16} {"tijd s":>8} {"geheugen MB":>12}')
+    for rijen in args.rijen:
+        map_ = tempfile.mkdtemp()
+        try:
+            pad = os.path.join(map_, 'events.csv')
+            cache_dir = os.path.join(map_, 'csv_cache')
+            maak_csv(pad, rijen)
+            varianten = [
+                ('pd.read_csv', lambda: pd.read_csv(pad)),
+                ('lees_csv koud', lambda: lees_csv(pad, EVENTS_KLEIN_SCHEMA, cache_dir)),
+                ('lees_csv warm', lambda: lees_csv(pad, EVENTS_KLEIN_SCHEMA, cache_dir)),
+            ]
+            for naam, functie in varianten:
+                tijd, geheugen = meet(functie)
+                print(f'{rijen:9d} {naam:>16} {tijd:8.3f} {geheugen / 1e6:12.1f}')
+        finally:
+            shutil.rmtree(map_)
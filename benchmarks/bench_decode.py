@@ -0,0 +1,112 @@
+"""
+Vergelijkt het oude decodeerpad van fetch_data() (response.json() twee keer,
+list-of-lists DataFrame) met de streaming decoder uit sensornet_decode.
+
+Elke variant draait in een eigen subprocess, zodat de piek-RSS per variant
+gemeten kan worden.
+
+    python benchmarks/bench_decode.py --rows 200000 500000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from sensornet_sync import DEFAULT_FIELDS
+
+TYPES = ['Boeing 737-800', 'Airbus A320 214', 'Embraer ERJ190-100STD', 'Boeing 787-9', None]
+CALLSIGNS = [f'KLM{i}' for i in range(500)]
+OPERATORS = ['KLM Royal Dutch Airlines', 'Easyjet', 'Delta Airlines', None]
+
+
+def make_row(i):
+    row = {
+        'id': 132000000 + i, 'time': 1735689600 + i * 7, 'location_short': 'Ku',
+        'location_long': 'Kudelstaartseweg', 'duration': random.randint(20, 90),
+        'SEL_dB': random.uniform(65, 90), 'lasmax_dB': random.uniform(55, 80),
+        'callsign': random.choice(CALLSIGNS), 'type': random.choice(TYPES),
+        'operator': random.choice(OPERATORS), 'label': 21,
+    }
+    for field in ('SEL', 'SELd', 'SELe', 'SELn', 'SELden'):
+        row[field] = random.randint(0, 10**9)
+    return [row.get(field) for field in DEFAULT_FIELDS]
+
+
+def write_body(path, n_rows):
+    with open(path, 'w') as f:
+        f.write('{"metadata": ')
+        json.dump([{'headers': field} for field in DEFAULT_FIELDS], f)
+        f.write(', "rows": [')
+        for i in range(n_rows):
+            if i:
+                f.write(',')
+            json.dump(make_row(i), f)
+        f.write(']}')
+
+
+def run_old(path):
+    import pandas as pd
+    with open(path, 'rb') as f:
+        body = f.read()  # requests houdt de hele body vast
+    colnames = pd.DataFrame(json.loads(body)['metadata'])
+    data = pd.DataFrame(json.loads(body)['rows'])
+    data.columns = colnames.headers
+    return data
+
+
+def run_streaming(path):
+    from sensornet_decode import decode_stream
+
+    def chunks():
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(1 << 16)
+                if not chunk:
+                    return
+                yield chunk
+
+    return decode_stream(chunks())
+
+
+def child(variant, path):
+    start = time.perf_counter()
+    data = {'old': run_old, 'streaming': run_streaming}[variant](path)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    frame_mb = data.memory_usage(deep=True).sum() / 1e6
+    print(json.dumps({'seconds': elapsed, 'peak_rss_mb': peak_mb, 'frame_mb': frame_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 500_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'variant':>10} {'seconds':>9} {'peak RSS MB':>12} {'frame MB':>9}")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'body.json')
+            random.seed(0)
+            write_body(path, n_rows)
+            for variant in ('old', 'streaming'):
+                out = subprocess.run(
+                    [sys.executable, __file__, '--child', variant, path],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(out)
+                print(f"{n_rows:>10} {variant:>10} {result['seconds']:>9.2f} "
+                      f"{result['peak_rss_mb']:>12.0f} {result['frame_mb']:>9.1f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
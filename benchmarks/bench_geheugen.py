@@ -0,0 +1,67 @@
+"""
+Geheugengebruik van de eventtabel voor een maand aan events en van de
+ADS-B-tracks: ongetypeerd (tekst als object, float64) tegen de compacte vorm
+uit compacte_tabellen, per tabel en per sessie.
+
+Per sessie: st.cache_data geeft elke sessie een eigen (gepickelde) kopie van
+de ongetypeerde tabel, terwijl get_events en csv_lader één compacte tabel per
+proces delen en ondiepe kopieën teruggeven.
+
+    python benchmarks/bench_geheugen.py --events 100000 --sessies 5
+"""
+import argparse
+import os
+import pickle
+import sys
+
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from adsb_tracks import normaliseer_tracks
+from compacte_tabellen import compact, geheugen_rapport
+from synthetische_data import events
+
+
+def ongetypeerd(tabel):
+    """Zoals pd.read_csv vóór het typed inlezen: tekst als object, 'time' als datetime64[ns]."""
+    tabel = tabel.copy()
+    for kolom, waarden in tabel.items():
+        if pd.api.types.is_string_dtype(waarden.dtype):
+            tabel[kolom] = waarden.astype(object)
+    if 'time' in tabel:
+        tabel['time'] = pd.to_datetime(tabel['time']).astype('datetime64[ns]')
+    return tabel
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=100_000, help='Events in de maand')
+    parser.add_argument('--sessies', type=int, default=5)
+    parser.add_argument('--tracks', default=os.path.join(ROOT, '40_Vluchten.csv'))
+    args = parser.parse_args()
+
+    maand = ongetypeerd(events(args.events, dagen=30))
+    ruwe_tracks = ongetypeerd(pd.read_csv(args.tracks))
+    tabellen = {
+        'events ongetypeerd': maand,
+        'events compact': compact(maand),
+        'tracks ongetypeerd': ruwe_tracks,
+        'tracks compact': compact(normaliseer_tracks(ruwe_tracks), tijd_kolommen=()),
+    }
+    rapport = geheugen_rapport(tabellen)
+    print(rapport.to_string(index=False, float_format=lambda x: f'{x:.1f}'))
+
+    mb = rapport.set_index('tabel')['MB']
+    print(f'\nevents: {mb["events ongetypeerd"] / mb["events compact"]:.1f}x kleiner, '
+          f'tracks: {mb["tracks ongetypeerd"] / mb["tracks compact"]:.1f}x kleiner')
+
+    # Elke sessie een eigen kopie (st.cache_data) tegen één gedeelde compacte tabel
+    kopie = pickle.loads(pickle.dumps(maand))
+    per_sessie_oud = kopie.memory_usage(deep=True).sum() / 1e6
+    gedeeld = mb['events compact']
+    totaal_oud = args.sessies * per_sessie_oud
+    print(f'{args.sessies} sessies: {totaal_oud:.1f} MB met een kopie per sessie, '
+          f'{gedeeld:.1f} MB gedeeld ({totaal_oud / gedeeld:.0f}x)')
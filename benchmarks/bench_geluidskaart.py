@@ -0,0 +1,79 @@
+"""
+Meet de geluidskaart op een synthetische maand gekoppelde events: het
+rasteriseren, het renderen van de overlay (eerste keer en uit de cache) en de
+grootte van de kaart-HTML, vergeleken met een marker per event op een deel
+van de events.
+
+    python benchmarks/bench_geluidskaart.py --events 1000000 --markers 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import folium
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from geluidskaart import GeluidsKaart
+from geodesie import SCHIPHOL_LAT, SCHIPHOL_LON
+from kaart_lagen import voeg_geluidskaart_toe
+
+
+def synthetische_koppelingen(n, dagen=30, seed=0):
+    """Events met een vliegtuigpositie rond Schiphol, gesorteerd op tijd."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(n),
+        'time': pd.Timestamp('2025-03-01', tz='UTC') + pd.to_timedelta(
+            np.sort(rng.integers(0, dagen * 86400, n)), unit='s'),
+        'Latitude': SCHIPHOL_LAT + rng.normal(0, 0.08, n),
+        'Longitude': SCHIPHOL_LON + rng.normal(0, 0.12, n),
+        'SEL_dB': rng.normal(80, 5, n),
+    })
+
+
+def html_grootte(kaart):
+    return len(kaart.get_root().render()) / 2**20
+
+
+def timed(functie, *args, **kwargs):
+    start = time.perf_counter()
+    resultaat = functie(*args, **kwargs)
+    return time.perf_counter() - start, resultaat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--dagen', type=int, default=30)
+    parser.add_argument('--markers', type=int, default=2000, help='Aantal events voor de markerkaart')
+    args = parser.parse_args()
+
+    koppelingen = synthetische_koppelingen(args.events, args.dagen)
+    kaart = GeluidsKaart()
+    t_raster, _ = timed(kaart.bij_werken, koppelingen)
+    print(f'{args.events} events over {args.dagen} dagen: {len(kaart.cellen)} cellen (dag, uur, cel)')
+    print(f'  rasteriseren: {t_raster:.2f} s')
+
+    for naam, selectie in [('hele periode', {}), ('één dag, 06-09 uur', {
+            'van': '2025-03-05', 'tot': '2025-03-05', 'uren': range(6, 9)})]:
+        t_eerste, _ = timed(kaart.afbeelding, **selectie)
+        t_cache, _ = timed(kaart.afbeelding, **selectie)
+        print(f'  overlay {naam}: {t_eerste * 1000:.0f} ms, uit de cache {t_cache * 1000:.2f} ms')
+
+    m = folium.Map(location=[SCHIPHOL_LAT, SCHIPHOL_LON], zoom_start=11)
+    voeg_geluidskaart_toe(m, kaart)
+    print(f'  kaart-HTML met overlay: {html_grootte(m):.2f} MiB')
+
+    m = folium.Map(location=[SCHIPHOL_LAT, SCHIPHOL_LON], zoom_start=11)
+    t_markers = time.perf_counter()
+    for lat, lon, niveau in koppelingen[['Latitude', 'Longitude', 'SEL_dB']].iloc[:args.markers].itertuples(index=False):
+        folium.Marker([lat, lon], popup=f'{niveau:.0f} dB').add_to(m)
+    grootte = html_grootte(m)
+    t_markers = time.perf_counter() - t_markers
+    print(f'  {args.markers} markers: {t_markers:.2f} s, {grootte:.2f} MiB HTML '
+          f'(alle events: ~{t_markers * args.events / args.markers:.0f} s, ~{grootte * args.events / args.markers:.0f} MiB)')
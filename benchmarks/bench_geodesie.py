@@ -0,0 +1,96 @@
+"""
+Vergelijkt de oude per-rij helpers (DataFrame.apply met math) met de
+gevectoriseerde functies uit geodesie.py, op alle tracks uit 40_Vluchten.csv
+en op synthetische tracks rond Schiphol.
+
+    python benchmarks/bench_geodesie.py --punten 20000000
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from geodesie import SCHIPHOL_LAT, SCHIPHOL_LON, binnen_straal, haversine_km, koers, segment_middelpunten
+
+
+def oud_haversine(lat1, lon1, lat2, lon2):
+    R = 6371
+    from math import radians, sin, cos, atan2, sqrt
+    d_lat = radians(lat2 - lat1)
+    d_lon = radians(lon2 - lon1)
+    a = sin(d_lat/2)**2 + cos(radians(lat1))*cos(radians(lat2))*sin(d_lon/2)**2
+    return R * 2*atan2(sqrt(a), sqrt(1-a))
+
+
+def oud_bearing(lat1, lon1, lat2, lon2):
+    from math import radians, degrees
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    d_lon = lon2 - lon1
+    x = math.sin(d_lon) * math.cos(lat2)
+    y = math.cos(lat1)*math.sin(lat2) - math.sin(lat1)*math.cos(lat2)*math.cos(d_lon)
+    return (math.degrees(math.atan2(x, y)) + 360) % 360
+
+
+def oud(tracks):
+    afstand = tracks.apply(lambda row: oud_haversine(SCHIPHOL_LAT, SCHIPHOL_LON, row['Latitude'], row['Longitude']), axis=1)
+    binnen = afstand < 20
+    lat, lon = tracks['Latitude'].tolist(), tracks['Longitude'].tolist()
+    koersen = [oud_bearing(lat[i], lon[i], lat[i + 1], lon[i + 1]) for i in range(len(lat) - 1)]
+    middens = [((lat[i] + lat[i + 1]) / 2, (lon[i] + lon[i + 1]) / 2) for i in range(len(lat) - 1)]
+    return binnen.to_numpy(), np.array(koersen), middens
+
+
+def nieuw(lat, lon):
+    binnen = binnen_straal(lat, lon, SCHIPHOL_LAT, SCHIPHOL_LON, 20)
+    koersen = koers(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    middens = segment_middelpunten(lat, lon)
+    return binnen, koersen, middens
+
+
+def synthetische_tracks(n, seed=0):
+    """Random walks in een gebied van ongeveer 200 km rond Schiphol."""
+    rng = np.random.default_rng(seed)
+    lat = SCHIPHOL_LAT + np.cumsum(rng.normal(0, 0.002, n)) % 2.0 - 1.0
+    lon = SCHIPHOL_LON + np.cumsum(rng.normal(0, 0.003, n)) % 3.0 - 1.5
+    return lat, lon
+
+
+def timed(functie, *args):
+    start = time.perf_counter()
+    resultaat = functie(*args)
+    return time.perf_counter() - start, resultaat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default=os.path.join(ROOT, '40_Vluchten.csv'))
+    parser.add_argument('--punten', type=int, default=20_000_000, help='Aantal synthetische trackpunten')
+    parser.add_argument('--oud-max', type=int, default=200_000, help='Maximaal aantal punten voor de per-rij versie')
+    args = parser.parse_args()
+
+    tracks = pd.read_csv(args.csv, usecols=['Latitude', 'Longitude']).dropna().reset_index(drop=True)
+    lat, lon = tracks['Latitude'].to_numpy(), tracks['Longitude'].to_numpy()
+    t_oud, (binnen_oud, koers_oud, _) = timed(oud, tracks)
+    t_nieuw, (binnen_nieuw, koers_nieuw, _) = timed(nieuw, lat, lon)
+    assert np.array_equal(binnen_oud, binnen_nieuw)
+    assert np.allclose(koers_oud, koers_nieuw)
+    print(f'40_Vluchten.csv ({len(tracks)} punten): per rij {t_oud * 1000:.1f} ms, '
+          f'gevectoriseerd {t_nieuw * 1000:.2f} ms ({t_oud / t_nieuw:.0f}x)')
+
+    lat, lon = synthetische_tracks(args.punten)
+    n_oud = min(args.punten, args.oud_max)
+    t_oud, _ = timed(oud, pd.DataFrame({'Latitude': lat[:n_oud], 'Longitude': lon[:n_oud]}))
+    t_oud *= args.punten / n_oud  # Geëxtrapoleerd, de per-rij versie is lineair
+    t_nieuw, (binnen, _, _) = timed(nieuw, lat, lon)
+    t_exact, _ = timed(lambda: haversine_km(SCHIPHOL_LAT, SCHIPHOL_LON, lat, lon) < 20)
+    print(f'synthetisch ({args.punten} punten, {binnen.mean():.1%} binnen 20 km): '
+          f'per rij ~{t_oud:.0f} s (geëxtrapoleerd), gevectoriseerd {t_nieuw:.2f} s')
+    print(f'  alleen de 20 km-test: met bounding box {timed(binnen_straal, lat, lon, SCHIPHOL_LAT, SCHIPHOL_LON, 20)[0]:.2f} s, '
+          f'haversine op alle punten {t_exact:.2f} s')
@@ -0,0 +1,74 @@
+"""
+Vergelijkt de oude bereik/gemiddelde-grafiek (twee go.Scatter-traces per rij
+via iterrows) met grafieken.bereik_gemiddelde_figuur: bouwtijd, aantal traces
+en grootte van de geserialiseerde figuur-JSON.
+
+    python benchmarks/bench_grafieken.py --categorieen 20 200 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from grafieken import bereik_gemiddelde_figuur
+
+
+def synthetische_categorieen(n, seed=0):
+    rng = np.random.default_rng(seed)
+    gemiddelde = rng.uniform(60, 80, n)
+    return pd.DataFrame({
+        'manufacturer': [f'Fabrikant {i}' for i in range(n)],
+        'min': gemiddelde - rng.uniform(2, 10, n),
+        'max': gemiddelde + rng.uniform(2, 10, n),
+        'mean': gemiddelde,
+        'count': rng.integers(6, 500, n),
+    })
+
+
+def oud(data):
+    fig = go.Figure()
+    for i, row in data.iterrows():
+        fig.add_trace(go.Scatter(
+            x=[row['min'], row['max']], y=[row['manufacturer'], row['manufacturer']],
+            mode='lines', line=dict(color='lightblue', width=6), name=row['manufacturer'],
+        ))
+        fig.add_trace(go.Scatter(
+            x=[row['mean']], y=[row['manufacturer']], mode='markers',
+            marker=dict(color='blue', size=10, symbol='circle'), name=f"Gemiddeld: {row['manufacturer']}",
+            hoverinfo='text', hovertext=[f"Gemiddeld: {row['mean']:.2f} dB<br>Waarnemingen: {row['count']}"],
+            showlegend=False,
+        ))
+    return fig
+
+
+def nieuw(data):
+    return bereik_gemiddelde_figuur(data, 'manufacturer', aantal='count')
+
+
+def meet(bouwer, data):
+    start = time.perf_counter()
+    fig = bouwer(data)
+    bouwtijd = time.perf_counter() - start
+    start = time.perf_counter()
+    json = fig.to_json()
+    return len(fig.data), len(json.encode()), bouwtijd, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--categorieen', type=int, nargs='+', default=[20, 200, 2000])
+    args = parser.parse_args()
+
+    print(f'{"categorieën":>11} {"variant":>7} {"traces":>7} {"JSON KB":>9} {"bouw s":>8} {"to_json s":>9}')
+    for n in args.categorieen:
+        data = synthetische_categorieen(n)
+        for naam, bouwer in (('oud', oud), ('nieuw', nieuw)):
+            traces, grootte, bouwtijd, serialisatie = meet(bouwer, data)
+            print(f'{n:11d} {naam:>7} {traces:7d} {grootte / 1024:9.1f} {bouwtijd:8.3f} {serialisatie:9.3f}')
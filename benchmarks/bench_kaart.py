@@ -0,0 +1,93 @@
+"""
+Meet het paginagewicht (HTML naar de browser) en de bouwtijd van de tab-4
+kaart: de oude aanpak (AntPath plus een CircleMarker met popup per segment)
+tegen kaart_lagen.voeg_vluchten_toe, voor een oplopend aantal vluchten.
+
+    python benchmarks/bench_kaart.py --vluchten 2 20 200 500
+"""
+import argparse
+import os
+import sys
+import time
+
+import folium
+import folium.plugins
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from geodesie import SCHIPHOL_LAT, SCHIPHOL_LON, segment_middelpunten
+from kaart_lagen import voeg_vluchten_toe
+
+ZOOM = 11.5
+
+
+def synthetische_tracks(vluchten, punten=400, seed=0):
+    """Naderingen naar Schiphol: rechte lijn met ruis, een punt per 5 s."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(vluchten):
+        hoek = rng.uniform(0, 2 * np.pi)
+        afstand = np.linspace(0.2, 0.01, punten)
+        frames.append(pd.DataFrame({
+            'FlightNumber': f'SYN{i:04d}',
+            'Time': pd.date_range('2025-03-24 06:00', periods=punten, freq='5s', tz='UTC')
+                    + pd.Timedelta(minutes=int(rng.integers(0, 900))),
+            'Latitude': SCHIPHOL_LAT + afstand * np.sin(hoek) + rng.normal(0, 0.0003, punten).cumsum() * 0.1,
+            'Longitude': SCHIPHOL_LON + afstand * np.cos(hoek) * 1.6 + rng.normal(0, 0.0003, punten).cumsum() * 0.1,
+            'Altitude_feet': np.linspace(6000, 200, punten).round(),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def oud(kaart, tracks, kleuren):
+    for vlucht, kleur in kleuren.items():
+        track = tracks[tracks['FlightNumber'] == vlucht]
+        coords = track[['Latitude', 'Longitude']].values.tolist()
+        folium.plugins.AntPath(coords, color=kleur, weight=3, opacity=0.6, delay=2500).add_to(kaart)
+        lat_mids, lon_mids = segment_middelpunten(track['Latitude'], track['Longitude'])
+        for i in range(len(coords) - 1):
+            row2 = track.iloc[i + 1]
+            popup_str = (
+                f"<b>Flight:</b> {vlucht}<br>"
+                f"<b>Time:</b> {row2['Time']:%H:%M:%S} UTC<br>"
+                f"<b>Altitude:</b> {row2['Altitude_feet']:,.0f} ft"
+            )
+            folium.CircleMarker(
+                location=[lat_mids[i], lon_mids[i]], radius=3, color=kleur, fill=True,
+                fill_color=kleur, fill_opacity=0.8, popup=popup_str,
+            ).add_to(kaart)
+
+
+def nieuw(kaart, tracks, kleuren):
+    voeg_vluchten_toe(kaart, tracks, kleuren, zoom=ZOOM)
+
+
+def meet(renderer, tracks, kleuren, prefer_canvas):
+    start = time.perf_counter()
+    kaart = folium.Map(location=[52.235, 4.748], zoom_start=ZOOM, prefer_canvas=prefer_canvas)
+    renderer(kaart, tracks, kleuren)
+    html = kaart.get_root().render()
+    return len(html.encode()), time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vluchten', type=int, nargs='+', default=[2, 20, 200, 500])
+    parser.add_argument('--punten', type=int, default=400, help='Trackpunten per vlucht')
+    parser.add_argument('--oud-max', type=int, default=20, help='Grootste aantal vluchten voor de oude aanpak')
+    args = parser.parse_args()
+
+    print(f'{"vluchten":>8} {"oud KB":>10} {"oud s":>8} {"nieuw KB":>10} {"nieuw s":>8}')
+    for vluchten in args.vluchten:
+        tracks = synthetische_tracks(vluchten, args.punten)
+        kleuren = {f'SYN{i:04d}': ('blue', 'red', 'green', 'purple')[i % 4] for i in range(vluchten)}
+        if vluchten <= args.oud_max:
+            oud_bytes, oud_tijd = meet(oud, tracks, kleuren, prefer_canvas=False)
+            oud_tekst = f'{oud_bytes / 1024:10.0f} {oud_tijd:8.2f}'
+        else:
+            oud_tekst = f'{"-":>10} {"-":>8}'
+        nieuw_bytes, nieuw_tijd = meet(nieuw, tracks, kleuren, prefer_canvas=True)
+        print(f'{vluchten:8d} {oud_tekst} {nieuw_bytes / 1024:10.0f} {nieuw_tijd:8.2f}')
@@ -0,0 +1,70 @@
+"""
+Meet koppel_events_aan_tracks op een synthetische dag Schiphol-verkeer en
+vergelijkt met de oude aanpak (filter + idxmin per callsign) op een deel
+van de vluchten.
+
+    python benchmarks/bench_koppeling.py --vluchten 1500 --punten 600
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from vlucht_koppeling import koppel_events_aan_tracks
+
+
+def synthetische_dag(vluchten, punten, seed=0):
+    """Eén track per vlucht met een punt per 5 s en één sensor-event per vlucht."""
+    rng = np.random.default_rng(seed)
+    callsigns = np.array([f'SYN{i:05d}' for i in range(vluchten)])
+    start = rng.uniform(0, 86400 - punten * 5, vluchten)
+    tijd = np.repeat(start, punten) + np.tile(np.arange(punten) * 5.0, vluchten)
+    tracks = pd.DataFrame({
+        'FlightNumber': np.repeat(callsigns, punten),
+        'Time': pd.to_datetime(tijd, unit='s'),
+        'Latitude': 52.3 + rng.normal(0, 0.1, len(tijd)),
+        'Longitude': 4.76 + rng.normal(0, 0.1, len(tijd)),
+    })
+    events = pd.DataFrame({
+        'callsign': callsigns,
+        'time': pd.to_datetime(start + rng.uniform(0, punten * 5, vluchten), unit='s'),
+    })
+    return events, tracks
+
+
+def oud(events, tracks):
+    resultaat = []
+    for callsign, tijd in zip(events['callsign'], events['time']):
+        rijen = tracks[tracks['FlightNumber'] == callsign]
+        resultaat.append(rijen.loc[(rijen['Time'] - tijd).abs().idxmin(), 'Latitude'])
+    return np.array(resultaat)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vluchten', type=int, default=1500)
+    parser.add_argument('--punten', type=int, default=600, help='Trackpunten per vlucht')
+    parser.add_argument('--oud-vluchten', type=int, default=50, help='Aantal vluchten voor de oude aanpak')
+    args = parser.parse_args()
+
+    events, tracks = synthetische_dag(args.vluchten, args.punten)
+    print(f'{len(events)} events, {len(tracks)} trackpunten')
+
+    for modus in ('dichtstbij', 'omsluitend'):
+        start = time.perf_counter()
+        gekoppeld = koppel_events_aan_tracks(events, tracks, tolerantie=None, modus=modus)
+        print(f'  {modus}: {time.perf_counter() - start:.2f} s')
+
+    n = min(args.oud_vluchten, args.vluchten)
+    start = time.perf_counter()
+    oude_lat = oud(events.iloc[:n], tracks)
+    t_oud = (time.perf_counter() - start) * args.vluchten / n
+    nieuw = koppel_events_aan_tracks(events.iloc[:n], tracks, tolerantie=None)
+    assert np.allclose(oude_lat, nieuw['Latitude'].to_numpy())
+    print(f'  per callsign filteren: ~{t_oud:.1f} s (geëxtrapoleerd van {n} vluchten)')
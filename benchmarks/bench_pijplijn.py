@@ -0,0 +1,281 @@
+"""
+Benchmarksuite over alle stappen van de dashboards, op synthetische data
+(zie synthetische_data.py) van oplopende grootte. Elke stap wordt apart
+gemeten, met als invoer de uitvoer van de vorige stappen:
+
+    laden           CSV -> getypte tabel (koud: parsen, warm: parquet-sidecar)
+    normaliseren    compacte eventtabel, genormaliseerde tracks
+    per_passagier   geluid per passagier voor alle load factors (tab 2)
+    aggregatie      kubus bijwerken, de rollups achter de grafieken, verdelingen voor de boxplot
+    haversine       trackpunten binnen de straal rond Schiphol (tab 4)
+    koppeling       sensor-events aan het dichtstbijzijnde trackpunt (tab 4)
+    figuur          de Plotly-figuren en de folium-kaart, inclusief serialisatie
+
+De resultaten (mediaan en minimum per stap en grootte, met git-revisie en
+versies) worden als JSON weggeschreven. Met --vergelijk wordt een eerder
+resultaat ernaast gelegd; stappen die meer dan --drempel keer en minstens
+--min-verschil seconden trager zijn gelden als regressie en geven exitcode 1.
+
+    python benchmarks/bench_pijplijn.py                          # 10k en 1M rijen
+    python benchmarks/bench_pijplijn.py --rijen 10000 1000000 10000000
+    python benchmarks/bench_pijplijn.py --vergelijk benchmarks/resultaten/<eerder>.json
+
+De gegenereerde CSV's worden in --werkmap bewaard en bij een volgende run met
+dezelfde grootte en seed hergebruikt.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+import folium
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+warnings.filterwarnings('ignore')
+
+from adsb_tracks import normaliseer_tracks
+from aggregaat_kubus import AggregaatKubus, rollup
+from compacte_tabellen import compact, tijden
+from csv_lader import SENSORNET_SCHEMA, TRACK_SCHEMA, clear_cache, lees_csv
+from geluid_per_passagier import bereken_geluid_per_passagier_en_vracht
+from geodesie import SCHIPHOL_LAT, SCHIPHOL_LON, binnen_straal
+from grafieken import bereik_gemiddelde_figuur
+from kaart_lagen import voeg_vluchten_toe
+from streaming_stats import GroepsStatistieken
+from vliegtuig_types import VLIEGTUIG_CAPACITEIT, koppel_type_dimensie
+from vlucht_koppeling import koppel_events_aan_tracks
+from synthetische_data import events, koppel_aan_vluchten, tracks
+
+# Zoveel rijen per gegenereerd blok, zodat 10M rijen niet in één keer als tekst in het geheugen staan
+BLOK_RIJEN = 1_000_000
+DAGEN = 30
+STRAAL_KM = 40
+KAART_VLUCHTEN = 20
+
+
+def genereer(werkmap, rijen, seed):
+    """Schrijft events.csv en tracks.csv met 'rijen' rijen (per blok van een deel van de maand)."""
+    map_ = os.path.join(werkmap, f'{rijen}-{seed}')
+    paden = os.path.join(map_, 'events.csv'), os.path.join(map_, 'tracks.csv')
+    if all(os.path.exists(pad) for pad in paden):
+        return paden
+    os.makedirs(map_, exist_ok=True)
+    tmp = [pad + '.tmp' for pad in paden]
+
+    blokken = -(-rijen // BLOK_RIJEN)
+    dagen = DAGEN / blokken
+    vluchten = 0
+    for blok in range(blokken):
+        n = min(BLOK_RIJEN, rijen - blok * BLOK_RIJEN)
+        start = str(pd.Timestamp('2025-03-01') + pd.Timedelta(days=blok * dagen))
+        blok_tracks = tracks(n, dagen=dagen, start=start, eerste_vlucht=vluchten, seed=seed + blok)
+        vluchten += blok_tracks['FlightNumber'].nunique()
+        blok_events = events(n, dagen=dagen, start=start, eerste_id=130_000_000 + blok * BLOK_RIJEN, seed=seed + blok)
+        blok_events = koppel_aan_vluchten(blok_events, normaliseer_tracks(blok_tracks), seed=seed + blok)
+        blok_events.to_csv(tmp[0], mode='a', header=blok == 0, index=False)
+        blok_tracks.to_csv(tmp[1], mode='a', header=blok == 0, index=False)
+    for van, naar in zip(tmp, paden):
+        os.replace(van, naar)
+    return paden
+
+
+def stappen(events_pad, tracks_pad, cache_dir):
+    """
+    Geeft de stappen als (naam, functie) in pijplijnvolgorde. Elke stap wordt
+    één keer uitgevoerd om de invoer van de volgende stappen te maken.
+    """
+    def koud(pad, schema):
+        def laden():
+            clear_cache()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            return lees_csv(pad, schema, cache_dir)
+        return laden
+
+    def warm(pad, schema):
+        def laden():
+            clear_cache()  # De sidecar meten, niet de geheugencache van het proces
+            return lees_csv(pad, schema, cache_dir)
+        return laden
+
+    uitvoer = {}
+
+    def stap(naam, functie):
+        uitvoer[naam] = functie()
+        return naam, functie
+
+    yield stap('laden_events_koud', koud(events_pad, SENSORNET_SCHEMA))
+    yield stap('laden_events_warm', warm(events_pad, SENSORNET_SCHEMA))
+    yield stap('laden_tracks_koud', koud(tracks_pad, TRACK_SCHEMA))
+    yield stap('laden_tracks_warm', warm(tracks_pad, TRACK_SCHEMA))
+
+    getypte_events, getypte_tracks = uitvoer['laden_events_warm'], uitvoer['laden_tracks_warm']
+    yield stap('normaliseren_events', lambda: compact(getypte_events))
+    yield stap('normaliseren_tracks', lambda: normaliseer_tracks(getypte_tracks))
+    events_, tracks_ = uitvoer['normaliseren_events'], uitvoer['normaliseren_tracks']
+
+    yield stap('per_passagier', lambda: bereken_geluid_per_passagier_en_vracht(events_, VLIEGTUIG_CAPACITEIT))
+
+    def kubus():
+        kubus = AggregaatKubus()
+        kubus.bij_werken(events_)
+        return kubus
+    yield stap('aggregatie_kubus', kubus)
+    kubus_ = uitvoer['aggregatie_kubus']
+
+    def rollups():
+        cellen = kubus_.cellen_met(['passagiers', 'passagiers_categorie'])
+        cellen = cellen[cellen['passagiers'].notna()]
+        return {
+            'fabrikant': kubus_.rollup(['manufacturer'], 'lasmax_dB'),
+            'type': rollup(cellen, ['type', 'passagiers', 'passagiers_categorie'], 'SEL_dB'),
+            'datum': rollup(cellen, ['date'], 'SEL_dB'),
+            'weekdag': rollup(cellen, ['weekday'], 'SEL_dB'),
+        }
+    yield stap('aggregatie_rollups', rollups)
+
+    def verdeling():
+        statistieken = GroepsStatistieken()
+        statistieken.bij_werken(events_, 'type', 'SEL_dB')
+        categorie = koppel_type_dimensie(pd.DataFrame({'type': statistieken.groepen}), ['passagiers_categorie'])
+        return statistieken.samenvoegen(
+            dict(zip(categorie['type'], categorie['passagiers_categorie']))
+        ).box_statistieken()
+    yield stap('aggregatie_verdeling', verdeling)
+
+    yield stap('haversine_filter', lambda: tracks_[binnen_straal(
+        tracks_['Latitude'].to_numpy(), tracks_['Longitude'].to_numpy(), SCHIPHOL_LAT, SCHIPHOL_LON, STRAAL_KM)])
+
+    # Zoals tab 4: sensortijden zijn lokale tijd
+    sensor_events = events_[['id', 'callsign', 'type', 'lasmax_dB']].assign(
+        time=tijden(events_).dt.tz_localize('Europe/Amsterdam', ambiguous='NaT', nonexistent='NaT').dt.tz_convert('UTC'))
+    yield stap('koppeling', lambda: koppel_events_aan_tracks(
+        sensor_events, tracks_, track_kolommen=('Latitude', 'Longitude')))
+
+    def figuur_bereik():
+        per_fabrikant = uitvoer['aggregatie_rollups']['fabrikant']
+        top = per_fabrikant[per_fabrikant['count'] > 5].sort_values('mean', ascending=False).head(20)
+        return bereik_gemiddelde_figuur(top, 'manufacturer', aantal='count').to_json()
+    yield stap('figuur_bereik', figuur_bereik)
+
+    def figuur_box():
+        box = uitvoer['aggregatie_verdeling'].set_index('groep')
+        return go.Figure([
+            go.Box(name=categorie, q1=[rij['q1']], median=[rij['median']], q3=[rij['q3']],
+                   lowerfence=[rij['lowerfence']], upperfence=[rij['upperfence']], mean=[rij['mean']])
+            for categorie, rij in box.iterrows()
+        ]).to_json()
+    yield stap('figuur_box', figuur_box)
+
+    kaart_tracks = uitvoer['haversine_filter']
+    vluchten = kaart_tracks['FlightNumber'].astype(str).drop_duplicates().head(KAART_VLUCHTEN)
+    kleuren = {vlucht: ('blue', 'red', 'green', 'purple')[i % 4] for i, vlucht in enumerate(vluchten)}
+    kaart_tracks = kaart_tracks[kaart_tracks['FlightNumber'].astype(str).isin(kleuren)]
+
+    def figuur_kaart():
+        kaart = folium.Map(location=[52.235, 4.748], zoom_start=11.5, prefer_canvas=True)
+        voeg_vluchten_toe(kaart, kaart_tracks, kleuren, zoom=11.5)
+        return kaart.get_root().render()
+    yield stap('figuur_kaart', figuur_kaart)
+
+
+def meet(functie, herhalingen):
+    tijden_ = []
+    for _ in range(herhalingen):
+        start = time.perf_counter()
+        functie()
+        tijden_.append(time.perf_counter() - start)
+    return tijden_
+
+
+def omgeving():
+    try:
+        revisie = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                 text=True, check=True).stdout.strip()
+        gewijzigd = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                        capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        revisie, gewijzigd = None, None
+    return {
+        'tijdstip': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_revisie': revisie,
+        'lokale_wijzigingen': gewijzigd,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def vergelijk(resultaten, eerder, drempel, min_verschil):
+    """Print de verhouding nieuw/eerder per stap en geeft de regressies terug."""
+    oud = {(r['rijen'], r['stap']): r['mediaan_s'] for r in eerder['resultaten']}
+    regressies = []
+    print(f'\n{"rijen":>9} {"stap":<22} {"eerder s":>9} {"nu s":>9} {"factor":>7}')
+    for r in resultaten:
+        sleutel = (r['rijen'], r['stap'])
+        if sleutel not in oud:
+            continue
+        factor = r['mediaan_s'] / oud[sleutel] if oud[sleutel] > 0 else float('inf')
+        # Korte stappen variëren relatief veel, die tellen pas mee boven een absoluut verschil
+        regressie = factor > drempel and r['mediaan_s'] - oud[sleutel] >= min_verschil
+        markering = '  REGRESSIE' if regressie else ''
+        print(f'{r["rijen"]:9d} {r["stap"]:<22} {oud[sleutel]:9.3f} {r["mediaan_s"]:9.3f} {factor:7.2f}{markering}')
+        if regressie:
+            regressies.append(sleutel)
+    return regressies
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rijen', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--herhalingen', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--werkmap', default=os.path.join(ROOT, 'sensornet_store', 'bench_data'))
+    parser.add_argument('--uitvoer', help='JSON-bestand (standaard benchmarks/resultaten/<tijdstip>-<revisie>.json)')
+    parser.add_argument('--vergelijk', help='Eerder JSON-resultaat om tegen te vergelijken')
+    parser.add_argument('--drempel', type=float, default=1.25, help='Factor waarboven een stap als regressie telt')
+    parser.add_argument('--min-verschil', type=float, default=0.01, help='Minimaal verschil in seconden voor een regressie')
+    args = parser.parse_args()
+
+    info = omgeving()
+    resultaten = []
+    print(f'{"rijen":>9} {"stap":<22} {"mediaan s":>10} {"min s":>8}')
+    for rijen in args.rijen:
+        events_pad, tracks_pad = genereer(args.werkmap, rijen, args.seed)
+        cache_dir = os.path.join(args.werkmap, f'{rijen}-{args.seed}', 'csv_cache')
+        for naam, functie in stappen(events_pad, tracks_pad, cache_dir):
+            gemeten = meet(functie, args.herhalingen)
+            resultaten.append({
+                'rijen': rijen, 'stap': naam, 'mediaan_s': statistics.median(gemeten),
+                'min_s': min(gemeten), 'herhalingen': gemeten,
+            })
+            print(f'{rijen:9d} {naam:<22} {statistics.median(gemeten):10.3f} {min(gemeten):8.3f}', flush=True)
+        clear_cache()
+
+    uitvoer = args.uitvoer or os.path.join(
+        ROOT, 'benchmarks', 'resultaten',
+        f'{info["tijdstip"].replace(":", "")}-{info["git_revisie"] or "onbekend"}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(uitvoer)), exist_ok=True)
+    with open(uitvoer, 'w') as f:
+        json.dump({**info, 'resultaten': resultaten}, f, indent=1)
+    print(f'\nResultaten in {uitvoer}')
+
+    if args.vergelijk:
+        with open(args.vergelijk) as f:
+            regressies = vergelijk(resultaten, json.load(f), args.drempel, args.min_verschil)
+        if regressies:
+            print(f'{len(regressies)} stap(pen) meer dan {args.drempel}x zo traag')
+            sys.exit(1)
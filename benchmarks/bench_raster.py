@@ -0,0 +1,63 @@
+"""
+Meet herbemonster (track_raster) op synthetische FlightAware-tracks en
+vergelijkt met een lus per vlucht (np.interp per kolom) op een deel van de
+vluchten.
+
+    python benchmarks/bench_raster.py --punten 1000000 --interval 1s
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+import synthetische_data
+from adsb_tracks import normaliseer_tracks
+from track_raster import RASTER_KOLOMMEN, herbemonster
+
+
+def per_vlucht(tracks, interval):
+    """Referentie: per vlucht een eigen raster en np.interp per kolom (zonder gatdetectie)."""
+    stap = pd.Timedelta(interval).total_seconds()
+    delen = []
+    for vlucht, rijen in tracks.groupby('FlightNumber', observed=True, sort=True):
+        rijen = rijen.sort_values('Time')
+        t = (rijen['Time'] - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy()
+        raster = np.arange(np.ceil(t[0] / stap), np.floor(t[-1] / stap) + 1) * stap
+        delen.append(pd.DataFrame({kolom: np.interp(raster, t, rijen[kolom].to_numpy(np.float64))
+                                   for kolom in RASTER_KOLOMMEN}))
+    return pd.concat(delen, ignore_index=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--punten', type=int, default=1_000_000, help='Aantal trackpunten')
+    parser.add_argument('--interval', default='1s', help='Rasterinterval')
+    parser.add_argument('--oud-vluchten', type=int, default=200, help='Aantal vluchten voor de lus per vlucht')
+    args = parser.parse_args()
+
+    tracks = normaliseer_tracks(synthetische_data.tracks(args.punten, dagen=1))
+    print(f'{len(tracks)} trackpunten, {tracks["FlightNumber"].nunique()} vluchten, raster {args.interval}')
+
+    start = time.perf_counter()
+    raster = herbemonster(tracks, interval=args.interval)
+    t_nieuw = time.perf_counter() - start
+    print(f'  herbemonster: {t_nieuw:.2f} s, {len(raster)} rasterpunten, '
+          f'{raster.memory_usage(deep=True).sum() / 2**20:.0f} MiB')
+
+    vluchten = np.sort(tracks['FlightNumber'].astype(str).unique())[:args.oud_vluchten]
+    deel = tracks[tracks['FlightNumber'].astype(str).isin(vluchten)]
+    start = time.perf_counter()
+    verwacht = per_vlucht(deel, args.interval)
+    t_oud = (time.perf_counter() - start) * tracks['FlightNumber'].nunique() / len(vluchten)
+    # De synthetische vluchten hebben geen gaten, dus beide rasters zijn gelijk
+    gekregen = herbemonster(deel, interval=args.interval)
+    assert len(gekregen) == len(verwacht)
+    for kolom in RASTER_KOLOMMEN:
+        assert np.allclose(gekregen[kolom].to_numpy(np.float64), verwacht[kolom], rtol=1e-6, equal_nan=True)
+    print(f'  lus per vlucht: ~{t_oud:.1f} s (geëxtrapoleerd van {len(vluchten)} vluchten)')
@@ -0,0 +1,83 @@
+"""
+Meet de latency per widget-interactie in 'goede zach.py' met Streamlit's AppTest.
+
+AppTest voert bij elke interactie het hele script opnieuw uit, ook voor
+fragmenten. De wandkloktijd is dus wat een interactie kostte toen alles bij
+elke interactie opnieuw draaide. De tijd van het fragment dat de widget bevat
+(uit st.session_state['rerun_tijden'], zie rerun_tijden.py) is wat een
+interactie nu op de echte server kost.
+
+    python benchmarks/bench_rerun.py
+    python benchmarks/bench_rerun.py --rev <commit>   # ook een oudere versie van de app meten
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # De app leest CSV's met relatieve paden
+warnings.filterwarnings('ignore')  # FutureWarnings van seaborn bij elke rerun
+
+from streamlit.testing.v1 import AppTest
+
+APP = 'goede zach.py'
+
+# (naam, widget kiezen en aanpassen, fragment dat de widget bevat)
+INTERACTIES = [
+    ('selectbox categorie', lambda at, i: at.selectbox[0].select_index(i % len(at.selectbox[0].options)), 'passagiers_categorie'),
+    ('slider load factor', lambda at, i: at.slider[0].set_value(round(0.5 + 0.05 * (i % 10), 2)), 'passagiers_load_factor'),
+]
+
+
+def meet_app(pad, herhalingen):
+    start = time.perf_counter()
+    at = AppTest.from_file(pad, default_timeout=600).run()
+    print(f'  eerste run: {time.perf_counter() - start:.2f} s')
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    for naam, interactie, fragment in INTERACTIES:
+        volledig, fragment_tijden = [], []
+        for i in range(1, herhalingen + 1):
+            interactie(at, i)
+            start = time.perf_counter()
+            at.run()
+            volledig.append(time.perf_counter() - start)
+            tijden = at.session_state['rerun_tijden'] if 'rerun_tijden' in at.session_state else {}
+            if fragment in tijden:
+                fragment_tijden.append(tijden[fragment])
+        regel = f'  {naam}: hele script {statistics.median(volledig) * 1000:.0f} ms'
+        if fragment_tijden:
+            regel += f', alleen fragment {fragment} {statistics.median(fragment_tijden) * 1000:.0f} ms'
+        print(regel)
+
+    if 'rerun_tijden' in at.session_state:
+        print('  per onderdeel (laatste run): ' + ', '.join(
+            f'{naam} {duur * 1000:.0f} ms' for naam, duur in at.session_state['rerun_tijden'].items()
+        ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rev', help='Meet ook de app zoals hij in deze git-revisie was')
+    parser.add_argument('--herhalingen', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.rev:
+        oud_pad = os.path.join(ROOT, '_bench_rerun_oud.py')
+        bron = subprocess.run(['git', 'show', f'{args.rev}:{APP}'], cwd=ROOT, check=True, capture_output=True).stdout
+        with open(oud_pad, 'wb') as f:
+            f.write(bron)
+        try:
+            print(f'{APP} @ {args.rev}')
+            meet_app(oud_pad, args.herhalingen)
+        finally:
+            os.remove(oud_pad)
+
+    print(f'{APP} (werkkopie)')
+    meet_app(os.path.join(ROOT, APP), args.herhalingen)
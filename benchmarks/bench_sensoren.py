@@ -0,0 +1,90 @@
+"""
+Vergelijkt de rasterindex van sensor_register met een brute-force
+afstandsmatrix (elk punt tegen elk meetpunt), voor het dichtstbijzijnde
+meetpunt en voor alle meetpunten binnen een straal. De meetpunten zijn
+synthetisch (willekeurig rond Schiphol), alleen om de schaal te meten; het
+echte register staat in sensoren.csv.
+
+    python benchmarks/bench_sensoren.py --punten 2000000 --sensoren 1 50 200
+
+Met --klein-netwerk is de drempel van sensor_register.KLEIN_NETWERK te
+verzetten (0: altijd het raster), om het omslagpunt te meten:
+
+    python benchmarks/bench_sensoren.py --sensoren 1 2 3 4 6 8 --klein-netwerk 0
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from geodesie import SCHIPHOL_LAT, SCHIPHOL_LON, haversine_km
+import sensor_register
+from sensor_register import SensorRegister
+
+# Zoveel punten per blok in de brute-force versie, zodat de matrix in het geheugen past
+BLOK = 100_000
+
+
+def synthetische_sensoren(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'code': [f'S{i:03d}' for i in range(n)],
+        'naam': [f'Sensor {i}' for i in range(n)],
+        'lat': SCHIPHOL_LAT + rng.normal(0, 0.12, n),
+        'lon': SCHIPHOL_LON + rng.normal(0, 0.2, n),
+    })
+
+
+def synthetische_punten(n, seed=1):
+    """Trackpunten in een gebied van ongeveer 100 km rond Schiphol."""
+    rng = np.random.default_rng(seed)
+    return SCHIPHOL_LAT + rng.uniform(-0.45, 0.45, n), SCHIPHOL_LON + rng.uniform(-0.75, 0.75, n)
+
+
+def brute_force(lat, lon, sensoren, straal_km):
+    s_lat, s_lon = sensoren['lat'].to_numpy()[None, :], sensoren['lon'].to_numpy()[None, :]
+    dichtstbij = np.empty(len(lat), dtype=np.int64)
+    paren = 0
+    for start in range(0, len(lat), BLOK):
+        afstand = haversine_km(lat[start:start + BLOK, None], lon[start:start + BLOK, None], s_lat, s_lon)
+        dichtstbij[start:start + BLOK] = afstand.argmin(axis=1)
+        paren += int((afstand <= straal_km).sum())
+    return dichtstbij, paren
+
+
+def timed(functie, *args):
+    start = time.perf_counter()
+    resultaat = functie(*args)
+    return time.perf_counter() - start, resultaat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--punten', type=int, default=2_000_000)
+    parser.add_argument('--sensoren', type=int, nargs='+', default=[1, 50, 200])
+    parser.add_argument('--straal', type=float, default=3.0, help='Straal in km voor binnen_straal')
+    parser.add_argument('--klein-netwerk', type=int, default=None,
+                        help='Tot zoveel meetpunten elk punt tegen elk meetpunt (standaard KLEIN_NETWERK)')
+    args = parser.parse_args()
+    if args.klein_netwerk is not None:
+        sensor_register.KLEIN_NETWERK = args.klein_netwerk
+
+    lat, lon = synthetische_punten(args.punten)
+    print(f'{args.punten} punten, straal {args.straal} km')
+    print(f'{"sensoren":>9} {"brute s":>8} {"index dichtstbij s":>19} {"index straal s":>15} {"paren":>9}')
+    for n in args.sensoren:
+        sensoren = synthetische_sensoren(n)
+        register = SensorRegister(sensoren)
+        t_brute, (verwacht, paren) = timed(brute_force, lat, lon, sensoren, args.straal)
+        t_dichtstbij, dichtstbij = timed(register.dichtstbijzijnde, lat, lon)
+        t_straal, binnen = timed(register.binnen_straal, lat, lon, args.straal)
+        # Gelijke afstanden naar twee meetpunten zijn in synthetische data verwaarloosbaar zeldzaam
+        assert np.array_equal(dichtstbij['sensor'].cat.codes.to_numpy(), verwacht)
+        assert len(binnen) == paren
+        print(f'{n:9d} {t_brute:8.2f} {t_dichtstbij:19.2f} {t_straal:15.2f} {paren:9d}')
@@ -0,0 +1,214 @@
+"""
+Synthetische testdata voor de benchmarks: NINA-events met dezelfde kolommen
+als my_data.csv en FlightAware ADS-B-tracks met dezelfde kolommen en notatie
+als 40_Vluchten.csv. De tabellen worden teruggegeven zoals een ongetypeerde
+inleesstap ze zou opleveren (tekst als object, getallen als float64/int64,
+tijden als tekst), zodat elke benchmark zelf de typering kan meten.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from adsb_tracks import BRON_TIJDZONE, SCRAPE_TIJDZONE
+from geodesie import SCHIPHOL_LAT, SCHIPHOL_LON
+
+LOCATIES = [
+    ('Ku', 'Kudelstaartseweg'), ('Ui', 'Uiterweg'), ('Ho', 'Hoofdweg'), ('Bl', 'Bloemenveiling'),
+    ('Wi', 'Wilhelminalaan'), ('Ze', 'Zwarteweg'), ('Ka', 'Kalslagerweg'), ('Oo', 'Oosteinderweg'),
+]
+BANEN = [
+    'Aalsmeerbaan36R_T', 'Kaagbaan06_T', 'Oostbaan04_T', 'Zwanenburgbaan36C_T', 'Kaagbaan24_T',
+    'Zwanenburgbaan36C_L', 'Aalsmeerbaan18L_L', 'Polderbaan18R_L', 'Buitenveldertbaan27_L', 'Buitenveldertbaan09_T',
+]
+TYPES = [
+    ('Airbus A320 232SL', 'A320'), ('Boeing 737-8K2', 'B738'), ('Boeing 787-9', 'B789'),
+    ('Embraer ERJ 190-100STD', 'E190'), ('Airbus A321 251NX', 'A21N'), ('Boeing 777-206ER', 'B772'),
+    ('Airbus A330 203', 'A332'), ('Canadair CL-600-2B19 CRJ-200LR', 'CRJ2'), ('Embraer 175STD', 'E75S'),
+    ('Airbus A319 111', 'A319'), ('Boeing 747-406ERF', 'B744'), ('Airbus A350 941', 'A359'),
+]
+TRACK_KOLOMMEN = [
+    'Time', 'Latitude', 'Longitude', 'Course', 'Speed_kts', 'Speed_mph', 'Altitude_feet', 'ClimbRate',
+    'ReportingFacility', 'FlightType', 'FlightNumber', 'ScrapeTime',
+]
+FACILITEITEN = [
+    'FlightAware ADS-B (AMS / EHAM)', 'FlightAware ADS-B (RTM / EHRD)', 'Estimated',
+    'FlightAware ADS-B (LCY / EGLC)', 'FlightAware ADS-B (SEN / EGMC)', 'Surface and Near-Surface',
+]
+EVENT_KOLOMMEN = [
+    'id', 'location_short', 'location_long', 'time', 'SELd', 'SELe', 'SELn', 'SELden', 'SEL', 'SEL_dB',
+    'lasmax_dB', 'distance', 'altitude', 'label', 'windspeed', 'winddirection', 'callsign', 'type', 'tags',
+    'duration', 'hex_s', 'registration', 'icao_type', 'serial', 'operator',
+]
+
+
+def _tijd_tekst(tijden, formaat, tijdzone=None):
+    """
+    Datetimes als tekst in 'formaat', in 'tijdzone' (lokale wandkloktijd). Via
+    pyarrow, omdat DatetimeIndex.strftime bij miljoenen rijen minuten duurt.
+    """
+    tijden = pd.DatetimeIndex(tijden)
+    if tijdzone is not None:
+        tijden = tijden.tz_convert(tijdzone).tz_localize(None)
+    tekst = pc.strftime(pa.array(tijden.as_unit('s').to_numpy()), format=formaat)
+    return tekst.to_numpy(zero_copy_only=False).astype(object)
+
+
+def _tekst(*delen):
+    """Plakt arrays van getallen en/of tekst per element aan elkaar (via pyarrow, zonder Python-lus)."""
+    delen = [pc.cast(pa.array(deel), pa.string()) if not isinstance(deel, str) else deel for deel in delen]
+    return pc.binary_join_element_wise(*delen, '').to_numpy(zero_copy_only=False).astype(object)
+
+
+def _met_duizendtallen(getallen):
+    """Gehele getallen als tekst met een komma per duizendtal ('3,047', '-1,575')."""
+    getallen = np.asarray(getallen, dtype=np.int64)
+    teken = np.where(getallen < 0, '-', '')
+    absoluut = np.abs(getallen)
+    rest = pc.cast(pa.array(absoluut % 1000), pa.string())
+    met_komma = _tekst(teken, absoluut // 1000, ',', pc.utf8_lpad(rest, 3, '0'))
+    return np.where(absoluut >= 1000, met_komma, _tekst(teken, rest))
+
+
+def _zipf_index(rng, n, aantal, a=1.3):
+    """Indexen in [0, aantal) met een paar veelvoorkomende en veel zeldzame waarden."""
+    return (rng.zipf(a, n) - 1) % aantal
+
+
+def events(n, dagen=30, start='2025-03-01', vliegtuigen=800, types=200, operators=135, eerste_id=130_000_000, seed=0):
+    """
+    n events verspreid over 'dagen' dagen vanaf 'start' (lokale tijd), in de
+    ongetypeerde vorm van my_data.csv.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Meer types dan voorbeelden: varianten van de voorbeeldtypes
+    type_namen = [TYPES[i % len(TYPES)][0] + (f' v{i // len(TYPES)}' if i >= len(TYPES) else '') for i in range(types)]
+    icao = np.array([TYPES[i % len(TYPES)][1] for i in range(types)], dtype=object)
+    operator_namen = np.array([f'Maatschappij {i:03d}' for i in range(operators)], dtype=object)
+
+    # Per vliegtuig vaste registratie, transponder, serienummer, type en maatschappij
+    vliegtuig_type = _zipf_index(rng, vliegtuigen, types)
+    vliegtuig_operator = _zipf_index(rng, vliegtuigen, operators)
+    registraties = np.array([f'PH-{i:04X}' for i in range(vliegtuigen)], dtype=object)
+    hexen = np.array([f'{0x480000 + i:06X}' for i in range(vliegtuigen)], dtype=object)
+    serienummers = rng.integers(1000, 70000, vliegtuigen).astype(np.float64)
+
+    vliegtuig = _zipf_index(rng, n, vliegtuigen, a=1.1)
+    locatie = rng.integers(0, len(LOCATIES), n)
+    seconden = np.sort(rng.integers(0, int(dagen * 86400), n))
+    tijd = pd.Timestamp(start) + pd.to_timedelta(seconden, unit='s')
+    uur = tijd.hour
+
+    sel_db = rng.normal(78, 5, n)
+    sel = 10 ** (sel_db / 10)
+    dag, avond = (uur >= 7) & (uur < 19), (uur >= 19) & (uur < 23)
+    nacht = ~(dag | avond)
+    seld, sele, seln = np.where(dag, sel, 0), np.where(avond, sel, 0), np.where(nacht, sel, 0)
+
+    operator_index = vliegtuig_operator[vliegtuig]
+    prefixen = np.array([f'{chr(65 + o % 26)}{chr(65 + o // 26 % 26)}{chr(65 + o // 676)}' for o in range(operators)])
+    callsign = _tekst(prefixen[operator_index], rng.integers(1, 3000, n))
+    operator = operator_namen[operator_index]
+    operator[rng.random(n) < 0.05] = np.nan
+
+    return pd.DataFrame({
+        'id': np.arange(eerste_id, eerste_id + n, dtype=np.int64),
+        'location_short': np.array([kort for kort, _ in LOCATIES], dtype=object)[locatie],
+        'location_long': np.array([lang for _, lang in LOCATIES], dtype=object)[locatie],
+        'time': _tijd_tekst(tijd, '%Y-%m-%d %H:%M:%S'),
+        'SELd': seld.round(), 'SELe': sele.round(), 'SELn': seln.round(),
+        'SELden': (seld + sele * 10 ** 0.5 + seln * 10).round(),
+        'SEL': sel.round(),
+        'SEL_dB': sel_db,
+        'lasmax_dB': sel_db - rng.uniform(8, 16, n),
+        'distance': rng.uniform(100, 3000, n),
+        'altitude': rng.uniform(100, 3000, n),
+        'label': np.full(n, 21, dtype=np.int64),
+        'windspeed': rng.uniform(0, 12, n).round(),
+        'winddirection': rng.uniform(0, 360, n).round(),
+        'callsign': callsign,
+        'type': np.array(type_namen, dtype=object)[vliegtuig_type[vliegtuig]],
+        'tags': np.array(BANEN, dtype=object)[_zipf_index(rng, n, len(BANEN))],
+        'duration': rng.integers(20, 120, n),
+        'hex_s': hexen[vliegtuig],
+        'registration': registraties[vliegtuig],
+        'icao_type': icao[vliegtuig_type[vliegtuig]],
+        'serial': serienummers[vliegtuig],
+        'operator': operator,
+    }, columns=EVENT_KOLOMMEN)
+
+
+def tracks(n, punten_per_vlucht=400, dagen=30, start='2025-03-01', interval_s=16, eerste_vlucht=0, seed=0):
+    """
+    Ongeveer n trackpunten in vluchten van 'punten_per_vlucht' punten: naderingen
+    naar en vertrekken van Schiphol in rechte lijnen met ruis, een punt per
+    'interval_s' seconden, in de notatie van de FlightAware-scrape.
+    """
+    rng = np.random.default_rng(seed)
+    vluchten = max(1, n // punten_per_vlucht)
+    n = vluchten * punten_per_vlucht
+    vlucht = np.repeat(np.arange(vluchten), punten_per_vlucht)
+    stap = np.tile(np.arange(punten_per_vlucht), vluchten)
+
+    aankomst = rng.random(vluchten) < 0.5
+    # Fractie van de afstand tot Schiphol: aankomsten van 1 naar 0, vertrekken omgekeerd
+    fractie = np.where(aankomst[vlucht], 1 - stap / (punten_per_vlucht - 1), stap / (punten_per_vlucht - 1))
+    hoek = rng.uniform(0, 2 * np.pi, vluchten)[vlucht]
+    afstand_graden = rng.uniform(1, 4, vluchten)[vlucht] * fractie
+    lat = SCHIPHOL_LAT + afstand_graden * np.sin(hoek) + rng.normal(0, 0.002, n)
+    lon = SCHIPHOL_LON + afstand_graden * np.cos(hoek) * 1.6 + rng.normal(0, 0.002, n)
+    hoogte = np.minimum(fractie * 40_000, 38_000).round(-2)
+    snelheid = (140 + fractie * 300 + rng.normal(0, 5, n)).round()
+    klim = np.where(aankomst[vlucht], -1, 1) * rng.integers(0, 3500, n)
+    koers = (np.degrees(hoek) + np.where(aankomst[vlucht], 180, 0)).round() % 360
+
+    start_vlucht = pd.Timestamp(start, tz=SCRAPE_TIJDZONE) + pd.to_timedelta(
+        rng.integers(0, int(dagen * 86400), vluchten), unit='s')
+    tijd = start_vlucht[vlucht] + pd.to_timedelta(stap * interval_s, unit='s')
+    # De scrape gebeurt na afloop van de vlucht, binnen zes uur
+    scrape = (start_vlucht + pd.to_timedelta(punten_per_vlucht * interval_s + rng.integers(60, 6 * 3600, vluchten), unit='s'))
+
+    prefixen = np.array(['KLM', 'TRA', 'EZY', 'BAW', 'DLH', 'AFR', 'TFL', 'SAS'])
+    vluchtnummers = _tekst(prefixen[rng.integers(0, len(prefixen), vluchten)], np.arange(eerste_vlucht, eerste_vlucht + vluchten) + 100)
+    klim_tekst = _met_duizendtallen(klim)
+    klim_tekst[stap == 0] = np.nan
+
+    return pd.DataFrame({
+        'Time': _tijd_tekst(tijd, '%a %I:%M:%S %p', BRON_TIJDZONE),
+        'Latitude': lat.round(4),
+        'Longitude': lon.round(4),
+        'Course': _tekst('→ ', koers.astype(np.int64), '°'),
+        'Speed_kts': snelheid,
+        'Speed_mph': (snelheid * 1.15078).round(),
+        'Altitude_feet': _met_duizendtallen(hoogte),
+        'ClimbRate': klim_tekst,
+        'ReportingFacility': np.array(FACILITEITEN, dtype=object)[_zipf_index(rng, n, len(FACILITEITEN))],
+        'FlightType': np.where(aankomst, 'Arrivals', 'Departures').astype(object)[vlucht],
+        'FlightNumber': vluchtnummers[vlucht],
+        'ScrapeTime': _tijd_tekst(scrape, '%Y-%m-%d %H:%M:%S', SCRAPE_TIJDZONE)[vlucht],
+    }, columns=TRACK_KOLOMMEN)
+
+
+def koppel_aan_vluchten(events, genormaliseerde_tracks, fractie=0.5, seed=0):
+    """
+    Geeft een kopie van 'events' waarin 'fractie' van de events bij een punt van
+    een vlucht hoort: callsign van de vlucht en tijd (lokale tijd, zoals de
+    sensor hem geeft) binnen een minuut van dat punt. Nodig om de koppeling van
+    events aan tracks met echte treffers te meten.
+    """
+    rng = np.random.default_rng(seed)
+    events = events.copy()
+    gekozen = np.flatnonzero(rng.random(len(events)) < fractie)
+    punten = rng.integers(0, len(genormaliseerde_tracks), len(gekozen))
+    tijd = genormaliseerde_tracks['Time'].iloc[punten] + pd.to_timedelta(rng.integers(-60, 60, len(gekozen)), unit='s')
+    events['callsign'] = events['callsign'].astype(object)
+    events.iloc[gekozen, events.columns.get_loc('callsign')] = (
+        genormaliseerde_tracks['FlightNumber'].astype(object).iloc[punten].to_numpy())
+    events.iloc[gekozen, events.columns.get_loc('time')] = _tijd_tekst(tijd, '%Y-%m-%d %H:%M:%S', SCRAPE_TIJDZONE)
+    return events.sort_values('time', kind='stable').reset_index(drop=True)
@@ -0,0 +1,207 @@
+"""
+Geluidsbelasting per meetpunt: Lday, Levening, Lnight en Lden uit de
+energievelden SELd, SELe, SELn en SELden van de events.
+
+De API levert per event de geluidsenergie (10^(SEL/10)), al verdeeld over de
+dag-, avond- en nachtperiode; SELden bevat de straffen voor avond en nacht al.
+Per (location_short, date) worden die energieën opgeteld; het niveau over een
+periode van N dagen is dan
+
+    L = 10 * log10(som van de energie / (N * duur van de periode in seconden))
+
+met 12 uur voor de dag, 4 uur voor de avond, 8 uur voor de nacht en 24 uur
+voor Lden. Niveaus worden dus energetisch gemiddeld, niet rekenkundig.
+
+De dagsommen zijn de lopende totalen, met (location_short, date) als index:
+alleen de events na de high-water mark worden gegroepeerd en via die index bij
+de bestaande sommen opgeteld. Voortschrijdende 7- en
+30-daagse waarden en jaarwaarden volgen met een cumulatieve som over de dagen
+(meetpunten x dagen, een paar duizend rijen). Een dag zonder events telt mee
+als stille dag. De datum is de lokale kalenderdag (Europe/Amsterdam); dat
+zomer- en wintertijddagen 23 of 25 uur duren wordt genegeerd.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from aggregaat_kubus import na_high_water_mark
+from compacte_tabellen import kalender
+from meetpunten import span, tel
+from sensornet_sync import DEFAULT_STORE_DIR
+
+TIJDZONE = 'Europe/Amsterdam'
+# Energieveld, naam van het niveau en duur van de periode per dag in seconden
+PERIODES = [
+    ('SELd', 'Lday', 12 * 3600),
+    ('SELe', 'Levening', 4 * 3600),
+    ('SELn', 'Lnight', 8 * 3600),
+    ('SELden', 'Lden', 24 * 3600),
+]
+ENERGIE_KOLOMMEN = [veld for veld, _, _ in PERIODES]
+NIVEAU_KOLOMMEN = [niveau for _, niveau, _ in PERIODES]
+DAG_DIMENSIES = ['location_short', 'date']
+DEFAULT_VENSTERS = (7, 30)
+
+_blootstellingen = {}
+_blootstellingen_lock = threading.Lock()
+
+
+def niveaus(energie, dagen):
+    """
+    Lday, Levening, Lnight en Lden (dB) uit de energiesommen in 'energie' (een
+    DataFrame met de kolommen SELd, SELe, SELn, SELden) over 'dagen' dagen.
+    Zonder energie is het niveau NaN.
+    """
+    dagen = np.asarray(dagen, dtype=np.float64)
+    resultaat = {}
+    for veld, niveau, seconden in PERIODES:
+        waarden = energie[veld].to_numpy(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            resultaat[niveau] = np.where(waarden > 0, 10 * np.log10(waarden / (dagen * seconden)), np.nan)
+    return pd.DataFrame(resultaat, index=energie.index)
+
+
+def _dagsommen(events):
+    """Energiesommen en aantal events met (location_short, date) als index."""
+    sommen = pd.DataFrame({
+        'location_short': events['location_short'].astype(str).to_numpy(),
+        'date': kalender(events, 'date', tijdzone=TIJDZONE).dt.tz_localize(None).to_numpy(),
+    })
+    for veld in ENERGIE_KOLOMMEN:
+        # De compacte tabellen bewaren floats als float32; optellen in float64
+        sommen[veld] = pd.to_numeric(events[veld], errors='coerce').to_numpy(np.float64) if veld in events.columns \
+            else np.nan
+    sommen['aantal'] = 1
+    return sommen.groupby(DAG_DIMENSIES, sort=True).sum(min_count=1)
+
+
+def _combineer(dagen):
+    """Telt dagsommen met hetzelfde meetpunt en dezelfde datum bij elkaar op."""
+    return dagen.groupby(level=DAG_DIMENSIES, sort=True).sum(min_count=1)
+
+
+def _kalender_raster(dagen):
+    """De dagsommen op een volledig raster van meetpunten x dagen (ontbrekende dagen zijn 0)."""
+    datums = dagen.index.get_level_values('date')
+    datums = pd.date_range(datums.min(), datums.max(), freq='D')
+    meetpunten = sorted(dagen.index.get_level_values('location_short').unique())
+    index = pd.MultiIndex.from_product([meetpunten, datums], names=DAG_DIMENSIES)
+    return dagen[ENERGIE_KOLOMMEN + ['aantal']].reindex(index, fill_value=0).fillna(0)
+
+
+class Blootstelling:
+    """Lopende energiesommen per meetpunt en dag, incrementeel bijgewerkt."""
+
+    def __init__(self, dagen=None, tot_tijd=None, tot_id=None):
+        self.dagen = dagen
+        # High-water mark van de events die al zijn opgeteld
+        self.tot_tijd = tot_tijd
+        self.tot_id = tot_id
+        self._lock = threading.Lock()
+
+    def update(self, events):
+        """Telt nieuwe events op bij de dagsommen (alleen de nieuwe rijen worden gegroepeerd)."""
+        if events.empty:
+            return
+        nieuw = _dagsommen(events)
+        if self.dagen is None:
+            self.dagen = nieuw
+            return
+        # Beide kanten NaN (geen energie) blijft NaN, zoals sum(min_count=1)
+        dagen = self.dagen.add(nieuw, fill_value=0)
+        dagen['aantal'] = dagen['aantal'].astype(np.int64)
+        self.dagen = dagen
+
+    def bij_werken(self, events):
+        """
+        Werkt de dagsommen bij met de events die nieuwer zijn dan de high-water
+        mark. Veilig om elke rerun opnieuw met het hele frame aan te roepen.
+        """
+        with self._lock:
+            events, mark = na_high_water_mark(events, self.tot_tijd, self.tot_id)
+            if events.empty:
+                tel('blootstelling_zonder_nieuwe_events')
+                return
+            with span('blootstelling_bijwerken', rijen=len(events)):
+                self.update(events)
+            tel('blootstelling_rijen_opgeteld', len(events))
+            self.tot_tijd, self.tot_id = mark
+
+    @classmethod
+    def samenvoegen(cls, blootstellingen):
+        """Voegt blootstellingen over losse stukken events (bijvoorbeeld per dag) samen."""
+        blootstellingen = [b for b in blootstellingen if b.dagen is not None]
+        if not blootstellingen:
+            return cls()
+        dagen = _combineer(pd.concat([b.dagen for b in blootstellingen]))
+        laatste = max(blootstellingen, key=lambda b: (b.tot_tijd, b.tot_id))
+        return cls(dagen, laatste.tot_tijd, laatste.tot_id)
+
+    def per_dag(self):
+        """Per meetpunt en dag: aantal events en Lday, Levening, Lnight en Lden."""
+        if self.dagen is None:
+            return pd.DataFrame(columns=DAG_DIMENSIES + ['aantal'] + NIVEAU_KOLOMMEN)
+        dagen = self.dagen.reset_index()
+        return pd.concat([dagen[DAG_DIMENSIES + ['aantal']], niveaus(dagen, 1)], axis=1)
+
+    def voortschrijdend(self, dagen):
+        """
+        Per meetpunt en dag de niveaus over de 'dagen' dagen tot en met die dag.
+        De eerste dagen van de reeks hebben nog geen volledig venster en vallen weg.
+        """
+        if self.dagen is None:
+            return pd.DataFrame(columns=DAG_DIMENSIES + ['aantal'] + NIVEAU_KOLOMMEN)
+        raster = _kalender_raster(self.dagen)
+        # Cumulatieve som per meetpunt; het venster is het verschil met 'dagen' dagen eerder
+        cumulatief = raster.groupby(level='location_short').cumsum()
+        venster = cumulatief - cumulatief.groupby(level='location_short').shift(dagen, fill_value=0)
+        positie = raster.groupby(level='location_short').cumcount()
+        venster = venster[(positie >= dagen - 1).to_numpy()]
+        return pd.concat([venster['aantal'].astype(np.int64), niveaus(venster, dagen)], axis=1).reset_index()
+
+    def per_jaar(self):
+        """
+        Per meetpunt en jaar de niveaus over de gemeten dagen van dat jaar (van de
+        eerste tot de laatste dag in de data, stille dagen meegeteld), met het aantal dagen.
+        """
+        if self.dagen is None:
+            return pd.DataFrame(columns=['location_short', 'year', 'dagen', 'aantal'] + NIVEAU_KOLOMMEN)
+        raster = _kalender_raster(self.dagen).reset_index()
+        raster['year'] = raster['date'].dt.year
+        jaren = raster.groupby(['location_short', 'year']).agg(
+            dagen=('date', 'size'), aantal=('aantal', 'sum'), **{veld: (veld, 'sum') for veld in ENERGIE_KOLOMMEN},
+        ).reset_index()
+        return pd.concat([
+            jaren[['location_short', 'year', 'dagen', 'aantal']], niveaus(jaren, jaren['dagen']),
+        ], axis=1)
+
+    def opslaan(self, pad):
+        self.dagen.reset_index().to_parquet(pad, index=False)
+        with open(pad + '.json', 'w') as f:
+            json.dump({'tot_tijd': str(self.tot_tijd), 'tot_id': int(self.tot_id)}, f)
+
+    @classmethod
+    def laden(cls, pad):
+        if not os.path.exists(pad):
+            return cls()
+        with open(pad + '.json') as f:
+            mark = json.load(f)
+        dagen = pd.read_parquet(pad)
+        # Parquet kent geen seconden en leest 'date' als milliseconden; terug naar de eenheid van _dagsommen
+        dagen['date'] = dagen['date'].astype('datetime64[s]')
+        return cls(dagen.set_index(DAG_DIMENSIES), pd.Timestamp(mark['tot_tijd']), mark['tot_id'])
+
+
+def gedeelde_blootstelling(naam, store_dir=DEFAULT_STORE_DIR):
+    """
+    Geeft een blootstelling terug die door alle sessies en reruns van dit proces
+    wordt gedeeld. Staat er een vooraf berekende versie (zie batch_aggregaten.py)
+    in 'store_dir', dan begint hij daarmee en worden alleen latere events erbij geteld.
+    """
+    with _blootstellingen_lock:
+        if naam not in _blootstellingen:
+            _blootstellingen[naam] = Blootstelling.laden(os.path.join(store_dir, f'blootstelling-{naam}.parquet'))
+        return _blootstellingen[naam]
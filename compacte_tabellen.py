@@ -0,0 +1,109 @@
+"""
+Compacte weergave van event- en tracktabellen in het geheugen.
+
+Herhaalde tekst wordt een categorie (codes plus één keer de unieke waarden),
+metingen worden float32 en tijden int32 epoch-seconden (UTC, tot 2038). Alleen
+de SEL-energiewaarden blijven float64. Kalendervelden (datum, uur, weekdag)
+worden niet als kolom bewaard maar met kalender() uitgerekend wanneer een
+grafiek ze nodig heeft.
+
+Tijden zijn via tijden() altijd als datetime op te vragen, ongeacht of de
+tabel compact is of niet.
+"""
+import numpy as np
+import pandas as pd
+
+from sensornet_decode import FLOAT64_FIELDS
+
+TIJD_KOLOMMEN = ('time',)
+# Tekstkolommen met hoogstens zoveel unieke waarden per rij worden een categorie
+CATEGORIE_DREMPEL = 0.5
+
+_INT32 = np.iinfo(np.int32)
+
+
+def _epoch_seconden(tijd):
+    """Datetime- of integerkolom als int64 epoch-seconden (UTC), of None bij ontbrekende tijden."""
+    if pd.api.types.is_datetime64_any_dtype(tijd):
+        if tijd.isna().any():
+            return None
+        if tijd.dt.tz is not None:
+            tijd = tijd.dt.tz_convert('UTC').dt.tz_localize(None)
+        return tijd.to_numpy().astype('datetime64[s]').astype(np.int64)
+    if pd.api.types.is_integer_dtype(tijd):
+        return tijd.to_numpy(np.int64)
+    return None
+
+
+def compact(tabel, tijd_kolommen=TIJD_KOLOMMEN, float64_kolommen=FLOAT64_FIELDS,
+            categorie_drempel=CATEGORIE_DREMPEL):
+    """
+    Geeft een compacte kopie van 'tabel' terug. Tijdkolommen (datetime of epoch)
+    worden int32 epoch-seconden zolang ze daarin passen en geen NaT bevatten.
+    """
+    compacte = {}
+    for kolom, waarden in tabel.items():
+        dtype = waarden.dtype
+        if kolom in tijd_kolommen:
+            seconden = _epoch_seconden(waarden)
+            if seconden is not None and (seconden.size == 0 or (
+                    seconden.min() >= _INT32.min and seconden.max() <= _INT32.max)):
+                waarden = pd.Series(seconden.astype(np.int32), index=tabel.index)
+        elif isinstance(dtype, pd.CategoricalDtype):
+            waarden = waarden.cat.remove_unused_categories()
+        elif pd.api.types.is_float_dtype(dtype):
+            if kolom not in float64_kolommen:
+                waarden = waarden.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+            waarden = pd.to_numeric(waarden, downcast='integer')
+        elif pd.api.types.is_string_dtype(dtype) or dtype == object:
+            if len(waarden) and waarden.nunique() <= categorie_drempel * len(waarden):
+                waarden = waarden.astype('category')
+        compacte[kolom] = waarden
+    return pd.DataFrame(compacte, index=tabel.index)
+
+
+def tijden(tabel, kolom='time'):
+    """De kolom 'kolom' als datetime (naïef UTC voor epoch-seconden)."""
+    tijd = tabel[kolom]
+    if pd.api.types.is_datetime64_any_dtype(tijd):
+        return tijd
+    if pd.api.types.is_integer_dtype(tijd):
+        return pd.Series(tijd.to_numpy(np.int64).astype('datetime64[s]'), index=tabel.index, name=kolom)
+    return pd.to_datetime(tijd)
+
+
+def kalender(tabel, veld, kolom='time', tijdzone=None):
+    """
+    Rekent een kalenderveld uit de tijdkolom uit: 'date' (datetime om middernacht),
+    'hour', 'weekday' (0 = maandag), 'month' of 'year'. Met 'tijdzone' in die
+    lokale tijd in plaats van UTC.
+    """
+    tijd = tijden(tabel, kolom)
+    if tijdzone is not None:
+        tijd = (tijd.dt.tz_localize('UTC') if tijd.dt.tz is None else tijd).dt.tz_convert(tijdzone)
+    if veld == 'date':
+        return tijd.dt.normalize()
+    if veld in ('hour', 'weekday', 'month'):
+        return getattr(tijd.dt, veld).astype(np.int8)
+    if veld == 'year':
+        return tijd.dt.year.astype(np.int16)
+    raise ValueError(f'Onbekend kalenderveld: {veld}')
+
+
+def geheugen_rapport(tabellen):
+    """
+    Geheugengebruik per tabel ({naam: DataFrame}) als DataFrame met het aantal
+    rijen, MB (inclusief strings en categorieën) en bytes per rij.
+    """
+    rijen = []
+    for naam, tabel in tabellen.items():
+        grootte = int(tabel.memory_usage(deep=True).sum())
+        rijen.append({
+            'tabel': naam,
+            'rijen': len(tabel),
+            'kolommen': tabel.shape[1],
+            'MB': grootte / 1e6,
+            'bytes_per_rij': grootte / max(len(tabel), 1),
+        })
+    return pd.DataFrame(rijen, columns=['tabel', 'rijen', 'kolommen', 'MB', 'bytes_per_rij'])
@@ -0,0 +1,190 @@
+"""
+Leest de CSV-bestanden van de dashboards met een vast schema in plaats van
+pandas' type-inferentie: alleen de gebruikte kolommen (usecols), expliciete
+dtypes (categorieën voor herhaalde tekst, float32 voor dB-waarden) en de
+multithreaded pyarrow-parser.
+
+Het resultaat wordt als parquet-bestand naast de store bewaard
+(sensornet_store/csv_cache). Zolang de bron-CSV niet verandert (mtime en
+grootte) en het schema hetzelfde is, wordt de CSV niet meer geparsed maar het
+parquet-bestand gelezen. Categorieën en float32 blijven daarbij behouden.
+
+Binnen een proces wordt het resultaat bovendien in het geheugen bewaard en aan
+alle sessies als ondiepe kopie gegeven, in plaats van een kopie per sessie
+zoals st.cache_data maakt.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from compacte_tabellen import compact
+from meetpunten import span, tel
+
+DEFAULT_CACHE_DIR = os.path.join('sensornet_store', 'csv_cache')
+
+_cache = {}  # (absoluut pad, cache_dir, compacteren) -> (sleutel, DataFrame)
+_cache_lock = threading.Lock()
+
+# Per kolom de dtype; tijden worden direct door pyarrow geparsed (milliseconden,
+# omdat parquet geen seconden kent en de sidecar anders een andere dtype teruggeeft)
+
+# Events zoals in data_klein.csv (export zonder de naamloze indexkolom)
+EVENTS_KLEIN_SCHEMA = {
+    'kolommen': {
+        'id': 'int64',
+        'time': 'datetime64[ms]',
+        'callsign': 'category',
+        'lasmax_dB': 'float32',
+        'label': 'int16',
+        'type': 'category',
+        'tags': 'category',
+        'duration': 'int32',
+        'registration': 'category',
+        'operator': 'category',
+    },
+}
+
+# Sensornet-events zoals in my_data.csv, alleen de kolommen die tab 4 gebruikt
+SENSORNET_SCHEMA = {
+    'kolommen': {
+        'id': 'int64',
+        'location_short': 'category',
+        'time': 'datetime64[ms]',
+        'duration': 'int32',
+        'callsign': 'category',
+        'type': 'category',
+        'lasmax_dB': 'float32',
+        'SEL_dB': 'float32',
+        'distance': 'float32',
+        'altitude': 'float32',
+        'registration': 'category',
+        'operator': 'category',
+    },
+}
+
+# FlightAware-scrapes zoals 40_Vluchten.csv. 'Time', koers, snelheid en hoogte
+# staan als tekst in de scrape ("Mon 07:13:52 AM", "→ 95°", "3,047") en worden
+# door adsb_tracks.normaliseer_tracks omgezet.
+TRACK_SCHEMA = {
+    'kolommen': {
+        'Time': 'str',
+        'Latitude': 'float64',
+        'Longitude': 'float64',
+        'Course': 'str',
+        'Speed_kts': 'str',
+        'Speed_mph': 'str',
+        'Altitude_feet': 'str',
+        'ClimbRate': 'str',
+        'ReportingFacility': 'category',
+        'FlightType': 'category',
+        'FlightNumber': 'category',
+        'ScrapeTime': 'str',
+    },
+}
+
+
+def csv_opties(schema, kolommen=None, projectie=True):
+    """
+    Keyword-argumenten voor pd.read_csv volgens 'schema' (optioneel beperkt tot
+    'kolommen'). Met projectie=False zonder usecols, voor gebruik met header=None
+    en names=..., wat pandas met de pyarrow-parser niet met usecols combineert.
+    """
+    dtypes = schema['kolommen']
+    if kolommen is not None:
+        dtypes = {kolom: dtypes[kolom] for kolom in kolommen}
+    opties = {'dtype': dtypes, 'engine': 'pyarrow'}
+    if projectie:
+        opties['usecols'] = list(dtypes)
+    return opties
+
+
+@span('csv_parse')
+def _parse(bron, schema):
+    data = pd.read_csv(bron, **csv_opties(schema))
+    tel('csv_rijen_geparsed', len(data))
+    # pyarrow geeft de kolommen in de volgorde van het bestand terug
+    return data[list(schema['kolommen'])]
+
+
+def _sleutel(pad, schema):
+    stat = os.stat(pad)
+    return {
+        'bron': os.path.abspath(pad),
+        'mtime_ns': stat.st_mtime_ns,
+        'grootte': stat.st_size,
+        'schema': hashlib.sha1(json.dumps(schema, sort_keys=True).encode()).hexdigest(),
+    }
+
+
+def _sidecar_pad(pad, cache_dir):
+    naam = hashlib.sha1(os.path.abspath(pad).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f'{os.path.splitext(os.path.basename(pad))[0]}-{naam}.parquet')
+
+
+def _lees_sidecar(sidecar, sleutel):
+    try:
+        metadata = pq.read_schema(sidecar).metadata or {}
+    except (OSError, ValueError):
+        return None
+    if json.loads(metadata.get(b'csv_lader', b'{}')) != sleutel:
+        return None
+    return pd.read_parquet(sidecar)
+
+
+def _lees(pad, schema, cache_dir, sleutel):
+    sidecar = _sidecar_pad(pad, cache_dir)
+    if os.path.exists(sidecar):
+        data = _lees_sidecar(sidecar, sleutel)
+        if data is not None:
+            tel('csv_sidecar_hits')
+            return data
+
+    data = _parse(pad, schema)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f'{sidecar}.{os.getpid()}.tmp'
+    tabel = pa.Table.from_pandas(data, preserve_index=False)
+    tabel = tabel.replace_schema_metadata({**(tabel.schema.metadata or {}), b'csv_lader': json.dumps(sleutel).encode()})
+    pq.write_table(tabel, tmp)
+    os.replace(tmp, sidecar)
+    return data
+
+
+def lees_csv(pad, schema, cache_dir=DEFAULT_CACHE_DIR, compacteren=False):
+    """
+    Leest 'pad' volgens 'schema'. Een geldige sidecar wordt direct gelezen;
+    anders wordt de CSV geparsed en de sidecar (atomair) opnieuw geschreven.
+    Met compacteren=True wordt de tabel compact gemaakt (zie compacte_tabellen),
+    met 'time' als int32 epoch-seconden.
+
+    Het resultaat wordt per proces bewaard tot de bron of het schema verandert
+    en als ondiepe kopie teruggegeven: kolommen toevoegen of vervangen is
+    veilig, waarden in-place aanpassen niet. Met cache_dir=None wordt altijd
+    de CSV gelezen.
+    """
+    if cache_dir is None:
+        data = _parse(pad, schema)
+        return compact(data) if compacteren else data
+
+    sleutel = _sleutel(pad, schema)
+    cache_sleutel = (sleutel['bron'], os.path.abspath(cache_dir), compacteren)
+    with _cache_lock:
+        entry = _cache.get(cache_sleutel)
+        if entry is None or entry[0] != sleutel:
+            tel('csv_geheugen_misses')
+            data = _lees(pad, schema, cache_dir, sleutel)
+            entry = (sleutel, compact(data) if compacteren else data)
+            _cache[cache_sleutel] = entry
+        else:
+            tel('csv_geheugen_hits')
+        return entry[1].copy(deep=False)
+
+
+def clear_cache():
+    """Leegt de geheugencache (de sidecars op schijf blijven staan)."""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,177 @@
+"""
+Dichtste nadering (closest point of approach) tussen vliegtuig en meetpunt,
+binnen het tijdvenster van elk NINA-event: [time, time + duration].
+
+De track van de gekoppelde callsign wordt binnen dat venster lineair
+geïnterpoleerd in een lokaal vlak rond het meetpunt (oost, noord in meter)
+met de hoogte als derde as. Per tracksegment heeft de afstand in het kwadraat
+een minimum in gesloten vorm, zodat alle events in één NumPy-stap klaar zijn:
+
+  * de trackpunten worden één keer gesorteerd op (callsign, tijd); met twee
+    keer searchsorted vindt elk event het punt vóór het begin en het punt na
+    het einde van zijn venster (de intervalindex),
+  * de segmenten daartussen worden zonder Python-lus per event uitgeklapt,
+  * het minimum per event is een reduceat over aaneengesloten segmenten.
+
+Het meetpunt ligt op maaiveld (hoogte 0) en komt uit het sensorregister via
+location_short. De gerapporteerde 'distance' en 'altitude' van het event
+kunnen zo worden nagerekend.
+"""
+import numpy as np
+import pandas as pd
+
+from geodesie import AARDSTRAAL_KM
+from meetpunten import span
+from sensor_register import gedeeld_register
+
+VOET = 0.3048
+METER_PER_GRAAD = np.radians(1.0) * AARDSTRAAL_KM * 1000
+# Segmenten met een langer gat tussen twee trackpunten worden niet geïnterpoleerd
+DEFAULT_MAX_GAT = pd.Timedelta(minutes=5)
+
+
+def _seconden(tijden):
+    """Tijden als float epoch-seconden (datetimes in UTC), NaN voor ontbrekend."""
+    tijden = pd.Series(tijden)
+    if pd.api.types.is_numeric_dtype(tijden):
+        return tijden.to_numpy(np.float64, na_value=np.nan)
+    if not pd.api.types.is_datetime64_any_dtype(tijden):
+        tijden = pd.to_datetime(tijden, utc=True, errors='coerce')
+    if tijden.dt.tz is not None:
+        tijden = tijden.dt.tz_convert('UTC').dt.tz_localize(None)
+    ns = tijden.to_numpy('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return np.where(tijden.isna().to_numpy(), np.nan, ns / 1e9)
+
+
+def _uitklappen(aantal):
+    """Voor n groepen met 'aantal' elementen: de groep en de positie binnen de groep per element."""
+    groep = np.repeat(np.arange(len(aantal)), aantal)
+    positie = np.arange(len(groep)) - np.repeat(np.cumsum(aantal) - aantal, aantal)
+    return groep, positie
+
+
+@span('dichtste_nadering')
+def dichtste_nadering(events, tracks, register=None, max_gat=DEFAULT_MAX_GAT,
+                      event_tijd='time', event_duur='duration', event_callsign='callsign', event_locatie='location_short',
+                      track_tijd='Time', track_callsign='FlightNumber', track_hoogte='Altitude_feet'):
+    """
+    Dichtste nadering per event, als DataFrame met de index van 'events':
+
+        cpa_tijd            moment van de dichtste nadering (UTC)
+        cpa_afstand_m       schuine 3D-afstand tot het meetpunt
+        cpa_horizontaal_m   afstand over de grond
+        cpa_hoogte_m        hoogte van het vliegtuig (Altitude_feet omgerekend)
+        cpa_lat, cpa_lon    positie van het vliegtuig op dat moment
+        segmenten           aantal tracksegmenten in het venster
+
+    Met 'distance' en 'altitude' in de events komen daar 'afwijking_afstand_m'
+    en 'afwijking_hoogte_m' bij (gerapporteerd min berekend). Events zonder
+    track in hun venster, zonder bekend meetpunt of zonder hoogte krijgen NaN.
+
+    'duration' is in seconden; ontbreekt hij, dan is het venster het moment zelf.
+    Tijden mogen datetimes (naïef = UTC) of epoch-seconden zijn.
+    """
+    register = register or gedeeld_register()
+    n = len(events)
+
+    # Het venster en het meetpunt per event
+    begin = _seconden(events[event_tijd])
+    duur = pd.to_numeric(events[event_duur], errors='coerce').to_numpy(np.float64) if event_duur in events.columns \
+        else np.zeros(n)
+    einde = begin + np.nan_to_num(duur, nan=0.0).clip(min=0)
+    sensor = register.coordinaten(events[event_locatie])
+    sensor_lat, sensor_lon = sensor['lat'].to_numpy(), sensor['lon'].to_numpy()
+
+    # Callsigns van beide kanten dezelfde codes geven
+    callsigns = pd.Index(pd.unique(pd.concat([
+        events[event_callsign].astype(object), tracks[track_callsign].astype(object),
+    ], ignore_index=True).dropna().astype(str)))
+    event_code = callsigns.get_indexer(events[event_callsign].astype(str))
+    track_code = callsigns.get_indexer(tracks[track_callsign].astype(str))
+
+    # Trackpunten gesorteerd op (callsign, tijd), met een samengestelde sleutel voor searchsorted
+    t = _seconden(tracks[track_tijd])
+    geldig = (track_code >= 0) & ~np.isnan(t)
+    t0 = np.nanmin(t[geldig]) if geldig.any() else 0.0
+    bereik = (np.nanmax(t[geldig]) - t0 + 1) * 2 if geldig.any() else 1.0
+    volgorde = np.flatnonzero(geldig)[np.lexsort((t[geldig], track_code[geldig]))]
+    code_s, t_s = track_code[volgorde], t[volgorde]
+    sleutel = code_s * bereik + (t_s - t0)
+    lat_s = tracks['Latitude'].to_numpy(np.float64)[volgorde]
+    lon_s = tracks['Longitude'].to_numpy(np.float64)[volgorde]
+    hoogte_s = pd.to_numeric(tracks[track_hoogte], errors='coerce').to_numpy(np.float64)[volgorde] * VOET
+
+    # Intervalindex: per event het punt op of vóór het begin en het punt op of na het einde, binnen zijn callsign
+    bruikbaar = (event_code >= 0) & ~np.isnan(begin) & ~np.isnan(sensor_lat)
+    groep_begin = np.searchsorted(code_s, event_code, side='left')
+    groep_einde = np.searchsorted(code_s, event_code, side='right')
+    laag = np.searchsorted(sleutel, event_code * bereik + (begin - t0), side='right') - 1
+    hoog = np.searchsorted(sleutel, event_code * bereik + (einde - t0), side='left')
+    # Een venster van nul seconden precies op een trackpunt (ook het laatste) heeft toch één segment nodig
+    laag = np.maximum(np.minimum(laag, groep_einde - 2), groep_begin)
+    hoog = np.minimum(np.maximum(hoog, laag + 1), groep_einde - 1)
+    aantal = np.where(bruikbaar, np.maximum(hoog - laag, 0), 0)
+
+    # Alle segmenten van alle events in één keer, aaneengesloten per event
+    event, positie = _uitklappen(aantal)
+    a, b = laag[event] + positie, laag[event] + positie + 1
+    ta, tb = t_s[a], t_s[b]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Het deel van het segment dat binnen het venster valt
+        s_begin = np.maximum(begin[event], ta)
+        s_einde = np.minimum(einde[event], tb)
+        segment_geldig = (tb > ta) & (s_begin <= s_einde) & (tb - ta <= max_gat.total_seconds())
+        f_begin = (s_begin - ta) / (tb - ta)
+        f_einde = (s_einde - ta) / (tb - ta)
+
+        # Lokale coördinaten (meter) rond het meetpunt van het event
+        cos_lat = np.cos(np.radians(sensor_lat[event]))
+
+        def punt(f):
+            lat = lat_s[a] + f * (lat_s[b] - lat_s[a])
+            lon = lon_s[a] + f * (lon_s[b] - lon_s[a])
+            hoogte = hoogte_s[a] + f * (hoogte_s[b] - hoogte_s[a])
+            x = (lon - sensor_lon[event]) * METER_PER_GRAAD * cos_lat
+            y = (lat - sensor_lat[event]) * METER_PER_GRAAD
+            return x, y, hoogte
+
+        x0, y0, z0 = punt(f_begin)
+        x1, y1, z1 = punt(f_einde)
+        dx, dy, dz = x1 - x0, y1 - y0, z1 - z0
+        # Minimum van |p0 + s * d|^2 voor s in [0, 1]
+        lengte2 = dx * dx + dy * dy + dz * dz
+        s = np.where(lengte2 > 0, -(x0 * dx + y0 * dy + z0 * dz) / lengte2, 0.0).clip(0.0, 1.0)
+        x, y, z = x0 + s * dx, y0 + s * dy, z0 + s * dz
+        afstand = np.sqrt(x * x + y * y + z * z)
+    afstand = np.where(segment_geldig & ~np.isnan(afstand), afstand, np.inf)
+
+    # Minimum per event over zijn (aaneengesloten) segmenten
+    met_segmenten = np.flatnonzero(aantal > 0)
+    minimum = np.full(n, np.inf)
+    if len(met_segmenten):
+        minimum[met_segmenten] = np.minimum.reduceat(afstand, (np.cumsum(aantal) - aantal)[met_segmenten])
+    winnaar = np.flatnonzero((afstand == minimum[event]) & np.isfinite(afstand))
+    # Bij gelijke afstanden het eerste segment
+    _, eerste = np.unique(event[winnaar], return_index=True)
+    winnaar = winnaar[eerste]
+    e = event[winnaar]
+
+    def per_event(waarden):
+        uit = np.full(n, np.nan)
+        uit[e] = waarden[winnaar]
+        return uit
+
+    resultaat = pd.DataFrame({
+        'cpa_tijd': pd.to_datetime(per_event(s_begin + s * (s_einde - s_begin)), unit='s', utc=True),
+        'cpa_afstand_m': per_event(afstand),
+        'cpa_horizontaal_m': per_event(np.hypot(x, y)),
+        'cpa_hoogte_m': per_event(z),
+        'cpa_lat': per_event(sensor_lat[event] + y / METER_PER_GRAAD),
+        'cpa_lon': per_event(sensor_lon[event] + x / (METER_PER_GRAAD * cos_lat)),
+        'segmenten': aantal,
+    }, index=events.index)
+    if 'distance' in events.columns:
+        resultaat['afwijking_afstand_m'] = pd.to_numeric(events['distance'], errors='coerce').to_numpy() - resultaat['cpa_afstand_m']
+    if 'altitude' in events.columns:
+        resultaat['afwijking_hoogte_m'] = pd.to_numeric(events['altitude'], errors='coerce').to_numpy() - resultaat['cpa_hoogte_m']
+    return resultaat
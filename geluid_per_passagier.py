@@ -0,0 +1,162 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from meetpunten import span, tel
+from vliegtuig_types import PASSAGIERS_CATEGORIEEN, koppel_type_dimensie
+
+# Standaard raster van load factors voor de slider (0.50 t/m 1.00 in stappen van 0.01)
+DEFAULT_LOAD_FACTORS = np.round(np.arange(0.50, 1.0001, 0.01), 2)
+
+# Volgorde van de boxstatistieken in GeluidPerPassagierGrid.boxen, met de sleutels van Axes.bxp
+BOX_STATISTIEKEN = ['whislo', 'q1', 'med', 'q3', 'whishi']
+
+_grids = {}  # naam -> (sleutel, GeluidPerPassagierGrid)
+_grids_lock = threading.Lock()
+
+
+class GeluidPerPassagierGrid:
+    """
+    Geluid per passagier en per ton vracht voor een heel raster van load factors.
+
+    Alles wat van de load factor afhangt is vooraf uitgerekend, zodat een slider
+    alleen een rij uit een array opzoekt in plaats van opnieuw te rekenen.
+    """
+
+    def __init__(self, events, per_type, load_factors, per_passagier, categorieen, boxen, uitschieters):
+        self.events = events
+        self.per_type = per_type
+        self.load_factors = load_factors
+        # Vorm (aantal types, aantal load factors)
+        self.per_passagier = per_passagier
+        self.categorieen = categorieen
+        # Vorm (aantal categorieën, len(BOX_STATISTIEKEN), aantal load factors)
+        self.boxen = boxen
+        # Per categorie de uitschieters bij load factor 1
+        self.uitschieters = uitschieters
+
+    def _index(self, load_factor):
+        return int(np.abs(self.load_factors - load_factor).argmin())
+
+    def per_type_bij(self, load_factor):
+        """Gemiddeld geluid per passagier en per ton vracht per vliegtuigtype bij deze load factor."""
+        result = self.per_type.copy()
+        result['geluid_per_passagier'] = self.per_passagier[:, self._index(load_factor)]
+        return result
+
+    def resultaten(self, load_factor):
+        """Per event: geluid per passagier en per ton vracht bij deze load factor."""
+        result = self.events[['vliegtuig_type', 'passagiers', 'passagiers_categorie', 'geluid_per_vracht']].copy()
+        result['geluid_per_passagier'] = self.events['geluid_per_volle_passagier'] / self.load_factors[self._index(load_factor)]
+        return result
+
+    def boxen_bij(self, load_factor):
+        """Boxplot van het geluid per passagier per passagierscategorie bij deze load factor, voor Axes.bxp."""
+        index = self._index(load_factor)
+        return [
+            dict(zip(BOX_STATISTIEKEN, self.boxen[i, :, index]), label=categorie,
+                 fliers=self.uitschieters[i] / self.load_factors[index])
+            for i, categorie in enumerate(self.categorieen)
+        ]
+
+
+def _box_statistieken(waarden):
+    """
+    Kwartielen en snorharen (tot 1,5 keer de kwartielafstand, zoals matplotlib en
+    seaborn) van 'waarden', in de volgorde van BOX_STATISTIEKEN, plus de uitschieters.
+    """
+    waarden = waarden[~np.isnan(waarden)]
+    if not len(waarden):
+        return np.full(len(BOX_STATISTIEKEN), np.nan), waarden
+    q1, med, q3 = np.quantile(waarden, [0.25, 0.5, 0.75])
+    marge = 1.5 * (q3 - q1)
+    binnen = waarden[(waarden >= q1 - marge) & (waarden <= q3 + marge)]
+    uitschieters = waarden[(waarden < q1 - marge) | (waarden > q3 + marge)]
+    return np.array([binnen.min(), q1, med, q3, binnen.max()]), uitschieters
+
+
+@span('geluid_per_passagier')
+def bereken_geluid_per_passagier_en_vracht(data, vliegtuig_capaciteit, load_factors=DEFAULT_LOAD_FACTORS):
+    """
+    Koppelt alle events via de typedimensie aan de capaciteitstabel en rekent het geluid
+    per passagier (voor elke load factor) en per ton vracht (zonder load factor) uit.
+    Werkt zowel met de echte data (kolom 'type') als met de mockdata ('vliegtuig_type').
+    """
+    type_kolom = 'type' if 'type' in data.columns else 'vliegtuig_type'
+    load_factors = np.asarray(load_factors, dtype=np.float64)
+
+    # Koppeling via de typedimensie: alleen de unieke types worden opgezocht
+    events = koppel_type_dimensie(
+        data[[type_kolom, 'SEL_dB']], ['capaciteit_type', 'passagiers', 'vracht_ton', 'passagiers_categorie'],
+        vliegtuig_capaciteit, type_kolom,
+    )
+    events = events[events['passagiers'].notna()]
+    events = pd.DataFrame({
+        'vliegtuig_type': events['capaciteit_type'].cat.remove_unused_categories().array,
+        'passagiers': events['passagiers'].to_numpy(),
+        'vracht_ton': events['vracht_ton'].to_numpy(),
+        # In de vaste volgorde van de categorieën, zodat grafieken oplopend sorteren
+        'passagiers_categorie': events['passagiers_categorie'].cat.set_categories(PASSAGIERS_CATEGORIEEN)
+        .cat.remove_unused_categories().array,
+        'SEL_dB': events['SEL_dB'].to_numpy(dtype=np.float64),
+    })
+
+    passagiers = events['passagiers'].to_numpy(dtype=np.float64)
+    vracht_ton = events['vracht_ton'].to_numpy(dtype=np.float64)
+    sel_dB = events['SEL_dB'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        events['geluid_per_volle_passagier'] = np.where(passagiers != 0, sel_dB / passagiers, np.nan)
+        events['geluid_per_vracht'] = np.where(vracht_ton != 0, sel_dB / vracht_ton, np.nan)
+
+    per_type = events.groupby('vliegtuig_type', sort=False, observed=True).agg(
+        passagiers=('passagiers', 'first'),
+        vracht_ton=('vracht_ton', 'first'),
+        aantal=('SEL_dB', 'size'),
+        SEL_dB=('SEL_dB', 'mean'),
+        geluid_per_volle_passagier=('geluid_per_volle_passagier', 'mean'),
+        geluid_per_vracht=('geluid_per_vracht', 'mean'),
+    ).reset_index()
+    # Als gewone tekst, zodat grafieken geen lege categorieën tonen
+    per_type['vliegtuig_type'] = per_type['vliegtuig_type'].astype(str)
+
+    # Het gemiddelde van SEL / (passagiers * lf) is gemiddelde(SEL / passagiers) / lf
+    per_passagier = per_type['geluid_per_volle_passagier'].to_numpy()[:, None] / load_factors[None, :]
+
+    # Delen door lf > 0 behoudt de volgorde, dus ook kwartielen, snorharen en uitschieters schalen met 1 / lf
+    categorieen = events['passagiers_categorie'].cat.categories
+    codes = events['passagiers_categorie'].cat.codes.to_numpy()
+    volle_passagier = events['geluid_per_volle_passagier'].to_numpy()
+    per_categorie = [_box_statistieken(volle_passagier[codes == i]) for i in range(len(categorieen))]
+    boxen = np.array([box for box, _ in per_categorie]).reshape(len(categorieen), len(BOX_STATISTIEKEN))
+    return GeluidPerPassagierGrid(
+        events, per_type, load_factors, per_passagier, list(categorieen),
+        boxen[:, :, None] / load_factors[None, None, :], [uitschieters for _, uitschieters in per_categorie],
+    )
+
+
+def _high_water_mark(data):
+    """Laatste 'time' en het hoogste 'id' op dat tijdstip; verandert zodra er events bij komen."""
+    if data.empty or 'time' not in data.columns:
+        return None, None
+    laatste = data['time'].max()
+    return laatste, data.loc[data['time'] == laatste, 'id'].max() if 'id' in data.columns else None
+
+
+def gedeeld_geluid_grid(naam, data, vliegtuig_capaciteit, load_factors=DEFAULT_LOAD_FACTORS):
+    """
+    Het raster van bereken_geluid_per_passagier_en_vracht voor 'data', gedeeld
+    door alle sessies en reruns van dit proces. Er wordt pas opnieuw gerekend
+    als de high-water mark of het aantal events verandert (of de
+    capaciteitstabel of de load factors), niet bij elke nieuwe kopie van de data.
+    """
+    sleutel = (len(data), _high_water_mark(data), repr(sorted(vliegtuig_capaciteit.items())),
+               tuple(np.asarray(load_factors, dtype=np.float64)))
+    with _grids_lock:
+        entry = _grids.get(naam)
+        if entry is not None and entry[0] == sleutel:
+            tel('geluid_grid_hits')
+            return entry[1]
+        grid = bereken_geluid_per_passagier_en_vracht(data, vliegtuig_capaciteit, load_factors)
+        _grids[naam] = (sleutel, grid)
+        return grid
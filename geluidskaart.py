@@ -0,0 +1,244 @@
+"""
+Geluidskaart: de niveaus van gekoppelde events, energetisch opgeteld op een
+vast lat/lon-raster rond Schiphol en vooraf per dag en per uur gesommeerd.
+
+Elk event dat aan een track is gekoppeld (zie vlucht_koppeling) valt in de
+rastercel van de vliegtuigpositie op het moment van het event. Per (date,
+hour, cel) staan de energiesom  sum(10^(L/10))  en het aantal events. Elke
+selectie van dagen en uren is dan één bincount over die cellen, gevolgd door
+10 * log10 van de som: niveaus tellen logaritmisch op (twee events van 80 dB
+geven samen 83 dB), niet als rekenkundig gemiddelde.
+
+Naar de browser gaat één PNG (folium ImageOverlay) in plaats van een marker
+per event. De PNG wordt per proces bewaard per kaart en selectie, zodat een
+maand aan footprints na de eerste keer direct rendert. Het raster is
+gelijkhoekig in graden; over de ongeveer 60 km van de kaart scheelt dat met
+de Mercator-projectie van de ondergrond minder dan een procent.
+"""
+import base64
+import io
+import itertools
+import json
+import os
+import threading
+from collections import namedtuple
+
+import matplotlib
+import matplotlib.image
+import numpy as np
+import pandas as pd
+
+from aggregaat_kubus import na_high_water_mark
+from compacte_tabellen import tijden
+from geodesie import AARDSTRAAL_KM, SCHIPHOL_LAT, SCHIPHOL_LON
+from meetpunten import span, tel
+from sensornet_sync import DEFAULT_STORE_DIR
+
+METER_PER_GRAAD = np.radians(1.0) * AARDSTRAAL_KM * 1000
+CEL_DIMENSIES = ['date', 'hour', 'cel']
+DEFAULT_NIVEAU = 'SEL_dB'
+DEFAULT_KLEUREN = 'inferno'
+# Zoveel gerenderde afbeeldingen bewaart een proces; de oudste gaat er het eerst uit
+MAX_AFBEELDINGEN = 64
+
+Raster = namedtuple('Raster', ['midden_lat', 'midden_lon', 'cel_m', 'straal_km'])
+Raster.__doc__ = 'Vierkant raster van 2 * straal_km breed rond (midden_lat, midden_lon), met cellen van cel_m meter.'
+DEFAULT_RASTER = Raster(SCHIPHOL_LAT, SCHIPHOL_LON, 500.0, 30.0)
+
+_kaarten = {}
+_kaarten_lock = threading.Lock()
+_afbeeldingen = {}  # (versie, selectie, schaal) -> (data-URL, vmin, vmax)
+_afbeeldingen_lock = threading.Lock()
+_versies = itertools.count()
+
+
+def _afmetingen(raster):
+    """Aantal cellen per zijde, de celgrootte in graden (lat, lon) en de zuidwesthoek."""
+    n = int(np.ceil(2 * raster.straal_km * 1000 / raster.cel_m))
+    stap_lat = raster.cel_m / METER_PER_GRAAD
+    stap_lon = stap_lat / np.cos(np.radians(raster.midden_lat))
+    return n, stap_lat, stap_lon, raster.midden_lat - n / 2 * stap_lat, raster.midden_lon - n / 2 * stap_lon
+
+
+def grenzen(raster=DEFAULT_RASTER):
+    """[[zuid, west], [noord, oost]] van het raster, zoals folium ze verwacht."""
+    n, stap_lat, stap_lon, zuid, west = _afmetingen(raster)
+    return [[zuid, west], [zuid + n * stap_lat, west + n * stap_lon]]
+
+
+def _rasteriseer(koppelingen, raster, niveau, lat='Latitude', lon='Longitude'):
+    """Kaartcellen (date, hour, cel, energie, aantal) van gekoppelde events; events buiten het raster vallen weg."""
+    n, stap_lat, stap_lon, zuid, west = _afmetingen(raster)
+    rij = np.floor((koppelingen[lat].to_numpy(np.float64) - zuid) / stap_lat)
+    kolom = np.floor((koppelingen[lon].to_numpy(np.float64) - west) / stap_lon)
+    waarden = pd.to_numeric(koppelingen[niveau], errors='coerce').to_numpy(np.float64)
+    tijd = tijden(koppelingen)
+    if tijd.dt.tz is not None:
+        tijd = tijd.dt.tz_convert('UTC').dt.tz_localize(None)
+    uur = tijd.to_numpy('datetime64[h]').astype(np.int64)
+    binnen = (rij >= 0) & (rij < n) & (kolom >= 0) & (kolom < n) & ~np.isnan(waarden) & (uur != np.iinfo(np.int64).min)
+
+    # Eén int64-sleutel per (uur sinds epoch, cel); factorize is sneller dan groupby over drie kolommen
+    sleutel = uur[binnen] * (n * n) + (rij[binnen] * n + kolom[binnen]).astype(np.int64)
+    groep, sleutels = pd.factorize(sleutel)
+    energie = np.bincount(groep, weights=10.0 ** (waarden[binnen] / 10), minlength=len(sleutels))
+    aantal = np.bincount(groep, minlength=len(sleutels))
+    uren = sleutels // (n * n)
+    return pd.DataFrame({
+        'date': (uren // 24).astype('datetime64[D]').astype('datetime64[s]'),
+        'hour': (uren % 24).astype(np.int8),
+        'cel': (sleutels % (n * n)).astype(np.int32),
+        'energie': energie,
+        'aantal': aantal.astype(np.int64),
+    })
+
+
+def _combineer(cellen):
+    """Telt kaartcellen met dezelfde (date, hour, cel) bij elkaar op."""
+    return cellen.groupby(CEL_DIMENSIES, sort=False).agg(energie=('energie', 'sum'), aantal=('aantal', 'sum')).reset_index()
+
+
+def _als_png(niveaus, vmin, vmax, kleuren):
+    """Rasterniveaus (rij 0 = zuid) als PNG-data-URL; lege cellen zijn doorzichtig."""
+    schaal = np.clip((niveaus - vmin) / max(vmax - vmin, 1e-9), 0, 1)
+    rgba = matplotlib.colormaps[kleuren](np.nan_to_num(schaal))
+    rgba[..., 3] = np.where(np.isnan(niveaus), 0.0, 0.75)
+    buffer = io.BytesIO()
+    # Een afbeelding begint bovenaan, dus het noorden eerst
+    matplotlib.image.imsave(buffer, rgba[::-1], format='png')
+    return 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+class GeluidsKaart:
+    """Incrementeel bijgewerkte energiesom per dag, uur en rastercel."""
+
+    def __init__(self, cellen=None, raster=DEFAULT_RASTER, tot_tijd=None, tot_id=None):
+        self.cellen = cellen
+        self.raster = raster
+        # High-water mark van de events die al op de kaart staan
+        self.tot_tijd = tot_tijd
+        self.tot_id = tot_id
+        # Verandert bij elke update, zodat gerenderde afbeeldingen van de oude stand niet meer worden gebruikt
+        self.versie = next(_versies)
+        self._lock = threading.Lock()
+
+    def update(self, koppelingen, niveau=DEFAULT_NIVEAU):
+        """Telt gekoppelde events (met Latitude, Longitude en 'niveau') op bij de kaart."""
+        if koppelingen.empty:
+            return
+        nieuw = _rasteriseer(koppelingen, self.raster, niveau)
+        self.cellen = nieuw if self.cellen is None else _combineer(pd.concat([self.cellen, nieuw], ignore_index=True))
+        self.versie = next(_versies)
+
+    def bij_werken(self, koppelingen, niveau=DEFAULT_NIVEAU):
+        """
+        Werkt de kaart bij met de gekoppelde events die nieuwer zijn dan de
+        high-water mark. Veilig om elke rerun opnieuw met het hele frame aan te roepen.
+        """
+        with self._lock:
+            koppelingen, mark = na_high_water_mark(koppelingen, self.tot_tijd, self.tot_id)
+            if koppelingen.empty:
+                tel('geluidskaart_zonder_nieuwe_events')
+                return
+            with span('geluidskaart_bijwerken', rijen=len(koppelingen)):
+                self.update(koppelingen, niveau)
+            self.tot_tijd, self.tot_id = mark
+
+    @classmethod
+    def samenvoegen(cls, kaarten):
+        """Voegt kaarten over losse stukken events (bijvoorbeeld per dag) met hetzelfde raster samen."""
+        kaarten = [kaart for kaart in kaarten if kaart.cellen is not None]
+        if not kaarten:
+            return cls()
+        if len({kaart.raster for kaart in kaarten}) > 1:
+            raise ValueError('Kaarten met verschillende rasters kunnen niet worden samengevoegd')
+        cellen = _combineer(pd.concat([kaart.cellen for kaart in kaarten], ignore_index=True))
+        laatste = max(kaarten, key=lambda kaart: (kaart.tot_tijd, kaart.tot_id))
+        return cls(cellen, laatste.raster, laatste.tot_tijd, laatste.tot_id)
+
+    def dagen(self):
+        """De datums met events op de kaart, oplopend."""
+        if self.cellen is None:
+            return []
+        return sorted(pd.to_datetime(self.cellen['date'].unique()))
+
+    def niveaus(self, van=None, tot=None, uren=None):
+        """
+        Energetisch opgeteld niveau per cel (dB) over de dagen van 'van' tot en met
+        'tot' en de uren (UTC) in 'uren', als n x n array met rij 0 in het zuiden.
+        Cellen zonder events zijn NaN.
+        """
+        n = _afmetingen(self.raster)[0]
+        energie = np.zeros(n * n)
+        if self.cellen is not None:
+            cellen = self.cellen
+            kies = np.ones(len(cellen), dtype=bool)
+            if van is not None:
+                kies &= (cellen['date'] >= pd.Timestamp(van).normalize()).to_numpy()
+            if tot is not None:
+                kies &= (cellen['date'] <= pd.Timestamp(tot).normalize()).to_numpy()
+            if uren is not None:
+                kies &= cellen['hour'].isin(list(uren)).to_numpy()
+            energie = np.bincount(cellen['cel'].to_numpy()[kies], weights=cellen['energie'].to_numpy()[kies],
+                                  minlength=n * n)
+        with np.errstate(divide='ignore'):
+            niveaus = 10 * np.log10(energie)
+        niveaus[energie <= 0] = np.nan
+        return niveaus.reshape(n, n)
+
+    def afbeelding(self, van=None, tot=None, uren=None, vmin=None, vmax=None, kleuren=DEFAULT_KLEUREN):
+        """
+        De selectie als PNG-data-URL voor een ImageOverlay, met de gebruikte schaal:
+        (url, vmin, vmax). Zonder vmin/vmax loopt de schaal van het 5e percentiel tot
+        het maximum van de selectie. Per proces bewaard zolang de kaart niet verandert.
+        """
+        uren = tuple(sorted(uren)) if uren is not None else None
+        van = pd.Timestamp(van).normalize() if van is not None else None
+        tot = pd.Timestamp(tot).normalize() if tot is not None else None
+        sleutel = (self.versie, van, tot, uren, vmin, vmax, kleuren)
+        with _afbeeldingen_lock:
+            if sleutel in _afbeeldingen:
+                tel('geluidskaart_afbeelding_hits')
+                return _afbeeldingen[sleutel]
+        tel('geluidskaart_afbeelding_misses')
+        with span('geluidskaart_renderen'):
+            niveaus = self.niveaus(van, tot, uren)
+            gevuld = niveaus[~np.isnan(niveaus)]
+            if vmin is None:
+                vmin = float(np.percentile(gevuld, 5)) if len(gevuld) else 0.0
+            if vmax is None:
+                vmax = float(gevuld.max()) if len(gevuld) else vmin + 1.0
+            resultaat = (_als_png(niveaus, vmin, vmax, kleuren), vmin, vmax)
+        with _afbeeldingen_lock:
+            _afbeeldingen[sleutel] = resultaat
+            while len(_afbeeldingen) > MAX_AFBEELDINGEN:
+                del _afbeeldingen[next(iter(_afbeeldingen))]
+        return resultaat
+
+    def opslaan(self, pad):
+        self.cellen.to_parquet(pad, index=False)
+        with open(pad + '.json', 'w') as f:
+            json.dump({'tot_tijd': str(self.tot_tijd), 'tot_id': int(self.tot_id), 'raster': self.raster._asdict()}, f)
+
+    @classmethod
+    def laden(cls, pad):
+        if not os.path.exists(pad):
+            return cls()
+        with open(pad + '.json') as f:
+            meta = json.load(f)
+        cellen = pd.read_parquet(pad)
+        # Parquet kent geen seconden en leest 'date' als milliseconden; terug naar de eenheid van _rasteriseer
+        cellen['date'] = cellen['date'].astype('datetime64[s]')
+        return cls(cellen, Raster(**meta['raster']), pd.Timestamp(meta['tot_tijd']), meta['tot_id'])
+
+
+def gedeelde_geluidskaart(naam, store_dir=DEFAULT_STORE_DIR):
+    """
+    Geeft een geluidskaart terug die door alle sessies en reruns van dit proces
+    wordt gedeeld. Staat er een vooraf berekende kaart (zie batch_aggregaten.py)
+    in 'store_dir', dan begint hij daarmee.
+    """
+    with _kaarten_lock:
+        if naam not in _kaarten:
+            _kaarten[naam] = GeluidsKaart.laden(os.path.join(store_dir, f'geluidskaart-{naam}.parquet'))
+        return _kaarten[naam]
@@ -0,0 +1,75 @@
+"""
+Gevectoriseerde geodesie over hele kolommen met coördinaten (in graden).
+
+Alle functies accepteren scalars, NumPy-arrays of pandas Series en broadcasten
+zoals NumPy, dus één referentiepunt tegen een hele track werkt direct.
+"""
+import numpy as np
+
+AARDSTRAAL_KM = 6371.0
+
+# Schiphol, het referentiepunt van de kaart
+SCHIPHOL_LAT = 52.3105
+SCHIPHOL_LON = 4.7683
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Afstand over de grootcirkel in km."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * AARDSTRAAL_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def koers(lat1, lon1, lat2, lon2):
+    """Begin-koers van punt 1 naar punt 2 in graden (0-360, 0 = noord)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    d_lon = lon2 - lon1
+    x = np.sin(d_lon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(d_lon)
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+
+def middelpunt(lat1, lon1, lat2, lon2):
+    """Middelpunt van de grootcirkel tussen twee punten, als (lat, lon)."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    d_lon = lon2 - lon1
+    bx = np.cos(lat2) * np.cos(d_lon)
+    by = np.cos(lat2) * np.sin(d_lon)
+    lat = np.arctan2(np.sin(lat1) + np.sin(lat2), np.sqrt((np.cos(lat1) + bx) ** 2 + by ** 2))
+    lon = lon1 + np.arctan2(by, np.cos(lat1) + bx)
+    return np.degrees(lat), (np.degrees(lon) + 540) % 360 - 180
+
+
+def segment_middelpunten(lat, lon):
+    """Middelpunten van opeenvolgende segmenten van een track (n punten -> n-1 middelpunten)."""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    return middelpunt(lat[:-1], lon[:-1], lat[1:], lon[1:])
+
+
+def bounding_box(lat0, lon0, straal_km):
+    """
+    Kleinste lat/lon-rechthoek die de cirkel met 'straal_km' rond (lat0, lon0)
+    volledig bevat, als (lat_min, lat_max, lon_min, lon_max).
+    """
+    hoek = straal_km / AARDSTRAAL_KM
+    d_lat = np.degrees(hoek)
+    # Breedste punt van de cirkel in lengtegraden (geldt niet over de polen heen)
+    d_lon = np.degrees(np.arcsin(min(1.0, np.sin(hoek) / np.cos(np.radians(lat0)))))
+    return lat0 - d_lat, lat0 + d_lat, lon0 - d_lon, lon0 + d_lon
+
+
+def binnen_straal(lat, lon, lat0, lon0, straal_km):
+    """
+    Booleaans masker: ligt elk punt binnen 'straal_km' van (lat0, lon0)?
+
+    Eerst een goedkope bounding-box-test; de exacte haversine wordt alleen
+    uitgerekend voor de punten binnen de box.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    lat_min, lat_max, lon_min, lon_max = bounding_box(lat0, lon0, straal_km)
+    masker = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+    kandidaten = np.flatnonzero(masker)
+    masker[kandidaten] = haversine_km(lat0, lon0, lat[kandidaten], lon[kandidaten]) < straal_km
+    return masker
@@ -2,7 +2,6 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
-import requests
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -10,8 +9,29 @@ import folium
 import math
 from datetime import datetime
 import pytz
-from folium.plugins import AntPath
 from streamlit_folium import folium_static
+from sensornet_data import DASHBOARD_QUERY, get_events
+from geluid_per_passagier import gedeeld_geluid_grid
+from aggregaat_kubus import WEEKDAGEN, gedeelde_kubus, na_high_water_mark, rollup
+from blootstelling import NIVEAU_KOLOMMEN, gedeelde_blootstelling
+from streaming_stats import gedeelde_statistieken
+from vliegtuig_types import koppel_type_dimensie
+from adsb_sync import TrackStore
+from vlucht_koppeling import DEFAULT_TOLERANTIE, koppel_events_aan_tracks
+from geodesie import SCHIPHOL_LAT, SCHIPHOL_LON, binnen_straal
+from sensor_register import gedeeld_register
+from dichtste_nadering import dichtste_nadering
+from track_raster import herbemonster
+from kaart_lagen import voeg_geluidskaart_toe, voeg_vluchten_toe
+from geluidskaart import gedeelde_geluidskaart
+from grafieken import bereik_gemiddelde_figuur
+from rerun_tijden import gemeten, prestatie_paneel, start_app_rerun
+from csv_lader import EVENTS_KLEIN_SCHEMA, SENSORNET_SCHEMA, lees_csv
+from compacte_tabellen import tijden
+from meetpunten import span
+
+# Spans en tellers van deze rerun (paneel in de sidebar met ?perf=1)
+start_app_rerun('goede zach')
 
 # Titel van de Streamlit app
 st.title("Hackaton 👩🏼‍✈️👨🏻‍✈️👨🏼‍✈️🧑🏻‍✈️")
@@ -19,840 +39,686 @@ st.title("Hackaton 👩🏼‍✈️👨🏻‍✈️👨🏼‍✈️🧑🏻
 # Maak twee tabbladen
 tab1, tab2, tab3, tab4 = st.tabs(["🛬🏭Vliegtuigfabrikanten", "🧳🚶🏽‍♀️‍➡️Passagiers en vracht", "🎧Geluidsoverzicht", "👂Geluidsdetectie"])
 
+# Elk tabblad is een eigen functie met expliciete invoer. Onderdelen met een widget zijn een
+# st.fragment, zodat een interactie alleen dat fragment opnieuw uitvoert en niet de hele app.
+
 # Inhoud voor Tabblad 1
-with tab1:
+@span('laad_data_klein')
+def laad_data_klein():
+    # Eén compacte kopie per proces, gedeeld door alle sessies (zie csv_lader)
+    return lees_csv('data_klein.csv', EVENTS_KLEIN_SCHEMA, compacteren=True)
+
+@gemeten
+def tab_fabrikanten(data):
+
+    # Titel van de Streamlit app
+    st.title("Luidste Vliegtuigfabrikanten")
+
+    # Werk de gedeelde aggregaatkubus bij, alleen nieuwe events worden geaggregeerd
+    kubus_fabrikanten = gedeelde_kubus('data_klein')
+    kubus_fabrikanten.bij_werken(data)
+
+    # Rol de kubus op naar het aantal waarnemingen, gemiddelde, minimum en maximum geluidsniveau per fabrikant
+    sound_per_manufacturer = kubus_fabrikanten.rollup(['manufacturer'], 'lasmax_dB')
+
+    # Filter alleen de fabrikanten die meer dan 5 keer zijn waargenomen
+    sound_per_manufacturer = sound_per_manufacturer[sound_per_manufacturer['count'] > 5]
+
+    # Selecteer de top 20 luidste fabrikanten
+    top_manufacturers = sound_per_manufacturer.sort_values('mean', ascending=False).head(20).rename(columns={'mean': 'lasmax_dB'})
+
+    # Staven van minimum tot maximum en markeringen op het gemiddelde (met het aantal waarnemingen in de hover-tekst),
+    # als twee traces ongeacht het aantal fabrikanten
+    fig = bereik_gemiddelde_figuur(top_manufacturers, 'manufacturer', gemiddelde='lasmax_dB', aantal='count')
+
+    # Pas de layout aan voor betere zichtbaarheid van labels en de x-as
+    fig.update_layout(
+        yaxis={'tickmode': 'array'},  # Zorg ervoor dat alle fabrikanten zichtbaar zijn
+        margin={"l": 200, "r": 20, "t": 50, "b": 100},  # Vergroot de marge om ruimte te maken voor labels
+        width=1000,  # Pas de breedte aan om de grafiek compacter te maken
+        height=600,  # Pas de hoogte aan om de grafiek compacter te maken
+        xaxis_title='Geluidniveaus (dB)',  # Toevoegen van titel aan de x-as
+        yaxis_title='Fabrikant',  # Toevoegen van titel aan de y-as
+        showlegend=False,  # Verwijder de legenda aan de rechterkant
+        xaxis=dict(
+            range=[top_manufacturers['min'].min() - 5, top_manufacturers['max'].max() + 5]  # Stel de x-as limieten in zodat alles zichtbaar is
+        ),
+        paper_bgcolor='white',  # Achtergrondkleur instellen als wit
+        plot_bgcolor='white',  # Achtergrondkleur grafiek instellen als wit
+    )
+
+    # Draai de y-as labels zodat ze beter leesbaar zijn
+    fig.update_layout(
+        yaxis_tickangle=-45,  # Draai de y-as labels met -45 graden voor betere leesbaarheid
+        font=dict(size=12)  # Verklein het lettertype van de labels om ze beter leesbaar te maken
+    )
+
+    # Toon de grafiek in de Streamlit interface
+    st.plotly_chart(fig)
+
+    ######################################################################################
+    # Filter de kubuscellen van fabrikant Boeing, met de familie uit de typedimensie (zoals 'Boeing 777')
+    boeing_cellen = kubus_fabrikanten.cellen_met(['family'])
+    boeing_cellen = boeing_cellen[boeing_cellen['manufacturer'] == 'Boeing']
+
+    # Rol op naar familie en bereken het gemiddelde, minimum en maximum geluidsniveau per model
+    avg_sound_per_boeing_model = rollup(boeing_cellen, ['family'], 'lasmax_dB')[['family', 'mean', 'min', 'max']]
+
+    # Hernoem kolommen voor duidelijkheid
+    avg_sound_per_boeing_model.columns = ['model', 'lasmax_dB', 'min_lasmax_dB', 'max_lasmax_dB']
+
+    # Sorteer op gemiddeld geluidsniveau
+    avg_sound_per_boeing_model = avg_sound_per_boeing_model.sort_values(by='lasmax_dB', ascending=False)
+
+    # Staven van minimum tot maximum en markeringen op het gemiddelde, als twee traces
+    fig = bereik_gemiddelde_figuur(
+        avg_sound_per_boeing_model, 'model', minimum='min_lasmax_dB', maximum='max_lasmax_dB', gemiddelde='lasmax_dB',
+    )
+
+    # Pas de layout aan voor betere zichtbaarheid van labels en de x-as
+    fig.update_layout(
+        yaxis={'tickmode': 'array'},  # Zorg ervoor dat alle Boeing-modellen zichtbaar zijn
+        margin={"l": 200, "r": 20, "t": 50, "b": 100},  # Vergroot de marge om ruimte te maken voor labels
+        width=1000,  # Pas de breedte aan om de grafiek compacter te maken
+        height=600,  # Pas de hoogte aan om de grafiek compacter te maken
+        xaxis_title='Geluidniveaus (dB)',  # Toevoegen van titel aan de x-as
+        yaxis_title='Boeing Model',  # Toevoegen van titel aan de y-as
+        showlegend=False,  # Verwijder de legenda aan de rechterkant
+        xaxis=dict(
+            range=[avg_sound_per_boeing_model['min_lasmax_dB'].min() - 5, avg_sound_per_boeing_model['max_lasmax_dB'].max() + 5]  # Stel de x-as limieten in zodat alles zichtbaar is
+        ),
+        paper_bgcolor='white',  # Achtergrondkleur instellen als wit
+        plot_bgcolor='white',  # Achtergrondkleur grafiek instellen als wit
+    )
+
+    # Draai de y-as labels zodat ze beter leesbaar zijn
+    fig.update_layout(
+        yaxis_tickangle=-45,  # Draai de y-as labels met -45 graden voor betere leesbaarheid
+        font=dict(size=12)  # Verklein het lettertype van de labels om ze beter leesbaar te maken
+    )
+
+    # Toon de grafiek in de Streamlit interface
+    st.title("Gemiddeld Geluidsniveau per Boeing Model")
+    st.plotly_chart(fig)
 
- # Titel van de Streamlit app
- st.title("Luidste Vliegtuigfabrikanten")
-
- # Laad de dataset
- data = pd.read_csv('data_klein.csv')
-
- # Voeg een nieuwe kolom 'manufacturer' toe met de eerste woordgroep uit 'type'
- data['manufacturer'] = data['type'].str.split().str[0]
- # Voeg een nieuwe kolom 'model' toe door het tweede woord uit de kolom 'type' te halen
- data['model'] = data['type'].str.split().str[1]
- 
- # Tel het aantal waarnemingen per fabrikant
- manufacturer_counts = data['manufacturer'].value_counts()
- 
- # Filter alleen de fabrikanten die meer dan 5 keer zijn waargenomen
- valid_manufacturers = manufacturer_counts[manufacturer_counts > 5].index
- 
- # Filter de dataset op de fabrikanten die meer dan 5 keer zijn waargenomen
- filtered_data = data[data['manufacturer'].isin(valid_manufacturers)]
- 
- # Bereken het gemiddelde geluidsniveau per fabrikant
- avg_sound_per_manufacturer = filtered_data.groupby('manufacturer')['lasmax_dB'].mean().sort_values(ascending=False).reset_index()
- 
- # Voeg het aantal waarnemingen per fabrikant toe aan de dataset
- avg_sound_per_manufacturer['count'] = avg_sound_per_manufacturer['manufacturer'].map(manufacturer_counts)
- 
- # Selecteer de top 20 luidste fabrikanten
- top_manufacturers = avg_sound_per_manufacturer.head(20)
- 
- # Bereken de minimale en maximale waarde per fabrikant
- min_max_per_manufacturer = filtered_data.groupby('manufacturer')['lasmax_dB'].agg(['min', 'max']).reset_index()
- 
- # Voeg de minimale en maximale waarden toe aan de top_manufacturers dataframe
- top_manufacturers = top_manufacturers.merge(min_max_per_manufacturer[['manufacturer', 'min', 'max']], on='manufacturer')
- 
- # Maak een lege figuur aan voor de grafiek
- fig = go.Figure()
- 
- # Voeg een enkele staaf toe die begint bij de minimum waarde en eindigt bij de maximum waarde
- for i, row in top_manufacturers.iterrows():
-     fig.add_trace(go.Scatter(
-         x=[row['min'], row['max']],  # x-waarden van de staaf (min naar max)
-         y=[row['manufacturer'], row['manufacturer']],  # y-waarden zijn constant (voor elke fabrikant)
-         mode='lines',  # Lijnmodus om een staaf te maken
-         line=dict(color='lightblue', width=6),  # Lichtblauwe lijn voor de staaf
-         name=row['manufacturer']
-     ))
- 
-     # Voeg een markering toe voor de gemiddelde waarde met het aantal waarnemingen als hover-informatie
-     fig.add_trace(go.Scatter(
-         x=[row['lasmax_dB']],  # x-positie van de markering
-         y=[row['manufacturer']],  # y-positie van de markering
-         mode='markers',  # Alleen markeringen (punten)
-         marker=dict(color='blue', size=10, symbol='circle'),  # Markering in blauw
-         name=f"Gemiddeld: {row['manufacturer']}",
-         hoverinfo='text',  # Zet hover-informatie aan
-         hovertext=[f"Gemiddeld: {row['lasmax_dB']:.2f} dB<br>Waarnemingen: {row['count']}"],  # Hover tekst met gemiddelde en aantal waarnemingen
-         showlegend=False  # Verberg de legenda voor de markeringen
-     ))
- 
- # Pas de layout aan voor betere zichtbaarheid van labels en de x-as
- fig.update_layout(
-     yaxis={'tickmode': 'array'},  # Zorg ervoor dat alle fabrikanten zichtbaar zijn
-     margin={"l": 200, "r": 20, "t": 50, "b": 100},  # Vergroot de marge om ruimte te maken voor labels
-     width=1000,  # Pas de breedte aan om de grafiek compacter te maken
-     height=600,  # Pas de hoogte aan om de grafiek compacter te maken
-     xaxis_title='Geluidniveaus (dB)',  # Toevoegen van titel aan de x-as
-     yaxis_title='Fabrikant',  # Toevoegen van titel aan de y-as
-     showlegend=False,  # Verwijder de legenda aan de rechterkant
-     xaxis=dict(
-         range=[top_manufacturers['min'].min() - 5, top_manufacturers['max'].max() + 5]  # Stel de x-as limieten in zodat alles zichtbaar is
-     ),
-     paper_bgcolor='white',  # Achtergrondkleur instellen als wit
-     plot_bgcolor='white',  # Achtergrondkleur grafiek instellen als wit
- )
- 
- # Draai de y-as labels zodat ze beter leesbaar zijn
- fig.update_layout(
-     yaxis_tickangle=-45,  # Draai de y-as labels met -45 graden voor betere leesbaarheid
-     font=dict(size=12)  # Verklein het lettertype van de labels om ze beter leesbaar te maken
- )
- 
- # Toon de grafiek in de Streamlit interface
- st.plotly_chart(fig)
- 
- 
- ######################################################################################
- # Filter de rijen waar 'boeing' in de 'type' kolom staat
- boeing_data = data[data['type'].str.contains('Boeing', case=False, na=False)]
- 
- # Groepeer het type door alleen het eerste deel van het model te behouden (zoals 'Boeing 777')
- boeing_data['model'] = boeing_data['type'].str.extract(r'(Boeing \d+)')
- 
- # Groepeer nu op het nieuwe 'model' en bereken het gemiddelde geluidsniveau per model
- avg_sound_per_boeing_model = boeing_data.groupby('model')['lasmax_dB'].agg(['mean', 'min', 'max']).reset_index()
- 
- # Hernoem kolommen voor duidelijkheid
- avg_sound_per_boeing_model.columns = ['model', 'lasmax_dB', 'min_lasmax_dB', 'max_lasmax_dB']
- 
- # Sorteer op gemiddeld geluidsniveau
- avg_sound_per_boeing_model = avg_sound_per_boeing_model.sort_values(by='lasmax_dB', ascending=False)
- 
- # Maak een lege figuur aan voor de grafiek
- fig = go.Figure()
- 
- # Voeg een enkele staaf toe die begint bij de minimum waarde en eindigt bij de maximum waarde
- for i, row in avg_sound_per_boeing_model.iterrows():
-     fig.add_trace(go.Scatter(
-         x=[row['min_lasmax_dB'], row['max_lasmax_dB']],  # x-waarden van de staaf (min naar max)
-         y=[row['model'], row['model']],  # y-waarden zijn constant (voor elke fabrikant)
-         mode='lines',  # Lijnmodus om een staaf te maken
-         line=dict(color='lightblue', width=6),  # Lichtblauwe lijn voor de staaf
-         name=row['model']
-     ))
- 
-     # Voeg een markering toe voor de gemiddelde waarde
-     fig.add_trace(go.Scatter(
-         x=[row['lasmax_dB']],  # x-positie van de markering
-         y=[row['model']],  # y-positie van de markering
-         mode='markers',  # Markeringen (punt)
-         marker=dict(color='blue', size=10, symbol='circle'),  # Markering in blauw
-         name=f"Gemiddeld: {row['model']}",
-     ))
- 
- # Pas de layout aan voor betere zichtbaarheid van labels en de x-as
- fig.update_layout(
-     yaxis={'tickmode': 'array'},  # Zorg ervoor dat alle Boeing-modellen zichtbaar zijn
-     margin={"l": 200, "r": 20, "t": 50, "b": 100},  # Vergroot de marge om ruimte te maken voor labels
-     width=1000,  # Pas de breedte aan om de grafiek compacter te maken
-     height=600,  # Pas de hoogte aan om de grafiek compacter te maken
-     xaxis_title='Geluidniveaus (dB)',  # Toevoegen van titel aan de x-as
-     yaxis_title='Boeing Model',  # Toevoegen van titel aan de y-as
-     showlegend=False,  # Verwijder de legenda aan de rechterkant
-     xaxis=dict(
-         range=[avg_sound_per_boeing_model['min_lasmax_dB'].min() - 5, avg_sound_per_boeing_model['max_lasmax_dB'].max() + 5]  # Stel de x-as limieten in zodat alles zichtbaar is
-     ),
-     paper_bgcolor='white',  # Achtergrondkleur instellen als wit
-     plot_bgcolor='white',  # Achtergrondkleur grafiek instellen als wit
- )
- 
- # Draai de y-as labels zodat ze beter leesbaar zijn
- fig.update_layout(
-     yaxis_tickangle=-45,  # Draai de y-as labels met -45 graden voor betere leesbaarheid
-     font=dict(size=12)  # Verklein het lettertype van de labels om ze beter leesbaar te maken
- )
- 
- # Toon de grafiek in de Streamlit interface
- st.title("Gemiddeld Geluidsniveau per Boeing Model")
- st.plotly_chart(fig)
 
 #################################################################################################################
 
 # Inhoud voor Tabblad 2
+# Mockdata voor 10 vliegtuigen
+def get_mock_data():
+    data = pd.DataFrame({
+        'time': pd.date_range(start="2025-01-01", periods=10, freq='D'),  # 10 vliegtuigen
+        'vliegtuig_type': ['Boeing 737-800', 'Embraer ERJ 170-200 STD', 'Embraer ERJ 190-100 STD', 
+                           'Boeing 737-700', 'Airbus A320 214', 'Boeing 777-300ER', 
+                           'Boeing 737-900', 'Boeing 777-200', 'Airbus A319-111', 'Boeing 787-9'],
+        'SEL_dB': [85, 90, 95, 100, 92, 88, 91, 96, 99, 93],
+    })
+    return data
+
+# Stel vliegtuigcapaciteit in
+vliegtuig_capaciteit = {
+    'Boeing 737-800': {'passagiers': 189, 'vracht_ton': 20},
+    'Embraer ERJ 170-200 STD': {'passagiers': 80, 'vracht_ton': 7},
+    'Embraer ERJ 190-100 STD': {'passagiers': 98, 'vracht_ton': 8},
+    'Boeing 737-700': {'passagiers': 130, 'vracht_ton': 17},
+    'Airbus A320 214': {'passagiers': 180, 'vracht_ton': 20},
+    'Boeing 777-300ER': {'passagiers': 396, 'vracht_ton': 60},
+    'Boeing 737-900': {'passagiers': 220, 'vracht_ton': 25},
+    'Boeing 777-200': {'passagiers': 314, 'vracht_ton': 50},
+    'Airbus A319-111': {'passagiers': 156, 'vracht_ton': 16},
+    'Boeing 787-9': {'passagiers': 296, 'vracht_ton': 45}  # Toegevoegd vliegtuigtype
+}
+
+
+@st.fragment
+@gemeten
+def passagiers_load_factor(data, naam='sensornet'):
+    # Het hele raster van load factors, één keer per proces berekend tot er nieuwe events zijn
+    geluid_grid = gedeeld_geluid_grid(naam, data, vliegtuig_capaciteit)
+
+    # De slider zoekt alleen de voorberekende waarden op (standaard 85% van de capaciteit)
+    load_factor = st.slider('Load factor', 0.5, 1.0, 0.85, 0.01)
+
+    # Sorteer de resultaten van de 10 meest gebruikte vliegtuigtypes
+    top_10_types = geluid_grid.per_type_bij(load_factor).nlargest(10, 'aantal')
+    resultaten_sorted_passagier = top_10_types.sort_values(by='geluid_per_passagier')
+    resultaten_sorted_vracht = top_10_types.sort_values(by='geluid_per_vracht')
+
+    # Maak de grafieken
+    st.subheader('Grafieken --- Top 10 meest gebruikte vliegtuigen')
+
+    with span('seaborn_load_factor'):
+        fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+
+        # Geluid per Passagier
+        sns.barplot(x='vliegtuig_type', y='geluid_per_passagier', data=resultaten_sorted_passagier, palette='viridis', ax=axes[0])
+        axes[0].set_title('Geluid per Passagier per Vliegtuigtype (Met Load Factor)', fontsize=14)
+        axes[0].set_xlabel('Vliegtuigtype', fontsize=12)
+        axes[0].set_ylabel('Geluid per Passagier (dB)', fontsize=12)
+        axes[0].tick_params(axis='x', rotation=45)
+
+        # Geluid per Ton Vracht
+        sns.barplot(x='vliegtuig_type', y='geluid_per_vracht', data=resultaten_sorted_vracht, palette='viridis', ax=axes[1])
+        axes[1].set_title('Geluid per Ton Vracht per Vliegtuigtype (Zonder Load Factor bij Vracht)', fontsize=14)
+        axes[1].set_xlabel('Vliegtuigtype', fontsize=12)
+        axes[1].set_ylabel('Geluid per Ton Vracht (dB)', fontsize=12)
+        axes[1].tick_params(axis='x', rotation=45)
+
+        # Pas de lay-out aan voor betere zichtbaarheid
+        plt.tight_layout()
+
+        # Toon de grafiek in Streamlit
+        st.pyplot(fig)
+
+    # Groeperen op passagiers aantal en vergelijken
+    st.subheader('Vergelijking van Vliegtuigen op Basis van Passagiersaantal')
+
+    # Maak de grafiek voor de categorisatie uit de voorberekende boxen per passagierscategorie
+    with span('seaborn_categorie'):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        boxen = ax.bxp(geluid_grid.boxen_bij(load_factor), patch_artist=True)
+        for box, kleur in zip(boxen['boxes'], sns.color_palette('Set2')):
+            box.set_facecolor(kleur)
+
+        ax.set_title('Vergelijking van Geluid per Passagier per Passagierscategorie', fontsize=16)
+        ax.set_xlabel('Passagierscategorie', fontsize=12)
+        ax.set_ylabel('Geluid per Passagier (dB)', fontsize=12)
+        ax.tick_params(axis='x', rotation=45)
+
+        # Toon de grafiek in Streamlit
+        st.pyplot(fig)
+
+
+@st.fragment
+@gemeten
+def passagiers_categorie(average_decibels_by_aircraft):
+    # Maak een dropdownmenu voor passagierscategorieën
+    categories = ['0-100 Passagiers', '101-150 Passagiers', '151-200 Passagiers', '201-300 Passagiers', '301+ Passagiers']
+    selected_category = st.selectbox('Selecteer een passagierscategorie:', categories)
+
+    # Filter de data op basis van de geselecteerde categorie
+    category_data = average_decibels_by_aircraft[average_decibels_by_aircraft['categorie'] == selected_category]
+
+    # Sorteer de data op passagiersaantal
+    category_data = category_data.sort_values(by='Passagiers', ascending=False)
+
+    # Maak een interactieve grafiek met Plotly
+    fig = px.bar(
+        category_data,
+        x='Gemiddeld_SEL_dB',
+        y='type',
+        orientation='h',
+        color='Passagiers',
+        labels={'type': 'Vliegtuig Type', 'Gemiddeld_SEL_dB': 'Gemiddeld SEL_dB', 'Passagiers': 'Aantal Passagiers'},
+        title=f'Gemiddeld Geluid (SEL_dB) voor {selected_category}',
+        hover_data=['Gemiddeld_SEL_dB', 'Passagiers']
+    )
+
+    # Stel de x-aslimieten in
+    fig.update_layout(xaxis=dict(range=[70, 85]))
+
+    # Toon de interactieve grafiek in Streamlit
+    st.plotly_chart(fig)
+
+
+def sensornet_kubus_cellen(data):
+    # Werk de gedeelde aggregaatkubus bij, alleen nieuwe events worden geaggregeerd
+    kubus = gedeelde_kubus('sensornet')
+    kubus.bij_werken(data)
+
+    # Voeg passagiersinformatie en -categorie toe uit de typedimensie (gekoppeld via de typecode)
+    kubus_cellen = kubus.cellen_met(['passagiers', 'passagiers_categorie'])
+
+    # Filter de kubuscellen om alleen vliegtuigen te behouden waarvan de capaciteit bekend is
+    kubus_cellen = kubus_cellen[kubus_cellen['passagiers'].notna()]
+    return kubus_cellen
+
+
+@gemeten
+def tab_passagiers(data):
+    # Streamlit UI
+    st.title('Geluid per Passagier en Vracht per Vliegtuigtype')
+    st.markdown('Deze applicatie berekent en toont het geluid per passagier en per ton vracht voor verschillende vliegtuigtypes, gebaseerd op gegevens uit de luchtvaart. Hieronder zijn de grafieken van de top 10 meest gebruikte vliegtuigen')
+
+    if data is None:
+        # Geen API en geen lokale kopie: alleen de load-factorgrafieken, op mockdata.
+        # De mockdata gaat niet in de gedeelde kubus of statistieken.
+        st.warning('De API is niet bereikbaar en er is nog geen lokale kopie; de grafieken hieronder gebruiken mockdata.')
+        passagiers_load_factor(get_mock_data(), 'mockdata')
+        return
+
+    # Slider en grafieken per load factor (eigen fragment)
+    passagiers_load_factor(data)
+
+    # Controleer of de kolom 'type' bestaat
+    if 'type' not in data.columns:
+        st.error("De kolom 'type' bestaat niet in de dataset. Controleer de kolomnamen en pas de code aan.")
+        return
+
+    kubus_cellen = sensornet_kubus_cellen(data)
+
+    # Bereken de gemiddelde SEL_dB per vliegtuigtype
+    average_decibels_by_aircraft = rollup(kubus_cellen, ['type', 'passagiers', 'passagiers_categorie'], 'SEL_dB').rename(
+        columns={'mean': 'Gemiddeld_SEL_dB', 'passagiers': 'Passagiers', 'passagiers_categorie': 'categorie'}
+    )
+
+    # Dropdown en staafdiagram per passagierscategorie (eigen fragment)
+    passagiers_categorie(average_decibels_by_aircraft)
+
+    # Bar Chart: Gemiddeld Geluid per Passagierscategorie
+    # Scatterplot: Correlatie tussen passagiers en gemiddeld geluid
+    st.subheader("Scatterplot: Correlatie tussen Passagiers en Geluid")
+    fig_scatter_plot = px.scatter(
+        average_decibels_by_aircraft,
+        x='Passagiers',
+        y='Gemiddeld_SEL_dB',
+        color='categorie',
+        labels={'Passagiers': 'Aantal Passagiers', 'Gemiddeld_SEL_dB': 'Gemiddeld SEL_dB'},
+        title='Correlatie tussen Geluid en Aantal Passagiers',
+        hover_data=['type']
+    )
+    st.plotly_chart(fig_scatter_plot, use_container_width=True, key="scatter_plot")
+
+    # Stel de gewenste volgorde van de categorieën in
+    category_order = ['0-100 Passagiers', '101-150 Passagiers', '151-200 Passagiers', '201-300 Passagiers', '301+ Passagiers']
+
+    st.subheader("Boxplot: Spreiding van Geluid per Passagierscategorie")
+
+    # Verdeling van alle events per categorie uit de samenvoegbare statistieken per vliegtuigtype
+    sel_statistieken = gedeelde_statistieken('sensornet_SEL_dB')
+    sel_statistieken.bij_werken(data, 'type', 'SEL_dB')
+    type_categorie = koppel_type_dimensie(pd.DataFrame({'type': sel_statistieken.groepen}), ['passagiers_categorie'])
+    box_per_categorie = sel_statistieken.samenvoegen(
+        dict(zip(type_categorie['type'], type_categorie['passagiers_categorie']))
+    ).box_statistieken().set_index('groep')
+
+    fig_box_plot = go.Figure([
+        go.Box(
+            name=categorie, q1=[rij['q1']], median=[rij['median']], q3=[rij['q3']],
+            lowerfence=[rij['lowerfence']], upperfence=[rij['upperfence']],
+            mean=[rij['mean']], sd=[rij['std']],
+        )
+        for categorie, rij in box_per_categorie.reindex(category_order).dropna(subset=['count']).iterrows()
+    ])
+    fig_box_plot.update_layout(
+        title='Spreiding van Geluid per Passagierscategorie',
+        xaxis_title='Passagierscategorie', yaxis_title='SEL_dB', showlegend=False,
+    )
+
+    st.plotly_chart(fig_box_plot, use_container_width=True, key="box_plot")
+
+
+def sensornet_blootstelling(data):
+    # Werk de lopende energiesommen per meetpunt en dag bij, alleen nieuwe events worden opgeteld
+    blootstelling = gedeelde_blootstelling('sensornet')
+    blootstelling.bij_werken(data)
+    return blootstelling
+
+
+@st.fragment
+@gemeten
+def geluidsbelasting(blootstelling):
+    st.subheader("Geluidsbelasting per Meetpunt (Lden, Lday, Levening, Lnight)")
+    periode = st.radio('Periode:', ['Per dag', '7 dagen', '30 dagen', 'Per jaar'], horizontal=True)
+    niveau = st.selectbox('Niveau:', NIVEAU_KOLOMMEN, index=NIVEAU_KOLOMMEN.index('Lden'))
+
+    # Energetisch gemiddeld uit SELd/SELe/SELn/SELden, niet het rekenkundige gemiddelde van SEL_dB
+    if periode == 'Per jaar':
+        tabel = blootstelling.per_jaar()
+        st.dataframe(tabel.round({kolom: 1 for kolom in NIVEAU_KOLOMMEN}), hide_index=True, use_container_width=True)
+        return
+    if periode == 'Per dag':
+        reeks = blootstelling.per_dag()
+    else:
+        reeks = blootstelling.voortschrijdend(int(periode.split()[0]))
+
+    fig_niveau = px.line(
+        reeks,
+        x='date',
+        y=niveau,
+        color='location_short',
+        labels={'date': 'Datum', niveau: f'{niveau} (dB)', 'location_short': 'Meetpunt'},
+        title=f'{niveau} per Meetpunt ({periode.lower()})'
+    )
+    st.plotly_chart(fig_niveau, use_container_width=True, key="niveau_chart")
+
+    # De laatste waarde per meetpunt
+    laatste = reeks.sort_values('date').groupby('location_short', observed=True).tail(1)
+    st.dataframe(laatste.round({kolom: 1 for kolom in NIVEAU_KOLOMMEN}), hide_index=True, use_container_width=True)
+
+
+# Inhoud voor Tabblad 3
+@gemeten
+def tab_geluidsoverzicht(kubus_cellen, blootstelling):
+    # Line Chart: Tijdreeksanalyse van gemiddeld geluid
+    st.subheader("Lijngrafiek: Tijdreeksanalyse van Gemiddeld Geluid")
+    time_series = rollup(kubus_cellen, ['date'], 'SEL_dB').rename(columns={'mean': 'Gemiddeld_SEL_dB'})
+    fig_line_chart = px.line(
+        time_series,
+        x='date',
+        y='Gemiddeld_SEL_dB',
+        labels={'date': 'Datum', 'Gemiddeld_SEL_dB': 'Gemiddeld SEL_dB'},
+        title='Tijdreeksanalyse van Gemiddeld Geluid'
+    )
+    st.plotly_chart(fig_line_chart, use_container_width=True, key="line_chart")
+
+    # Lden en de deelperiodes per meetpunt, per dag, voortschrijdend en per jaar (eigen fragment)
+    geluidsbelasting(blootstelling)
+
+    # Bar Chart: Gemiddeld Geluid per Weekdag
+    st.subheader("Bar Chart: Gemiddeld Geluid per Weekdag")
+
+    # Bereken het gemiddelde SEL_dB per weekdag uit de kubus
+    weekday_data = rollup(kubus_cellen, ['weekday'], 'SEL_dB').rename(columns={'mean': 'Gemiddeld_SEL_dB'})
+    weekday_data['weekday'] = np.array(WEEKDAGEN)[weekday_data['weekday']]
+
+    # Sorteer de weekdagen in de juiste volgorde
+    weekday_order = ['Sunday', 'Saturday', 'Friday', 'Thursday', 'Wednesday', 'Tuesday', 'Monday'] 
+    weekday_data['weekday'] = pd.Categorical(weekday_data['weekday'], categories=weekday_order, ordered=True)
+    weekday_data = weekday_data.sort_values('weekday')
+
+    # Maak de bar chart
+    fig_weekday_chart = px.bar(
+        weekday_data,
+        x='Gemiddeld_SEL_dB',
+        y='weekday',
+        labels={'weekday': 'Weekdag', 'Gemiddeld_SEL_dB': 'Gemiddeld SEL_dB'},
+        title='Gemiddeld Geluid (SEL_dB) per Weekdag',
+        color='Gemiddeld_SEL_dB',
+        color_continuous_scale='Viridis'
+    )
+
+    # Stel de limieten van de x-as in op 60 tot 80
+    fig_weekday_chart.update_layout(
+        xaxis=dict(
+            range=[70, 85]  # Limiet van de x-as van 60 tot 80
+        )
+    )
+
+    # Toon de chart
+    st.plotly_chart(fig_weekday_chart, use_container_width=True, key="weekday_chart")
+
+
+# Inhoud voor Tabblad 4
+def sensornet_geluidskaart(sensornet, track_store):
+    geluidskaart = gedeelde_geluidskaart('sensornet')
+    if geluidskaart.cellen is not None:
+        return geluidskaart
+
+    # No precomputed map in the store (see batch_aggregaten.py): build one from the events of this page.
+    # Only events after the map's high-water mark are matched, so a rerun without new events does no work.
+    geluidskaart = gedeelde_geluidskaart('geluidsdetectie')
+    nieuw, _ = na_high_water_mark(sensornet, geluidskaart.tot_tijd, geluidskaart.tot_id)
+    if nieuw.empty:
+        return geluidskaart
+    tracks = track_store.load(
+        columns=['FlightNumber', 'Time', 'Latitude', 'Longitude'],
+        filters=[('Time', '>=', nieuw['time'].min() - DEFAULT_TOLERANTIE),
+                 ('Time', '<=', nieuw['time'].max() + DEFAULT_TOLERANTIE)],
+    )
+    # Events without a track position fall outside the grid, but still move the high-water mark
+    geluidskaart.bij_werken(koppel_events_aan_tracks(nieuw, tracks, track_kolommen=('Latitude', 'Longitude')))
+    return geluidskaart
+
+
+@gemeten
+def tab_geluidsdetectie():
+    # Titel van de Streamlit app
+    st.title("Geluidsdetectie in Kudelstaartseweg")
+
+    # -------------------------------------------------------------------------
+    # 1) READ CSVs (TYPED, ONE SHARED COPY PER PROCESS)
+    # -------------------------------------------------------------------------
+    def load_data():
+        sensornet = lees_csv('my_data.csv', SENSORNET_SCHEMA, compacteren=True)           # Sensor data (includes 'time', 'callsign', 'type', 'distance', 'lasmax_dB', etc.)
+        return sensornet
+
+    # Flight data (has the coordinates): only points not seen in earlier scrapes are added to the track store
+    track_store = TrackStore()
+    track_store.ingest('40_Vluchten.csv')
+    sensornet = load_data()
+
+
+    # -------------------------------------------------------------------------
+    # 2) TIMEZONE NORMALIZE (sensor times are local Dutch time, convert to UTC)
+    # -------------------------------------------------------------------------
+    sensornet['time'] = tijden(sensornet).dt.tz_localize('Europe/Amsterdam').dt.tz_convert('UTC')
+
+    # -------------------------------------------------------------------------
+    # 5b) NOISE EXPOSURE HEATMAP DATA (see sensornet_geluidskaart)
+    # -------------------------------------------------------------------------
+    geluidskaart = sensornet_geluidskaart(sensornet, track_store)
+
+    # -------------------------------------------------------------------------
+    # 6) DEFINE FLIGHTS + COLORS, LOAD THEIR TRACKS
+    # -------------------------------------------------------------------------
+    flight_numbers = ["KLM1342", "PGT1259"]
+    colors = ["blue", "red"]
+    df = track_store.load(flights=flight_numbers)
+
+    # Keep only points within 20 km of Schiphol (bounding box first, then exact haversine)
+    df_near = df[binnen_straal(df['Latitude'], df['Longitude'], SCHIPHOL_LAT, SCHIPHOL_LON, 20)]
+
+    # Nearest noise monitor for every flight point, in one vectorized query on the sensor registry
+    sensor_register = gedeeld_register()
+    dichtstbij = sensor_register.dichtstbijzijnde(df_near['Latitude'], df_near['Longitude'])
+    sensor_namen = dict(zip(sensor_register.sensoren['code'], sensor_register.sensoren['naam']))
+    df_near = df_near.assign(
+        sensor=dichtstbij['sensor'].map(sensor_namen),
+        sensor_afstand_km=dichtstbij['afstand_km'],
+    )
+
+    # Join every sensor event to its flight on the 1 s track grid (interpolated, gaps not bridged) in one pass
+    koppelingen = koppel_events_aan_tracks(
+        sensornet, herbemonster(df), tolerantie=None, track_kolommen=('Latitude', 'Longitude'),
+    )
+    # Slant distance at closest approach within each event window, from the event's own monitor
+    nadering = dichtste_nadering(sensornet, df)
+    koppelingen = koppelingen.assign(cpa_afstand_m=nadering['cpa_afstand_m'].reindex(koppelingen.index))
+
+    # Map with the noise map controls, flight paths, sensors and markers (own fragment)
+    geluidsdetectie_kaart(geluidskaart, df_near, koppelingen, dict(zip(flight_numbers, colors)))
+
+
+@st.fragment
+@gemeten
+def geluidsdetectie_kaart(geluidskaart, df_near, koppelingen, kleuren):
+    # -------------------------------------------------------------------------
+    # 5) BUILD THE BASE MAP
+    #    (the whole map is one fragment: the noise map controls only rerun the map)
+    # -------------------------------------------------------------------------
+    kaart_dagen = ['All days'] + [f'{dag:%Y-%m-%d}' for dag in geluidskaart.dagen()]
+    kaart_dag = st.selectbox('Noise map day', kaart_dagen)
+    kaart_uren = st.slider('Noise map hours (UTC)', 0, 23, (0, 23))
+
+    MAP_ZOOM = 11.5
+    # Draw vector layers on one canvas instead of an SVG element per shape
+    m = folium.Map(location=[52.235, 4.748], zoom_start=MAP_ZOOM, prefer_canvas=True)
+
+    # 20 km circle around Schiphol
+    folium.Circle(
+        location=[SCHIPHOL_LAT, SCHIPHOL_LON],
+        radius=20000,
+        color='lightgray',
+        fill=True,
+        fill_color='black',
+        fill_opacity=0
+    ).add_to(m)
+
+    # -------------------------------------------------------------------------
+    # 5b) NOISE EXPOSURE HEATMAP (energy sum of SEL_dB per grid cell, one image overlay)
+    # -------------------------------------------------------------------------
+    dag = None if kaart_dag == 'All days' else kaart_dag
+    uren = None if kaart_uren == (0, 23) else range(kaart_uren[0], kaart_uren[1] + 1)
+    voeg_geluidskaart_toe(m, geluidskaart, van=dag, tot=dag, uren=uren)
+
+    # -------------------------------------------------------------------------
+    # 6) PLOT THE FLIGHT PATHS
+    #    (one simplified GeoJSON line layer and one dot layer for all flights,
+    #     popups show time and altitude per dot)
+    # -------------------------------------------------------------------------
+    voeg_vluchten_toe(m, df_near, kleuren, zoom=MAP_ZOOM)
+
+    # -------------------------------------------------------------------------
+    # 7) ADD STATIONARY SENSORS (all monitors in sensoren.csv, including Kudelstaartseweg)
+    # -------------------------------------------------------------------------
+    sensors = gedeeld_register().sensoren[['naam', 'lat', 'lon']].itertuples(index=False)
+
+    for i, (name, lat, lon) in enumerate(sensors):
+        # For Kudelstaartseweg, use the PNG marker
+        if name == "Kudelstaartseweg":
+            folium.Marker(
+                location=[lat, lon],
+                icon=folium.CustomIcon(
+                   icon_image='sound-sensor2.png', 
+                    icon_size=(50, 50)
+                ),
+                popup=f"Sensor: {name}"
+            ).add_to(m)
+        else:
+            color = "darkorange"
+            marker_html = f"""
+            <div style="border-radius: 50%; background-color: {color};
+                        width: 30px; height: 30px;
+                        display: flex; align-items: center; justify-content: center;">
+                <span style="font-weight: bold; color: black;">{name[:2]}</span>
+            </div>
+            """
+            folium.Marker(
+                location=[lat, lon],
+                icon=folium.DivIcon(
+                    icon_size=(30,30),
+                    icon_anchor=(15,15),
+                    html=marker_html
+                ),
+                popup=f"Sensor: {name}"
+            ).add_to(m)
+
+    # -------------------------------------------------------------------------
+    # 8) CREATE MARKERS FOR EACH FLIGHT AT CLOSEST-TIME MATCH,
+    #    OFFSET THEM, AND DRAW DASHED LINE.
+    #    MARKER COLOR MATCHES THE FLIGHT PATH, DISPLAYS lasmax_dB INSIDE THE ICON,
+    #    AND THE POPUP SHOWS SENSOR DATA: time, type, distance (m), and callsign.
+    # -------------------------------------------------------------------------
+    def add_closest_time_marker(flight, color, koppelingen, folium_map, offset_lat=0.0, offset_lon=0.0):
+        """
+        For a given flight, take its first sensor event from 'koppelingen' (the sensor
+        events already joined to their flight's 1 s track grid), place a marker at an
+        offset location, and draw a dashed line from that offset to the real lat/lon.
+
+        The marker icon shows the 'lasmax_dB' (rounded, with "dB").
+        The popup displays sensor data (from the selected row) with keys in bold:
+          - Time, Type, Distance (m), Callsign.
+        """
+        sensor_rows = koppelingen[(koppelingen['callsign'] == flight) & koppelingen['Latitude'].notna()]
+        if sensor_rows.empty:
+            return
+
+        sensor_row = sensor_rows.iloc[0]
+        sensor_time_str = f"{sensor_row['time']:%H:%M:%S}"
+        lasmax_value = sensor_row.get('lasmax_dB', None)
+        sensor_type = sensor_row.get('type', 'N/A')
+        sensor_distance = sensor_row.get('distance', 'N/A')
+        sensor_callsign = sensor_row.get('callsign', 'N/A')
+        cpa_afstand = sensor_row.get('cpa_afstand_m', np.nan)
+
+        lat_real = sensor_row['Latitude']
+        lon_real = sensor_row['Longitude']
+
+        lat_marker = lat_real + offset_lat
+        lon_marker = lon_real + offset_lon
+
+        if pd.notnull(lasmax_value):
+            lasmax_rounded = int(round(lasmax_value))
+        else:
+            lasmax_rounded = "N/A"
+
+        marker_html = f"""
+        <div style="border-radius: 50%; background-color: {color};
+                    width: 40px; height: 40px;
+                    display: flex; align-items: center; justify-content: center;
+                    font-weight: bold; color: white;">
+            {lasmax_rounded} dB
+        </div>
+        """
+
+        popup_text = (
+            f"<b>Flight:</b> {flight}<br>"
+            f"<b>Time:</b> {sensor_time_str} UTC<br>"
+            f"<b>Type:</b> {sensor_type}<br>"
+            f"<b>Distance:</b> {sensor_distance} m<br>"
+        )
+        if pd.notnull(cpa_afstand):
+            popup_text += f"<b>Closest approach:</b> {cpa_afstand:.0f} m<br>"
+
+        folium.Marker(
+            location=[lat_marker, lon_marker],
+            icon=folium.DivIcon(
+                icon_size=(40,40),
+                icon_anchor=(20,20),
+                html=marker_html
+            ),
+            popup=popup_text
+        ).add_to(folium_map)
+
+        folium.PolyLine(
+            locations=[(lat_marker, lon_marker), (lat_real, lon_real)],
+            weight=2,
+            color=color,
+            dash_array='5,5'
+        ).add_to(folium_map)
+
+    # Offsets dictionary (adjust as needed for more flights)
+    offsets = {
+        "KLM1342": (0.0025, 0.0075),   # shift ~30m north
+        "PGT1259": (0.0025, -0.0075)   # shift ~30m south
+    }
+
+    for fn, col in kleuren.items():
+        off_lat, off_lon = offsets.get(fn, (0.0, 0.0))
+        add_closest_time_marker(fn, col, koppelingen, m, offset_lat=off_lat, offset_lon=off_lon)
+
+    # -------------------------------------------------------------------------
+    # 9) ADD A LEGEND TO THE MAP
+    # -------------------------------------------------------------------------
+    legend_html = '''
+         <div style="position: fixed; 
+                     bottom: 50px; left: 50px; width: 150px; height: 90px; 
+                     border:2px solid grey; z-index:9999; font-size:14px;
+                     background-color:white;
+                     opacity: 0.8;
+                     padding: 10px;">
+         <b>Flight Legend</b><br>
+         <i style="color:blue;">&#9632;</i>&nbsp;KLM1342<br>
+         <i style="color:red;">&#9632;</i>&nbsp;PGT1259
+         </div>
+         '''
+    m.get_root().html.add_child(folium.Element(legend_html))
+
+    # -------------------------------------------------------------------------
+    # 10) DISPLAY THE MAP IN STREAMLIT
+    # -------------------------------------------------------------------------
+    with span('folium_render'):
+        folium_static(m)
+
+
+with tab1:
+    tab_fabrikanten(laad_data_klein())
+
+# Eén keer ophalen voor tabblad 2 en 3; None als de API niet bereikbaar is en er geen lokale kopie is
+sensornet = get_events(DASHBOARD_QUERY)
+
 with tab2:
-   # Cache de gegevensophaal functie om onnodige herhalingen van verzoeken te voorkomen
-   @st.cache_data
-   def fetch_data():
-       url = 'https://sensornet.nl/dataserver3/event/collection/nina_events/stream?conditions%5B0%5D%5B%5D=time&conditions%5B0%5D%5B%5D=%3E%3D&conditions%5B0%5D%5B%5D=1735689600&conditions%5B1%5D%5B%5D=time&conditions%5B1%5D%5B%5D=%3C&conditions%5B1%5D%5B%5D=1742774400&conditions%5B%5D%5B%5D=label&conditions%5B%5D%5B%5D=in&conditions%5B%5D%5B%5D=21&conditions%5B%5D%5B%5D=32&conditions%5B%5D%5B%5D=33&conditions%5B%5D%5B%5D=34&args%5B%5D=aalsmeer&args%5B%5D=schiphol&fields%5B%5D=time&fields%5B%5D=location_short&fields%5B%5D=location_long&fields%5B%5D=duration&fields%5B%5D=SEL&fields%5B%5D=SELd&fields%5B%5D=SELe&fields%5B%5D=SELn&fields%5B%5D=SELden&fields%5B%5D=SEL_dB&fields%5B%5D=lasmax_dB&fields%5B%5D=callsign&fields%5B%5D=type&fields%5B%5D=altitude&fields%5B%5D=distance&fields%5B%5D=winddirection&fields%5B%5D=windspeed&fields%5B%5D=label&fields%5B%5D=hex_s&fields%5B%5D=registration&fields%5B%5D=icao_type&fields%5B%5D=serial&fields%5B%5D=operator&fields%5B%5D=tags'
-       
-       try:
-           response = requests.get(url)
-           response.raise_for_status()  # Zorgt ervoor dat een HTTP-fout een uitzondering veroorzaakt
-           
-           if response.status_code == 200:
-               colnames = pd.DataFrame(response.json()['metadata'])
-               data = pd.DataFrame(response.json()['rows'])
-               data.columns = colnames.headers
-               data['time'] = pd.to_datetime(data['time'], unit='s')
-               return data
-           else:
-               return None  # Als er een fout is, geef dan geen data terug
-               
-       except requests.exceptions.RequestException:
-           return None  # Als er een netwerkfout of andere fout is, geef dan ook geen data terug
-   
-   # Mockdata voor 10 vliegtuigen
-   def get_mock_data():
-       data = pd.DataFrame({
-           'time': pd.date_range(start="2025-01-01", periods=10, freq='D'),  # 10 vliegtuigen
-           'vliegtuig_type': ['Boeing 737-800', 'Embraer ERJ 170-200 STD', 'Embraer ERJ 190-100 STD', 
-                              'Boeing 737-700', 'Airbus A320 214', 'Boeing 777-300ER', 
-                              'Boeing 737-900', 'Boeing 777-200', 'Airbus A319-111', 'Boeing 787-9'],
-           'SEL_dB': [85, 90, 95, 100, 92, 88, 91, 96, 99, 93],
-       })
-       return data
-   
-   # Cache de berekeningen van geluid per passagier en vracht
-   @st.cache_data
-   def bereken_geluid_per_passagier_en_vracht(data, vliegtuig_capaciteit, load_factor):
-       results = []
-   
-       for _, row in data.iterrows():
-           vliegtuig_type = row['vliegtuig_type']
-           if vliegtuig_type in vliegtuig_capaciteit:
-               sel_dB = row['SEL_dB']
-               passagiers = vliegtuig_capaciteit[vliegtuig_type]['passagiers']
-               vracht_ton = vliegtuig_capaciteit[vliegtuig_type]['vracht_ton']
-               
-               passagiers_bezet = passagiers * load_factor
-               geluid_per_passagier = sel_dB / passagiers_bezet if passagiers_bezet != 0 else np.nan
-               geluid_per_vracht = sel_dB / vracht_ton if vracht_ton != 0 else np.nan
-               
-               results.append({
-                   'vliegtuig_type': vliegtuig_type,
-                   'passagiers': passagiers,
-                   'geluid_per_passagier': geluid_per_passagier,
-                   'geluid_per_vracht': geluid_per_vracht
-               })
-   
-       return pd.DataFrame(results)
-   
-   # Stel vliegtuigcapaciteit in
-   vliegtuig_capaciteit = {
-       'Boeing 737-800': {'passagiers': 189, 'vracht_ton': 20},
-       'Embraer ERJ 170-200 STD': {'passagiers': 80, 'vracht_ton': 7},
-       'Embraer ERJ 190-100 STD': {'passagiers': 98, 'vracht_ton': 8},
-       'Boeing 737-700': {'passagiers': 130, 'vracht_ton': 17},
-       'Airbus A320 214': {'passagiers': 180, 'vracht_ton': 20},
-       'Boeing 777-300ER': {'passagiers': 396, 'vracht_ton': 60},
-       'Boeing 737-900': {'passagiers': 220, 'vracht_ton': 25},
-       'Boeing 777-200': {'passagiers': 314, 'vracht_ton': 50},
-       'Airbus A319-111': {'passagiers': 156, 'vracht_ton': 16},
-       'Boeing 787-9': {'passagiers': 296, 'vracht_ton': 45}  # Toegevoegd vliegtuigtype
-   }
-   
-   # Stel de load factor in (85% van de capaciteit)
-   load_factor = 0.85
-   
-   # Streamlit UI
-   st.title('Geluid per Passagier en Vracht per Vliegtuigtype')
-   st.markdown('Deze applicatie berekent en toont het geluid per passagier en per ton vracht voor verschillende vliegtuigtypes, gebaseerd op gegevens uit de luchtvaart. Hieronder zijn de grafieken van de top 10 meest gebruikte vliegtuigen')
-   
-   # Haal de gegevens op van de API of gebruik mockdata
-   data = fetch_data()
-   
-   if data is None:
-       data = get_mock_data()  # Gebruik mockdata als de API niet werkt
-   
-   # Voer de berekeningen uit
-   resultaten = bereken_geluid_per_passagier_en_vracht(data, vliegtuig_capaciteit, load_factor)
-   
-   # Sorteer de resultaten
-   resultaten_sorted_passagier = resultaten.sort_values(by='geluid_per_passagier')
-   resultaten_sorted_vracht = resultaten.sort_values(by='geluid_per_vracht')
-   
-   # Maak de grafieken
-   st.subheader('Grafieken --- Top 10 meest gebruikte vliegtuigen')
-   
-   fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-   
-   # Geluid per Passagier
-   sns.barplot(x='vliegtuig_type', y='geluid_per_passagier', data=resultaten_sorted_passagier, palette='viridis', ax=axes[0])
-   axes[0].set_title('Geluid per Passagier per Vliegtuigtype (Met Load Factor)', fontsize=14)
-   axes[0].set_xlabel('Vliegtuigtype', fontsize=12)
-   axes[0].set_ylabel('Geluid per Passagier (dB)', fontsize=12)
-   axes[0].tick_params(axis='x', rotation=45)
-   
-   # Geluid per Ton Vracht
-   sns.barplot(x='vliegtuig_type', y='geluid_per_vracht', data=resultaten_sorted_vracht, palette='viridis', ax=axes[1])
-   axes[1].set_title('Geluid per Ton Vracht per Vliegtuigtype (Zonder Load Factor bij Vracht)', fontsize=14)
-   axes[1].set_xlabel('Vliegtuigtype', fontsize=12)
-   axes[1].set_ylabel('Geluid per Ton Vracht (dB)', fontsize=12)
-   axes[1].tick_params(axis='x', rotation=45)
-   
-   # Pas de lay-out aan voor betere zichtbaarheid
-   plt.tight_layout()
-   
-   # Toon de grafiek in Streamlit
-   st.pyplot(fig)
-   
-   # Groeperen op passagiers aantal en vergelijken
-   st.subheader('Vergelijking van Vliegtuigen op Basis van Passagiersaantal')
-   
-   # Categoriseer vliegtuigen op basis van passagiers
-   def categorize_by_passenger(passenger_count):
-       if passenger_count <= 100:
-           return '0-100 Passagiers'
-       elif passenger_count <= 150:
-           return '101-150 Passagiers'
-       elif passenger_count <= 200:
-           return '151-200 Passagiers'
-       else:
-           return '201+ Passagiers'
-   
-   resultaten['passagiers_categorie'] = resultaten['passagiers'].apply(categorize_by_passenger)
-   
-   # Maak de grafiek voor de categorisatie
-   plt.figure(figsize=(10, 6))
-   sns.boxplot(x='passagiers_categorie', y='geluid_per_passagier', data=resultaten, palette='Set2')
-   
-   plt.title('Vergelijking van Geluid per Passagier per Passagierscategorie', fontsize=16)
-   plt.xlabel('Passagierscategorie', fontsize=12)
-   plt.ylabel('Geluid per Passagier (dB)', fontsize=12)
-   plt.xticks(rotation=45)
-   
-   # Toon de grafiek in Streamlit
-   st.pyplot(plt)
-   
-   import streamlit as st
-   import pandas as pd
-   import plotly.express as px
-   import requests
-   
-   # Stel de maximale weergave van rijen in voor debugging
-   pd.set_option('display.max_rows', 100000)  # Verhoog het aantal weergegeven rijen
-   
-   # Cache de gegevensophaal functie om onnodige herhalingen van verzoeken te voorkomen
-   @st.cache_data
-   def fetch_data():
-       start_date = int(pd.to_datetime('2025-01-01').timestamp())
-       end_date = int(pd.to_datetime('2025-03-24').timestamp())
-       response = requests.get(f'https://sensornet.nl/dataserver3/event/collection/nina_events/stream?conditions%5B0%5D%5B%5D=time&conditions%5B0%5D%5B%5D=%3E%3D&conditions%5B0%5D%5B%5D={start_date}&conditions%5B1%5D%5B%5D=time&conditions%5B1%5D%5B%5D=%3C&conditions%5B1%5D%5B%5D={end_date}&conditions%5B2%5D%5B%5D=label&conditions%5B2%5D%5B%5D=in&conditions%5B2%5D%5B2%5D%5B%5D=21&conditions%5B2%5D%5B2%5D%5B%5D=32&conditions%5B2%5D%5B2%5D%5B%5D=33&conditions%5B2%5D%5B2%5D%5B%5D=34&args%5B%5D=aalsmeer&args%5B%5D=schiphol&fields%5B%5D=time&fields%5B%5D=location_short&fields%5B%5D=location_long&fields%5B%5D=duration&fields%5B%5D=SEL&fields%5B%5D=SELd&fields%5B%5D=SELe&fields%5B%5D=SELn&fields%5B%5D=SELden&fields%5B%5D=SEL_dB&fields%5B%5D=lasmax_dB&fields%5B%5D=callsign&fields%5B%5D=type&fields%5B%5D=altitude&fields%5B%5D=distance&fields%5B%5D=winddirection&fields%5B%5D=windspeed&fields%5B%5D=label&fields%5B%5D=hex_s&fields%5B%5D=registration&fields%5B%5D=icao_type&fields%5B%5D=serial&fields%5B%5D=operator&fields%5B%5D=tags')
-       colnames = pd.DataFrame(response.json()['metadata'])
-       data = pd.DataFrame(response.json()['rows'])
-       data.columns = colnames.headers
-       data['time'] = pd.to_datetime(data['time'], unit='s')
-       return data
-   
-   # Haal de dataset op
-   data = fetch_data()
-   
-   # Definieer passagierscategorieën
-   def categorize_by_passenger_count(passenger_count):
-       if passenger_count <= 100:
-           return '0-100 Passagiers'
-       elif 101 <= passenger_count <= 150:
-           return '101-150 Passagiers'
-       elif 151 <= passenger_count <= 200:
-           return '151-200 Passagiers'
-       elif 201 <= passenger_count <= 300:
-           return '201-300 Passagiers'
-       else:
-           return '301+ Passagiers'
-   
-   # Voeg passagierscategorieën toe aan vliegtuig_capaciteit_passagiersaantal
-   vliegtuig_capaciteit_passagiersaantal = {
-       'Boeing 737-800': {'passagiers': 189, 'vracht_ton': 20},
-       'Embraer ERJ 170-200 STD': {'passagiers': 80, 'vracht_ton': 7},
-       'Embraer ERJ190-100STD': {'passagiers': 98, 'vracht_ton': 8},
-       'Boeing 737-700': {'passagiers': 130, 'vracht_ton': 17},
-       'Airbus A320 214': {'passagiers': 180, 'vracht_ton': 20},
-       'Boeing 777-300ER': {'passagiers': 396, 'vracht_ton': 60},
-       'Boeing 737-900': {'passagiers': 220, 'vracht_ton': 25},
-       'Boeing 777-200': {'passagiers': 314, 'vracht_ton': 50},
-       'Airbus A319-111': {'passagiers': 156, 'vracht_ton': 16},
-       'Boeing 787-9': {'passagiers': 296, 'vracht_ton': 45},
-       'Airbus A320 214SL': {'passagiers': 180, 'vracht_ton': 20},
-       'Airbus SAS A330-203': {'passagiers': 277, 'vracht_ton': 45},
-       'Airbus A320 232SL': {'passagiers': 180, 'vracht_ton': 20},
-       'Airbus SAS A330-303': {'passagiers': 277, 'vracht_ton': 45},
-       'Boeing 737-8MAX': {'passagiers': 210, 'vracht_ton': 25},
-       'Airbus A321-232': {'passagiers': 220, 'vracht_ton': 30},
-       'Airbus A380 861': {'passagiers': 555, 'vracht_ton': 80},  # Aantal passagiers kan variëren afhankelijk van de configuratie
-       'Embraer ERJ190-100LR': {'passagiers': 98, 'vracht_ton': 8},
-       'Airbus A320 232': {'passagiers': 180, 'vracht_ton': 20},
-       'Embraer EMB-170 STD': {'passagiers': 70, 'vracht_ton': 7},
-       'Airbus A320-271N': {'passagiers': 180, 'vracht_ton': 20},
-       'Embraer EMB-195 LR': {'passagiers': 120, 'vracht_ton': 10},
-       'Airbus A320-251N': {'passagiers': 180, 'vracht_ton': 20},
-       'Boeing 737NG 958ER/W': {'passagiers': 160, 'vracht_ton': 20},
-       'Airbus A300 B4-622RF': {'passagiers': 266, 'vracht_ton': 40},
-       'Airbus A320 216': {'passagiers': 150, 'vracht_ton': 20},
-       'Airbus A330 323E': {'passagiers': 277, 'vracht_ton': 40},
-       'Airbus A319 112': {'passagiers': 156, 'vracht_ton': 20},
-       'Airbus A350 941': {'passagiers': 315, 'vracht_ton': 60},
-       'Airbus A330 302': {'passagiers': 277, 'vracht_ton': 40},
-       'Airbus A319 131': {'passagiers': 156, 'vracht_ton': 20},
-       'Boeing 787-8 Dreamliner': {'passagiers': 242, 'vracht_ton': 20},
-       'Airbus A330 323X': {'passagiers': 277, 'vracht_ton': 40},
-       'Boeing 737NG 8AS/W': {'passagiers': 160, 'vracht_ton': 20},
-       'Airbus A319 114': {'passagiers': 156, 'vracht_ton': 20},
-       'Boeing 777 3FXER': {'passagiers': 396, 'vracht_ton': 55}
-   }
-   
-   for aircraft, details in vliegtuig_capaciteit_passagiersaantal.items():
-       details['categorie'] = categorize_by_passenger_count(details['passagiers'])
-   
-   # Controleer of de kolom 'type' bestaat
-   if 'type' not in data.columns:
-       st.error("De kolom 'type' bestaat niet in de dataset. Controleer de kolomnamen en pas de code aan.")
-   else:
-       # Normaliseer de vliegtuigtypen om inconsistenties te voorkomen
-       data['type'] = data['type'].str.strip().str.lower()
-   
-       # Normaliseer de sleutels in vliegtuig_capaciteit_passagiersaantal
-       vliegtuig_capaciteit_passagiersaantal = {
-           k.lower(): v for k, v in vliegtuig_capaciteit_passagiersaantal.items()
-       }
-   
-       # Filter de dataset om alleen vliegtuigen te behouden die in vliegtuig_capaciteit_passagiersaantal staan
-       filtered_data = data[data['type'].isin(vliegtuig_capaciteit_passagiersaantal.keys())]
-   
-       # Voeg passagiersinformatie toe aan de dataset
-       filtered_data['passagiers'] = filtered_data['type'].map(
-           lambda x: vliegtuig_capaciteit_passagiersaantal[x]['passagiers']
-       )
-   
-       # Bereken de gemiddelde SEL_dB per vliegtuigtype
-       average_decibels_by_aircraft = filtered_data.groupby('type').agg(
-           Gemiddeld_SEL_dB=('SEL_dB', 'mean'),
-           Passagiers=('passagiers', 'first')
-       ).reset_index()
-   
-       # Voeg passagierscategorieën toe
-       average_decibels_by_aircraft['categorie'] = average_decibels_by_aircraft['Passagiers'].apply(categorize_by_passenger_count)
-   
-       # Maak een dropdownmenu voor passagierscategorieën
-       categories = ['0-100 Passagiers', '101-150 Passagiers', '151-200 Passagiers', '201-300 Passagiers', '301+ Passagiers']
-       selected_category = st.selectbox('Selecteer een passagierscategorie:', categories)
-   
-       # Filter de data op basis van de geselecteerde categorie
-       category_data = average_decibels_by_aircraft[average_decibels_by_aircraft['categorie'] == selected_category]
-   
-       # Sorteer de data op passagiersaantal
-       category_data = category_data.sort_values(by='Passagiers', ascending=False)
-   
-       # Maak een interactieve grafiek met Plotly
-       fig = px.bar(
-           category_data,
-           x='Gemiddeld_SEL_dB',
-           y='type',
-           orientation='h',
-           color='Passagiers',
-           labels={'type': 'Vliegtuig Type', 'Gemiddeld_SEL_dB': 'Gemiddeld SEL_dB', 'Passagiers': 'Aantal Passagiers'},
-           title=f'Gemiddeld Geluid (SEL_dB) voor {selected_category}',
-           hover_data=['Gemiddeld_SEL_dB', 'Passagiers']
-       )
-   
-       # Stel de x-aslimieten in
-       fig.update_layout(xaxis=dict(range=[70, 85]))
-   
-       # Toon de interactieve grafiek in Streamlit
-       st.plotly_chart(fig)
-   
-   
-   
-   # Bar Chart: Gemiddeld Geluid per Passagierscategorie
-   # Scatterplot: Correlatie tussen passagiers en gemiddeld geluid
-   st.subheader("Scatterplot: Correlatie tussen Passagiers en Geluid")
-   fig_scatter_plot = px.scatter(
-       average_decibels_by_aircraft,
-       x='Passagiers',
-       y='Gemiddeld_SEL_dB',
-       color='categorie',
-       labels={'Passagiers': 'Aantal Passagiers', 'Gemiddeld_SEL_dB': 'Gemiddeld SEL_dB'},
-       title='Correlatie tussen Geluid en Aantal Passagiers',
-       hover_data=['type']
-   )
-   st.plotly_chart(fig_scatter_plot, use_container_width=True, key="scatter_plot")
-   
-   # Stel de gewenste volgorde van de categorieën in
-   category_order = ['0-100 Passagiers', '101-150 Passagiers', '151-200 Passagiers', '201-300 Passagiers', '301+ Passagiers']
-   
-   st.subheader("Boxplot: Spreiding van Geluid per Passagierscategorie")
-   
-   fig_box_plot = px.box(
-       average_decibels_by_aircraft,
-       x='categorie',
-       y='Gemiddeld_SEL_dB',
-       color='categorie',
-       labels={'categorie': 'Passagierscategorie', 'Gemiddeld_SEL_dB': 'Gemiddeld SEL_dB'},
-       title='Spreiding van Geluid per Passagierscategorie',
-       category_orders={'categorie': category_order}  # Hier stel je de volgorde van de categorieën in
-   )
-   
-   st.plotly_chart(fig_box_plot, use_container_width=True, key="box_plot")   
+    tab_passagiers(sensornet)
 
 with tab3:
-    # Line Chart: Tijdreeksanalyse van gemiddeld geluid
-   st.subheader("Lijngrafiek: Tijdreeksanalyse van Gemiddeld Geluid")
-   filtered_data['date'] = filtered_data['time'].dt.date
-   time_series = filtered_data.groupby('date').agg(Gemiddeld_SEL_dB=('SEL_dB', 'mean')).reset_index()
-   fig_line_chart = px.line(
-       time_series,
-       x='date',
-       y='Gemiddeld_SEL_dB',
-       labels={'date': 'Datum', 'Gemiddeld_SEL_dB': 'Gemiddeld SEL_dB'},
-       title='Tijdreeksanalyse van Gemiddeld Geluid'
-   )
-   st.plotly_chart(fig_line_chart, use_container_width=True, key="line_chart")
-   
-   
-   
-   
-   # Bar Chart: Gemiddeld Geluid per Weekdag
-   st.subheader("Bar Chart: Gemiddeld Geluid per Weekdag")
-   
-   # Voeg een kolom toe voor de dag van de week
-   filtered_data['weekday'] = filtered_data['time'].dt.day_name()
-   
-   # Bereken het gemiddelde SEL_dB per weekdag
-   weekday_data = filtered_data.groupby('weekday').agg(Gemiddeld_SEL_dB=('SEL_dB', 'mean')).reset_index()
-   
-   # Sorteer de weekdagen in de juiste volgorde
-   weekday_order = ['Sunday', 'Saturday', 'Friday', 'Thursday', 'Wednesday', 'Tuesday', 'Monday'] 
-   weekday_data['weekday'] = pd.Categorical(weekday_data['weekday'], categories=weekday_order, ordered=True)
-   weekday_data = weekday_data.sort_values('weekday')
-   
-   # Maak de bar chart
-   fig_weekday_chart = px.bar(
-       weekday_data,
-       x='Gemiddeld_SEL_dB',
-       y='weekday',
-       labels={'weekday': 'Weekdag', 'Gemiddeld_SEL_dB': 'Gemiddeld SEL_dB'},
-       title='Gemiddeld Geluid (SEL_dB) per Weekdag',
-       color='Gemiddeld_SEL_dB',
-       color_continuous_scale='Viridis'
-   )
-   
-   # Stel de limieten van de x-as in op 60 tot 80
-   fig_weekday_chart.update_layout(
-       xaxis=dict(
-           range=[70, 85]  # Limiet van de x-as van 60 tot 80
-       )
-   )
-   
-   # Toon de chart
-   st.plotly_chart(fig_weekday_chart, use_container_width=True, key="weekday_chart")
+    if sensornet is None:
+        st.error('De API is niet bereikbaar en er is nog geen lokale kopie van de events.')
+    else:
+        tab_geluidsoverzicht(sensornet_kubus_cellen(sensornet), sensornet_blootstelling(sensornet))
 
 with tab4:
-  # Titel van de Streamlit app
- st.title("Geluidsdetectie in Kudelstaartseweg")
- 
- # -------------------------------------------------------------------------
- # 1) READ CSVs WITH STREAMLIT CACHE
- # -------------------------------------------------------------------------
- @st.cache_data
- def load_data():
-     df = pd.read_csv('flights_today_master.csv')   # Flight data (has the coordinates)
-     sensornet = pd.read_csv('my_data.csv')           # Sensor data (includes 'time', 'callsign', 'type', 'distance', 'lasmax_dB', etc.)
-     return df, sensornet
- 
- df, sensornet = load_data()
- 
- # Schiphol coordinates
- SCHIPHOL_LAT = 52.3105
- SCHIPHOL_LON = 4.7683
- 
- # -------------------------------------------------------------------------
- # 2) PARSE & TIMEZONE NORMALIZE
- #    (Keep only the "HH:MM:SS" portion in each dataset, both in UTC.)
- # -------------------------------------------------------------------------
- def parse_time_ignoring_weekday(t_str):
-     """
-     Removes something like 'Mon' (the first 4 chars) and attempts
-     to parse what's left as '%I:%M:%S %p'. If parsing fails, returns None.
-     """
-     if not isinstance(t_str, str):
-         return None
-     time_part = t_str[4:].strip()  # remove something like "Mon "
-     try:
-         return pd.to_datetime(time_part, format="%I:%M:%S %p", errors='coerce')
-     except:
-         return None
- 
- # --------------------- Flight data times => final in UTC HH:MM:SS ---------------------
- df['Time'] = df['Time'].apply(parse_time_ignoring_weekday)
- df['Time'] = df['Time'].dt.tz_localize('Etc/GMT+3').dt.tz_convert('UTC')
- df['Time'] = df['Time'].dt.strftime('%H:%M:%S')  # Now just HH:MM:SS as a string
- 
- # --------------------- Sensor data => final in UTC HH:MM:SS ---------------------
- sensornet['time'] = pd.to_datetime(sensornet['time'], errors='coerce')
- sensornet['time'] = sensornet['time'].dt.tz_localize('Europe/Amsterdam').dt.tz_convert('UTC')
- sensornet['time'] = sensornet['time'].dt.strftime('%H:%M:%S')
- 
- # -------------------------------------------------------------------------
- # 3) HELPER FUNCTIONS
- # -------------------------------------------------------------------------
- def haversine_distance(lat1, lon1, lat2, lon2):
-     R = 6371  # Earth radius in km
-     from math import radians, sin, cos, atan2, sqrt
-     d_lat = radians(lat2 - lat1)
-     d_lon = radians(lon2 - lon1)
-     a = sin(d_lat/2)**2 + cos(radians(lat1))*cos(radians(lat2))*sin(d_lon/2)**2
-     c = 2*atan2(sqrt(a), sqrt(1-a))
-     return R * c
- 
- def compute_bearing(lat1, lon1, lat2, lon2):
-     from math import radians, sin, cos, atan2, degrees
-     lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-     d_lon = lon2 - lon1
-     x = math.sin(d_lon) * math.cos(lat2)
-     y = math.cos(lat1)*math.sin(lat2) - math.sin(lat1)*math.cos(lat2)*math.cos(d_lon)
-     brng = math.atan2(x, y)
-     brng = degrees(brng)
-     return (brng + 360) % 360
- 
- def midpoint(lat1, lon1, lat2, lon2):
-     return ((lat1 + lat2) / 2.0, (lon1 + lon2) / 2.0)
- 
- def time_str_to_seconds(t_str):
-     """
-     Given a time string in HH:MM:SS format, convert to total seconds from midnight.
-     Example: "01:02:03" -> 3723 seconds.
-     """
-     if not isinstance(t_str, str) or len(t_str.split(':')) != 3:
-         return None
-     hh, mm, ss = t_str.split(':')
-     return int(hh)*3600 + int(mm)*60 + int(ss)
- 
- # -------------------------------------------------------------------------
- # 4) PLOT THE FLIGHT PATH + DOT MARKERS (with altitude in popup)
- # -------------------------------------------------------------------------
- def plot_flight(df, flight_number, map_obj, color):
-     """
-     Expects 'df' to have a 'Time' column containing only HH:MM:SS strings in UTC.
-     """
-     flight_df = df[df['FlightNumber'] == flight_number].copy()
-     flight_df.sort_values(by='Time', inplace=True, na_position='first')
-     
-     # Keep only points within 20 km of Schiphol
-     def distance_to_schiphol(row):
-         return haversine_distance(SCHIPHOL_LAT, SCHIPHOL_LON, row['Latitude'], row['Longitude'])
-     
-     flight_df['DistanceToSchiphol'] = flight_df.apply(distance_to_schiphol, axis=1)
-     flight_df = flight_df[flight_df['DistanceToSchiphol'] < 20]
-     
-     if len(flight_df) < 2:
-         return  # No path to draw if fewer than 2 points
-     
-     coords = flight_df[['Latitude','Longitude']].values.tolist()
- 
-     # Use AntPath with slower animation (delay set to 2500ms)
-     folium.plugins.AntPath(
-         coords, color=color, weight=3, opacity=0.6, delay=2500
-     ).add_to(map_obj)
-     
-     # For each segment along the flight path, place a small dot marker (in matching color)
-     for i in range(len(coords) - 1):
-         lat1, lon1 = coords[i]
-         lat2, lon2 = coords[i + 1]
-         row2 = flight_df.iloc[i + 1]
-         
-         time2 = row2.get('Time', None)
-         altitude_ft = row2.get('Altitude_feet', 'N/A')
-         
-         if not time2 or time2 in ["NaT", "nan"]:
-             popup_str = (
-                 f"<b>Flight:</b> {flight_number}<br>"
-                 f"<b>Time:</b> N/A<br>"
-                 f"<b>Altitude:</b> {altitude_ft} ft"
-             )
-         else:
-             popup_str = (
-                 f"<b>Flight:</b> {flight_number}<br>"
-                 f"<b>Time:</b> {time2} UTC<br>"
-                 f"<b>Altitude:</b> {altitude_ft} ft"
-             )
-         
-         lat_mid, lon_mid = midpoint(lat1, lon1, lat2, lon2)
-         
-         folium.CircleMarker(
-             location=[lat_mid, lon_mid],
-             radius=3,  # small dot marker
-             color=color,
-             fill=True,
-             fill_color=color,
-             fill_opacity=0.8,
-             popup=popup_str
-         ).add_to(map_obj)
- 
- # -------------------------------------------------------------------------
- # 5) BUILD THE BASE MAP
- # -------------------------------------------------------------------------
- m = folium.Map(location=[52.235, 4.748], zoom_start=11.5)
- 
- # 20 km circle around Schiphol
- folium.Circle(
-     location=[SCHIPHOL_LAT, SCHIPHOL_LON],
-     radius=20000,
-     color='lightgray',
-     fill=True,
-     fill_color='black',
-     fill_opacity=0
- ).add_to(m)
- 
- # -------------------------------------------------------------------------
- # 6) DEFINE FLIGHTS + COLORS, PLOT THEIR PATHS
- # -------------------------------------------------------------------------
- flight_numbers = ["KLM1342", "PGT1259"]
- colors = ["blue", "red"]
- for fn, col in zip(flight_numbers, colors):
-     sub_df = df[df['FlightNumber'] == fn].copy()
-     plot_flight(sub_df, fn, m, col)
- 
- # -------------------------------------------------------------------------
- # 7) ADD STATIONARY SENSORS (including Kudelstaartseweg)
- # -------------------------------------------------------------------------
- sensors = [
-     ("Kudelstaartseweg", 52.235, 4.748)
- ]
- 
- for i, (name, lat, lon) in enumerate(sensors):
-     # For Kudelstaartseweg, use the PNG marker
-     if name == "Kudelstaartseweg":
-         folium.Marker(
-             location=[lat, lon],
-             icon=folium.CustomIcon(
-                icon_image='sound-sensor2.png', 
-                 icon_size=(50, 50)
-             ),
-             popup=f"Sensor: {name}"
-         ).add_to(m)
-     else:
-         color = "darkorange"
-         marker_html = f"""
-         <div style="border-radius: 50%; background-color: {color};
-                     width: 30px; height: 30px;
-                     display: flex; align-items: center; justify-content: center;">
-             <span style="font-weight: bold; color: black;">{name[:2]}</span>
-         </div>
-         """
-         folium.Marker(
-             location=[lat, lon],
-             icon=folium.DivIcon(
-                 icon_size=(30,30),
-                 icon_anchor=(15,15),
-                 html=marker_html
-             ),
-             popup=f"Sensor: {name}"
-         ).add_to(m)
- 
- # -------------------------------------------------------------------------
- # 8) CREATE MARKERS FOR EACH FLIGHT AT CLOSEST-TIME MATCH,
- #    OFFSET THEM, AND DRAW DASHED LINE.
- #    MARKER COLOR MATCHES THE FLIGHT PATH, DISPLAYS lasmax_dB INSIDE THE ICON,
- #    AND THE POPUP SHOWS SENSOR DATA: time, type, distance (m), and callsign.
- # -------------------------------------------------------------------------
- def add_closest_time_marker(flight, color, df, sensornet, folium_map, offset_lat=0.0, offset_lon=0.0):
-     """
-     For a given flight, find the sensor time in sensornet for that callsign,
-     locate the closest flight-time row in df, place a marker at an offset location,
-     and draw a dashed line from that offset to the real lat/lon.
-     
-     The marker icon shows the 'lasmax_dB' (rounded, with "dB").
-     The popup displays sensor data (from the selected row) with keys in bold:
-       - Time, Type, Distance (m), Callsign.
-     """
-     sensor_rows = sensornet[sensornet['callsign'] == flight].copy()
-     if sensor_rows.empty:
-         return
- 
-     sensor_row = sensor_rows.iloc[0]
-     sensor_time_str = sensor_row['time']     # "HH:MM:SS"
-     sensor_time_sec = time_str_to_seconds(sensor_time_str)
-     lasmax_value = sensor_row.get('lasmax_dB', None)
-     sensor_type = sensor_row.get('type', 'N/A')
-     sensor_distance = sensor_row.get('distance', 'N/A')
-     sensor_callsign = sensor_row.get('callsign', 'N/A')
-     
-     flight_rows = df[df['FlightNumber'] == flight].copy()
-     if flight_rows.empty:
-         return
- 
-     flight_rows['time_sec'] = flight_rows['Time'].apply(time_str_to_seconds)
-     flight_rows['diff'] = (flight_rows['time_sec'] - sensor_time_sec).abs()
-     idx_closest = flight_rows['diff'].idxmin()
-     
-     lat_real = flight_rows.loc[idx_closest, 'Latitude']
-     lon_real = flight_rows.loc[idx_closest, 'Longitude']
-     flight_time_str = flight_rows.loc[idx_closest, 'Time']  # "HH:MM:SS"
- 
-     lat_marker = lat_real + offset_lat
-     lon_marker = lon_real + offset_lon
- 
-     if pd.notnull(lasmax_value):
-         lasmax_rounded = int(round(lasmax_value))
-     else:
-         lasmax_rounded = "N/A"
- 
-     marker_html = f"""
-     <div style="border-radius: 50%; background-color: {color};
-                 width: 40px; height: 40px;
-                 display: flex; align-items: center; justify-content: center;
-                 font-weight: bold; color: white;">
-         {lasmax_rounded} dB
-     </div>
-     """
- 
-     popup_text = (
-         f"<b>Flight:</b> {flight}<br>"
-         f"<b>Time:</b> {sensor_time_str} UTC<br>"
-         f"<b>Type:</b> {sensor_type}<br>"
-         f"<b>Distance:</b> {sensor_distance} m<br>"
-     )
-     
-     folium.Marker(
-         location=[lat_marker, lon_marker],
-         icon=folium.DivIcon(
-             icon_size=(40,40),
-             icon_anchor=(20,20),
-             html=marker_html
-         ),
-         popup=popup_text
-     ).add_to(folium_map)
- 
-     folium.PolyLine(
-         locations=[(lat_marker, lon_marker), (lat_real, lon_real)],
-         weight=2,
-         color=color,
-         dash_array='5,5'
-     ).add_to(folium_map)
- 
- # Offsets dictionary (adjust as needed for more flights)
- offsets = {
-     "KLM1342": (0.0025, 0.0075),   # shift ~30m north
-     "PGT1259": (0.0025, -0.0075)   # shift ~30m south
- }
- 
- for (fn, col) in zip(flight_numbers, colors):
-     off_lat, off_lon = offsets.get(fn, (0.0, 0.0))
-     add_closest_time_marker(fn, col, df, sensornet, m, offset_lat=off_lat, offset_lon=off_lon)
- 
- # -------------------------------------------------------------------------
- # 9) ADD A LEGEND TO THE MAP
- # -------------------------------------------------------------------------
- legend_html = '''
-      <div style="position: fixed; 
-                  bottom: 50px; left: 50px; width: 150px; height: 90px; 
-                  border:2px solid grey; z-index:9999; font-size:14px;
-                  background-color:white;
-                  opacity: 0.8;
-                  padding: 10px;">
-      <b>Flight Legend</b><br>
-      <i style="color:blue;">&#9632;</i>&nbsp;KLM1342<br>
-      <i style="color:red;">&#9632;</i>&nbsp;PGT1259
-      </div>
-      '''
- m.get_root().html.add_child(folium.Element(legend_html))
- 
- # -------------------------------------------------------------------------
- # 10) DISPLAY THE MAP IN STREAMLIT
- # -------------------------------------------------------------------------
- folium_static(m)
+    tab_geluidsdetectie()
+
+prestatie_paneel()
@@ -0,0 +1,47 @@
+"""
+Herbruikbare Plotly-figuren voor de dashboards.
+
+Het aantal traces hangt niet af van het aantal categorieën: alle
+min-max-staven zitten in één lijn-trace (gescheiden door None) en alle
+gemiddelden in één marker-trace.
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+
+def bereik_gemiddelde_figuur(data, categorie, minimum='min', maximum='max', gemiddelde='mean',
+                             aantal=None, staaf_kleur='lightblue', marker_kleur='blue'):
+    """
+    Horizontale figuur met per categorie een staaf van 'minimum' tot 'maximum'
+    en een marker op 'gemiddelde', in de volgorde van 'data'. Met 'aantal' (een
+    kolomnaam) toont de hover-tekst ook het aantal waarnemingen.
+    """
+    n = len(data)
+    labels = data[categorie].astype(str).to_numpy(dtype=object)
+
+    # Per categorie drie punten: min, max en een None die de lijn onderbreekt
+    staaf_x = np.empty(3 * n, dtype=object)
+    staaf_x[0::3] = data[minimum].to_numpy()
+    staaf_x[1::3] = data[maximum].to_numpy()
+    staaf_x[2::3] = None
+    staaf_y = np.repeat(labels, 3)
+    staaf_y[2::3] = None
+
+    hovertekst = [f'Gemiddeld: {waarde:.2f} dB' for waarde in data[gemiddelde]]
+    if aantal is not None:
+        hovertekst = [f'{tekst}<br>Waarnemingen: {n_waarnemingen}'
+                      for tekst, n_waarnemingen in zip(hovertekst, data[aantal])]
+
+    fig = go.Figure([
+        go.Scatter(
+            x=staaf_x, y=staaf_y, mode='lines', line=dict(color=staaf_kleur, width=6),
+            name='Bereik', hoverinfo='x+y',
+        ),
+        go.Scatter(
+            x=data[gemiddelde].to_numpy(), y=labels, mode='markers',
+            marker=dict(color=marker_kleur, size=10, symbol='circle'),
+            name='Gemiddeld', hoverinfo='text', hovertext=hovertekst,
+        ),
+    ])
+    fig.update_layout(showlegend=False)
+    return fig
@@ -0,0 +1,182 @@
+"""
+Compacte kaartlagen voor vliegtracks in folium.
+
+In plaats van een marker met eigen HTML-popup per segment wordt elke vlucht
+één GeoJSON-feature, vereenvoudigd met Douglas-Peucker. De tolerantie hangt
+af van het zoomniveau: een afwijking kleiner dan een pixel is niet te zien.
+De stippen (met tijd en hoogte) zijn één GeoJSON-laag met een gedeelde
+popup-template, bedoeld voor een kaart met prefer_canvas=True. De geluidskaart
+is één afbeelding over de kaart heen.
+"""
+import matplotlib
+import numpy as np
+import pandas as pd
+import folium
+from branca.colormap import LinearColormap
+
+from geluidskaart import DEFAULT_KLEUREN, grenzen
+from geodesie import AARDSTRAAL_KM
+from meetpunten import span
+
+# Meter per pixel op de evenaar bij zoomniveau 0 (256-pixel tiles)
+METER_PER_PIXEL_ZOOM_0 = 2 * np.pi * AARDSTRAAL_KM * 1000 / 256
+
+# Standaard maximale afwijking van de vereenvoudigde lijn, in pixels
+DEFAULT_PIXELS = 1.0
+# Bovengrens op het aantal punten per vlucht, zodat de pagina begrensd blijft
+DEFAULT_MAX_PUNTEN = 200
+
+
+def meter_per_pixel(zoom, lat):
+    return METER_PER_PIXEL_ZOOM_0 * np.cos(np.radians(lat)) / 2 ** zoom
+
+
+def zoom_tolerantie_m(zoom, lat, pixels=DEFAULT_PIXELS):
+    """Tolerantie in meter waaronder Douglas-Peucker op dit zoomniveau niets zichtbaars weghaalt."""
+    return pixels * meter_per_pixel(zoom, lat)
+
+
+def _lokale_meters(lat, lon):
+    # Equirectangulaire projectie rond het midden van de track; ruim nauwkeurig genoeg op tracklengte
+    lat0 = np.radians(np.nanmean(lat))
+    schaal = np.radians(1.0) * AARDSTRAAL_KM * 1000
+    return (lon - np.nanmean(lon)) * schaal * np.cos(lat0), (lat - np.nanmean(lat)) * schaal
+
+
+def douglas_peucker(lat, lon, tolerantie_m):
+    """
+    Masker van de punten die Douglas-Peucker met 'tolerantie_m' (meter) bewaart.
+    Eerste en laatste punt blijven altijd staan.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    n = len(lat)
+    bewaren = np.zeros(n, dtype=bool)
+    if n == 0:
+        return bewaren
+    bewaren[[0, -1]] = True
+    if n < 3:
+        return bewaren
+
+    x, y = _lokale_meters(lat, lon)
+    stapel = [(0, n - 1)]
+    while stapel:
+        begin, eind = stapel.pop()
+        if eind - begin < 2:
+            continue
+        dx, dy = x[eind] - x[begin], y[eind] - y[begin]
+        px, py = x[begin + 1:eind] - x[begin], y[begin + 1:eind] - y[begin]
+        lengte = np.hypot(dx, dy)
+        if lengte == 0:
+            afstand = np.hypot(px, py)
+        else:
+            afstand = np.abs(dx * py - dy * px) / lengte
+        verste = int(np.argmax(afstand))
+        if afstand[verste] > tolerantie_m:
+            midden = begin + 1 + verste
+            bewaren[midden] = True
+            stapel.append((begin, midden))
+            stapel.append((midden, eind))
+    return bewaren
+
+
+def vereenvoudig(lat, lon, tolerantie_m, max_punten=DEFAULT_MAX_PUNTEN):
+    """Douglas-Peucker, met een tolerantie die verdubbelt tot er hooguit 'max_punten' over zijn."""
+    bewaren = douglas_peucker(lat, lon, tolerantie_m)
+    while max_punten and bewaren.sum() > max_punten:
+        tolerantie_m *= 2
+        bewaren = douglas_peucker(lat, lon, tolerantie_m)
+    return bewaren
+
+
+def _tijd_tekst(tijden):
+    return tijden.dt.strftime('%H:%M:%S').fillna('N/A') + np.where(tijden.notna(), ' UTC', '')
+
+
+def _sensor_tekst(track):
+    """'Naam (1.2 km)' per punt uit de kolommen 'sensor' en 'sensor_afstand_km', of None als die ontbreken."""
+    if 'sensor' not in track.columns or 'sensor_afstand_km' not in track.columns:
+        return None
+    afstand = track['sensor_afstand_km'].map('{:.1f} km'.format, na_action='ignore')
+    return (track['sensor'].astype(object) + ' (' + afstand + ')').fillna('N/A').tolist()
+
+
+def vlucht_features(tracks, kleuren, zoom, pixels=DEFAULT_PIXELS, max_punten=DEFAULT_MAX_PUNTEN):
+    """
+    Bouwt twee GeoJSON FeatureCollections uit trackpunten (kolommen FlightNumber,
+    Time, Latitude, Longitude en optioneel Altitude_feet): één LineString per
+    vlucht en één Point per bewaard punt. 'kleuren' is een dict van vlucht naar kleur.
+    Met de kolommen 'sensor' en 'sensor_afstand_km' (zie sensor_register) krijgt
+    elk punt ook het dichtstbijzijnde meetpunt mee.
+    """
+    lijnen, punten = [], []
+    for vlucht, kleur in kleuren.items():
+        track = tracks[tracks['FlightNumber'] == vlucht].sort_values('Time', na_position='first')
+        if len(track) < 2:
+            continue
+        lat = track['Latitude'].to_numpy(np.float64)
+        lon = track['Longitude'].to_numpy(np.float64)
+        bewaren = vereenvoudig(lat, lon, zoom_tolerantie_m(zoom, np.nanmean(lat), pixels), max_punten)
+        track = track[bewaren]
+        # GeoJSON gebruikt [lon, lat], afgerond op ~1 m
+        coordinaten = np.round(np.column_stack([lon[bewaren], lat[bewaren]]), 5).tolist()
+        lijnen.append({
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': coordinaten},
+            'properties': {'flight': str(vlucht), 'color': kleur, 'points': int(len(lat))},
+        })
+
+        hoogte = track['Altitude_feet'] if 'Altitude_feet' in track.columns else pd.Series(np.nan, index=track.index)
+        hoogte = pd.to_numeric(hoogte, errors='coerce')
+        hoogte_tekst = hoogte.map('{:,.0f} ft'.format, na_action='ignore').fillna('N/A ft')
+        sensor_tekst = _sensor_tekst(track)
+        for i, (coordinaat, tijd, hoogte_ft) in enumerate(zip(coordinaten, _tijd_tekst(track['Time']), hoogte_tekst)):
+            eigenschappen = {'flight': str(vlucht), 'color': kleur, 'time': tijd, 'altitude': hoogte_ft}
+            if sensor_tekst is not None:
+                eigenschappen['sensor'] = sensor_tekst[i]
+            punten.append({
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': coordinaat},
+                'properties': eigenschappen,
+            })
+    return {'type': 'FeatureCollection', 'features': lijnen}, {'type': 'FeatureCollection', 'features': punten}
+
+
+@span('kaart_lagen')
+def voeg_vluchten_toe(kaart, tracks, kleuren, zoom, pixels=DEFAULT_PIXELS, max_punten=DEFAULT_MAX_PUNTEN):
+    """Voegt de vluchten toe aan 'kaart' als één lijnlaag en één stippenlaag."""
+    lijnen, punten = vlucht_features(tracks, kleuren, zoom, pixels, max_punten)
+    if not lijnen['features']:
+        return
+    aliassen = {'flight': 'Flight:', 'time': 'Time:', 'altitude': 'Altitude:', 'sensor': 'Nearest sensor:'}
+    velden = [veld for veld in aliassen if veld in punten['features'][0]['properties']]
+    folium.GeoJson(
+        lijnen,
+        name='Flight paths',
+        style_function=lambda feature: {'color': feature['properties']['color'], 'weight': 3, 'opacity': 0.6},
+        # Leaflet vereenvoudigt de lijnen bij uitzoomen verder in de browser
+        smooth_factor=pixels,
+        tooltip=folium.GeoJsonTooltip(fields=['flight'], aliases=['Flight:']),
+    ).add_to(kaart)
+    folium.GeoJson(
+        punten,
+        name='Flight points',
+        marker=folium.CircleMarker(radius=3, fill=True, fill_opacity=0.8),
+        style_function=lambda feature: {'color': feature['properties']['color'], 'fillColor': feature['properties']['color']},
+        popup=folium.GeoJsonPopup(fields=velden, aliases=[aliassen[veld] for veld in velden]),
+    ).add_to(kaart)
+
+
+@span('kaart_geluidskaart')
+def voeg_geluidskaart_toe(kaart, geluidskaart, van=None, tot=None, uren=None, naam='Noise exposure'):
+    """
+    Voegt de geluidskaart (zie geluidskaart.GeluidsKaart) voor de gekozen dagen en
+    uren toe als één afbeelding, met een kleurenschaal in dB als legenda.
+    """
+    url, vmin, vmax = geluidskaart.afbeelding(van, tot, uren)
+    folium.raster_layers.ImageOverlay(
+        image=url, bounds=grenzen(geluidskaart.raster), name=naam, pixelated=True,
+    ).add_to(kaart)
+    kleuren = matplotlib.colormaps[DEFAULT_KLEUREN](np.linspace(0, 1, 8))
+    LinearColormap([tuple(kleur) for kleur in kleuren], vmin=vmin, vmax=vmax,
+                   caption=f'{naam} (dB, energy sum)').add_to(kaart)
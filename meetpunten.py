@@ -0,0 +1,195 @@
+"""
+Lichte instrumentatie van de hot paths: tijdspans en tellers.
+
+    with span('kubus_bijwerken', rijen=len(events)):
+        ...
+    tel('csv_sidecar_hits')
+
+Spans kunnen genest worden; het pad ('tab_passagiers/kubus_bijwerken') geeft
+aan waarbinnen een span liep. Spans en tellers worden verzameld in de rerun
+die met start_rerun() is begonnen (per thread/context, dus per Streamlit-
+sessie), en elke span en elke afgesloten rerun wordt als één JSON-regel naar
+een roterend logbestand geschreven, zodat tijden over sessies heen te
+aggregeren zijn. Zonder lopende rerun (bijvoorbeeld in een batchscript)
+worden spans alleen gelogd en tellers alleen per proces bijgehouden.
+
+Het logbestand staat standaard in sensornet_store/logs/spans.jsonl en kan met
+de omgevingsvariabele MEETPUNTEN_LOG worden verplaatst of (met '0') uitgezet.
+Samenvatting over alle sessies (inclusief geroteerde bestanden):
+
+    python meetpunten.py [pad]
+"""
+import argparse
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+import pandas as pd
+
+DEFAULT_LOG_PAD = os.path.join('sensornet_store', 'logs', 'spans.jsonl')
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+
+_rerun = contextvars.ContextVar('meetpunten_rerun', default=None)
+_pad = contextvars.ContextVar('meetpunten_pad', default=())
+
+_proces_tellers = Counter()
+_tellers_lock = threading.Lock()
+
+_logger = logging.getLogger('meetpunten')
+_logger.propagate = False
+_log_lock = threading.Lock()
+_log_geconfigureerd = False
+
+
+class Rerun:
+    """De spans en tellers van één uitvoering van een script (of fragment)."""
+
+    def __init__(self, naam, sessie=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.naam = naam
+        self.sessie = sessie
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.duur_s = None
+        self.spans = []  # dicts met pad, naam, start_s (t.o.v. de rerun), duur_s en extra velden
+        self.tellers = Counter()
+
+    def totalen(self):
+        """Totale duur en aantal aanroepen per spanpad."""
+        totalen = {}
+        for s in self.spans:
+            totaal = totalen.setdefault(s['pad'], {'pad': s['pad'], 'aantal': 0, 'duur_s': 0.0})
+            totaal['aantal'] += 1
+            totaal['duur_s'] += s['duur_s']
+        return list(totalen.values())
+
+
+def configureer_log(pad=None, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    """
+    Stelt het roterende JSONL-log in. Zonder 'pad' geldt MEETPUNTEN_LOG of het
+    standaardpad; '0' zet het log uit. Wordt bij de eerste span vanzelf aangeroepen.
+    """
+    global _log_geconfigureerd
+    with _log_lock:
+        for handler in list(_logger.handlers):
+            _logger.removeHandler(handler)
+            handler.close()
+        pad = pad or os.environ.get('MEETPUNTEN_LOG', DEFAULT_LOG_PAD)
+        if pad != '0':
+            os.makedirs(os.path.dirname(os.path.abspath(pad)), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(pad, maxBytes=max_bytes, backupCount=backups)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            _logger.addHandler(handler)
+            _logger.setLevel(logging.INFO)
+        _log_geconfigureerd = True
+
+
+def _log(record):
+    if not _log_geconfigureerd:
+        configureer_log()
+    if _logger.handlers:
+        _logger.info(json.dumps(record, default=str))
+
+
+def start_rerun(naam, sessie=None):
+    """Begint een nieuwe rerun in de huidige context en geeft hem terug."""
+    rerun = Rerun(naam, sessie)
+    _rerun.set(rerun)
+    _pad.set(())
+    return rerun
+
+
+def huidige_rerun():
+    return _rerun.get()
+
+
+def sluit_rerun(rerun=None):
+    """Sluit de (huidige) rerun af en logt de totale duur en de tellers."""
+    rerun = rerun or _rerun.get()
+    if rerun is None or rerun.duur_s is not None:
+        return rerun
+    rerun.duur_s = time.perf_counter() - rerun._start_perf
+    _log({
+        'soort': 'rerun', 'rerun': rerun.id, 'sessie': rerun.sessie, 'naam': rerun.naam,
+        'start': rerun.start, 'duur_s': rerun.duur_s, 'tellers': dict(rerun.tellers),
+    })
+    return rerun
+
+
+@contextlib.contextmanager
+def span(naam, **velden):
+    """Meet de duur van het blok. Extra velden (bijvoorbeeld rijen=...) komen mee in het log."""
+    pad = _pad.get() + (naam,)
+    token = _pad.set(pad)
+    start = time.perf_counter()
+    try:
+        yield velden
+    finally:
+        duur = time.perf_counter() - start
+        _pad.reset(token)
+        rerun = _rerun.get()
+        record = {'pad': '/'.join(pad), 'naam': naam, 'duur_s': duur, **velden}
+        if rerun is not None:
+            record['start_s'] = start - rerun._start_perf
+            rerun.spans.append(record)
+        _log({
+            'soort': 'span', 'rerun': rerun.id if rerun else None, 'sessie': rerun.sessie if rerun else None,
+            'tijd': time.time(), **record,
+        })
+
+
+def tel(naam, aantal=1):
+    """Verhoogt teller 'naam' voor de huidige rerun en voor het proces."""
+    rerun = _rerun.get()
+    if rerun is not None:
+        rerun.tellers[naam] += aantal
+    with _tellers_lock:
+        _proces_tellers[naam] += aantal
+
+
+def proces_tellers():
+    """De tellers van alle reruns en batchaanroepen in dit proces."""
+    with _tellers_lock:
+        return dict(_proces_tellers)
+
+
+def lees_log(pad=None):
+    """Alle records uit het log en de geroteerde bestanden (oudste eerst) als DataFrame."""
+    pad = pad or os.environ.get('MEETPUNTEN_LOG', DEFAULT_LOG_PAD)
+    bestanden = [f'{pad}.{i}' for i in range(LOG_BACKUPS, 0, -1)] + [pad]
+    records = []
+    for bestand in bestanden:
+        if os.path.exists(bestand):
+            with open(bestand) as f:
+                records.extend(json.loads(regel) for regel in f if regel.strip())
+    return pd.DataFrame.from_records(records)
+
+
+def samenvatting(log):
+    """Per spanpad: aantal, totale duur en mediaan/p95/max in milliseconden."""
+    spans = log[log['soort'] == 'span']
+    ms = spans['duur_s'] * 1000
+    return ms.groupby(spans['pad']).agg(
+        aantal='size', totaal_s=lambda x: x.sum() / 1000, mediaan_ms='median',
+        p95_ms=lambda x: x.quantile(0.95), max_ms='max',
+    ).sort_values('totaal_s', ascending=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Vat het spanlog samen over alle sessies.')
+    parser.add_argument('pad', nargs='?', help=f'Logbestand (standaard {DEFAULT_LOG_PAD} of MEETPUNTEN_LOG)')
+    args = parser.parse_args()
+    log = lees_log(args.pad)
+    if log.empty:
+        print('Geen records gevonden')
+    else:
+        print(f"{log['sessie'].nunique()} sessies, {(log['soort'] == 'rerun').sum()} reruns")
+        print(samenvatting(log).round(1).to_string())
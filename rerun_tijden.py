@@ -0,0 +1,82 @@
+"""
+Meet hoe lang elk onderdeel (tabblad of fragment) van een Streamlit-app draait.
+
+De duur van de laatste uitvoering staat per onderdeel in
+st.session_state['rerun_tijden'], zodat een widget-interactie te vergelijken
+is met een volledige rerun (zie benchmarks/bench_rerun.py).
+
+Elk onderdeel is ook een span (zie meetpunten.py). Een app begint elke rerun
+met start_app_rerun() en eindigt met prestatie_paneel(). Dat paneel staat
+verborgen in de sidebar en is zichtbaar met ?perf=1 in de URL. Het toont
+per span en teller waar de tijd van de laatste rerun heen ging.
+"""
+import functools
+import time
+import uuid
+
+import pandas as pd
+import streamlit as st
+
+from meetpunten import huidige_rerun, proces_tellers, sluit_rerun, span, start_rerun
+
+
+def _sessie_id():
+    return st.session_state.setdefault('prestaties_sessie', uuid.uuid4().hex[:12])
+
+
+def start_app_rerun(naam):
+    """Begint de spans en tellers van deze rerun; roep aan bovenin het script."""
+    st.session_state['prestaties_rerun'] = start_rerun(naam, _sessie_id())
+
+
+def gemeten(functie):
+    """Decorator die de duur van elke aanroep onder de functienaam bewaart."""
+    @functools.wraps(functie)
+    def wrapper(*args, **kwargs):
+        # Een fragment dat los opnieuw draait valt buiten de rerun van het hele script
+        rerun = huidige_rerun()
+        eigen_rerun = None
+        if rerun is None or rerun.duur_s is not None:
+            eigen_rerun = start_rerun(functie.__name__, _sessie_id())
+        start = time.perf_counter()
+        try:
+            with span(functie.__name__):
+                return functie(*args, **kwargs)
+        finally:
+            st.session_state.setdefault('rerun_tijden', {})[functie.__name__] = time.perf_counter() - start
+            if eigen_rerun is not None:
+                st.session_state['prestaties_fragment'] = sluit_rerun(eigen_rerun)
+    return wrapper
+
+
+def _spans_tabel(rerun):
+    totalen = pd.DataFrame(rerun.totalen(), columns=['pad', 'aantal', 'duur_s'])
+    totalen['ms'] = (totalen.pop('duur_s') * 1000).round(1)
+    return totalen
+
+
+def prestatie_paneel():
+    """
+    Sluit de rerun af en toont, alleen met ?perf=1 in de URL, de spans en
+    tellers in de sidebar. Roep aan onderaan het script.
+    """
+    rerun = sluit_rerun(st.session_state.get('prestaties_rerun'))
+    if st.query_params.get('perf') != '1' or rerun is None:
+        return
+
+    with st.sidebar.expander('Prestaties', expanded=True):
+        st.caption(f'Rerun {rerun.id}: {rerun.duur_s * 1000:.0f} ms')
+        st.dataframe(_spans_tabel(rerun), hide_index=True)
+        if rerun.tellers:
+            st.caption('Tellers (deze rerun)')
+            st.dataframe(pd.Series(rerun.tellers, name='aantal').rename_axis('teller').reset_index(), hide_index=True)
+
+        fragment = st.session_state.get('prestaties_fragment')
+        if fragment is not None:
+            st.caption(f'Laatste fragment {fragment.naam}: {fragment.duur_s * 1000:.0f} ms')
+            st.dataframe(_spans_tabel(fragment), hide_index=True)
+
+        tellers = proces_tellers()
+        if tellers:
+            st.caption('Tellers (proces)')
+            st.dataframe(pd.Series(tellers, name='aantal').rename_axis('teller').reset_index(), hide_index=True)
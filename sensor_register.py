@@ -0,0 +1,246 @@
+"""
+Register van de geluidsmeetpunten met een ruimtelijke index, voor vragen over
+grote aantallen trackpunten tegelijk: welk meetpunt is het dichtstbij (en hoe
+ver), en welke meetpunten liggen binnen R km.
+
+De meetpunten staan in sensoren.csv (code zoals location_short in de
+sensornet-data, naam zoals location_long, lat en lon in graden). Een nieuw
+meetpunt is een regel erbij.
+
+De index is een raster van vierkante cellen ('cel_km') in een
+equirectangulaire projectie rond het midden van het netwerk. Punten worden
+niet per stuk vergeleken met alle meetpunten: eerst worden de unieke
+rastercellen van de punten bepaald, en per cel alleen de meetpuntcellen die
+op grond van de afstand tussen de cellen in aanmerking komen. Alleen voor die
+kandidaten wordt de exacte haversine-afstand uitgerekend.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from geodesie import AARDSTRAAL_KM, SCHIPHOL_LAT, SCHIPHOL_LON, haversine_km
+
+DEFAULT_SENSOREN_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sensoren.csv')
+
+# Zijde van een rastercel in km
+DEFAULT_CEL_KM = 2.0
+# Speling voor de projectiefout (binnen ~100 km van het midden ruim onder 2%)
+PROJECTIE_MARGE = 1.02
+# Tot zoveel meetpunten is elk punt tegen elk meetpunt goedkoper dan de punten per cel groeperen.
+# Gemeten met benchmarks/bench_sensoren.py (2M punten, --klein-netwerk 0 tegen een groot getal):
+# bij 2 meetpunten kost elk-tegen-elk 0,42 s tegen 1,02 s via het raster, vanaf 3 (binnen_straal)
+# en 4 (dichtstbijzijnde) meetpunten is het raster sneller.
+KLEIN_NETWERK = 2
+# Zoveel (cel, meetpuntcel)-combinaties tegelijk, om het geheugen te begrenzen
+BLOK_COMBINATIES = 4_000_000
+
+SENSOR_KOLOMMEN = ['code', 'naam', 'lat', 'lon']
+
+# Celcoördinaten worden samen één int64-sleutel (tot ruim een miljoen cellen in elke richting)
+_CEL_BITS = 21
+_CEL_OFFSET = 1 << (_CEL_BITS - 1)
+
+_gedeeld = {}  # pad -> ((mtime, grootte), SensorRegister)
+_gedeeld_lock = threading.Lock()
+
+
+def _cel_sleutels(ix, iy):
+    return ((ix + _CEL_OFFSET) << _CEL_BITS) | (iy + _CEL_OFFSET)
+
+
+def _per_cel(ix, iy):
+    """
+    Groepeert elementen per cel: (ix, iy) van de unieke cellen, de volgorde van
+    de elementen gesorteerd per cel, en per cel het begin en aantal in die volgorde.
+    """
+    codes, sleutels = pd.factorize(_cel_sleutels(ix, iy))
+    sleutels = np.asarray(sleutels, dtype=np.int64)
+    aantal = np.bincount(codes, minlength=len(sleutels))
+    volgorde = np.argsort(codes, kind='stable')
+    return (sleutels >> _CEL_BITS) - _CEL_OFFSET, (sleutels & ((1 << _CEL_BITS) - 1)) - _CEL_OFFSET, \
+        volgorde, np.cumsum(aantal) - aantal, aantal
+
+
+def _uitklappen(groepen, begin, aantal, volgorde):
+    """
+    Voor elke groep i de elementen volgorde[begin[i]:begin[i] + aantal[i]],
+    als (groep per element, element) zonder Python-lus.
+    """
+    herhaald = np.repeat(groepen, aantal)
+    start = np.repeat(begin, aantal)
+    binnen = np.arange(len(herhaald)) - np.repeat(np.cumsum(aantal) - aantal, aantal)
+    return herhaald, volgorde[start + binnen]
+
+
+class SensorRegister:
+    """Meetpunten met een rasterindex; zie de moduledocumentatie."""
+
+    def __init__(self, sensoren, cel_km=DEFAULT_CEL_KM):
+        sensoren = pd.DataFrame(sensoren)
+        ontbreekt = [kolom for kolom in SENSOR_KOLOMMEN if kolom not in sensoren.columns]
+        if ontbreekt:
+            raise ValueError(f'Kolommen ontbreken in het sensorregister: {ontbreekt}')
+        sensoren = sensoren.reset_index(drop=True)
+        sensoren['code'] = sensoren['code'].astype(str)
+        if sensoren['code'].duplicated().any():
+            raise ValueError(f"Dubbele sensorcodes: {sorted(sensoren.loc[sensoren['code'].duplicated(), 'code'])}")
+        sensoren['lat'] = sensoren['lat'].astype(np.float64)
+        sensoren['lon'] = sensoren['lon'].astype(np.float64)
+        self.sensoren = sensoren
+        self.cel_km = float(cel_km)
+
+        # Projectie rond het midden van het netwerk
+        self._lat0 = sensoren['lat'].mean() if len(sensoren) else SCHIPHOL_LAT
+        self._lon0 = sensoren['lon'].mean() if len(sensoren) else SCHIPHOL_LON
+        ix, iy = self._cellen(sensoren['lat'].to_numpy(), sensoren['lon'].to_numpy())
+        # De meetpunten van cel j staan op volgorde[begin[j]:begin[j] + aantal[j]]
+        self._cel_ix, self._cel_iy, self._volgorde, self._begin, self._aantal = _per_cel(ix, iy)
+
+    @classmethod
+    def uit_csv(cls, pad=DEFAULT_SENSOREN_CSV, cel_km=DEFAULT_CEL_KM):
+        return cls(pd.read_csv(pad, dtype={'code': str, 'naam': str}), cel_km)
+
+    def __len__(self):
+        return len(self.sensoren)
+
+    def _projecteer(self, lat, lon):
+        """Equirectangulaire projectie naar km rond het midden van het netwerk."""
+        km_per_graad = np.radians(1.0) * AARDSTRAAL_KM
+        x = (np.asarray(lon, dtype=np.float64) - self._lon0) * km_per_graad * np.cos(np.radians(self._lat0))
+        y = (np.asarray(lat, dtype=np.float64) - self._lat0) * km_per_graad
+        return x, y
+
+    def _cellen(self, lat, lon):
+        x, y = self._projecteer(lat, lon)
+        return np.floor(x / self.cel_km).astype(np.int64), np.floor(y / self.cel_km).astype(np.int64)
+
+    def _cel_afstanden(self, ix, iy):
+        """
+        Onder- en bovengrens (km, geprojecteerd) van de afstand tussen elk punt in
+        de cellen (ix, iy) en elk punt in de meetpuntcellen, vorm (len(ix), aantal meetpuntcellen).
+        """
+        dx = np.abs(ix[:, None] - self._cel_ix[None, :])
+        dy = np.abs(iy[:, None] - self._cel_iy[None, :])
+        onder = np.hypot(np.maximum(dx - 1, 0), np.maximum(dy - 1, 0)) * self.cel_km
+        boven = np.hypot(dx + 1, dy + 1) * self.cel_km
+        return onder, boven
+
+    def _paren(self, lat, lon, kies_cellen):
+        """
+        Kandidaatparen (punt, meetpunt) met hun exacte afstand. 'kies_cellen' krijgt
+        de afstandsgrenzen per (puntcel, meetpuntcel) en geeft een masker terug.
+        """
+        geldig = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        leeg = np.empty(0, dtype=np.int64)
+        if len(geldig) == 0 or len(self.sensoren) == 0:
+            return leeg, leeg, np.empty(0)
+        if len(self.sensoren) <= KLEIN_NETWERK:
+            punt = np.repeat(geldig, len(self.sensoren))
+            sensor = np.tile(np.arange(len(self.sensoren)), len(geldig))
+            return punt, sensor, self._afstanden(lat, lon, punt, sensor)
+
+        # De punten per unieke cel, net als bij de meetpunten
+        cel_ix, cel_iy, punt_volgorde, punt_begin, punt_aantal = _per_cel(*self._cellen(lat[geldig], lon[geldig]))
+        punt_volgorde = geldig[punt_volgorde]
+
+        punten, sensoren = [], []
+        blok = max(1, BLOK_COMBINATIES // max(len(self._cel_ix), 1))
+        for start in range(0, len(cel_ix), blok):
+            onder, boven = self._cel_afstanden(cel_ix[start:start + blok], cel_iy[start:start + blok])
+            puntcel, sensorcel = np.nonzero(kies_cellen(onder, boven))
+            puntcel += start
+            # Elke puntcel tegen de meetpunten van elke gekozen meetpuntcel ...
+            celpaar, sensor = _uitklappen(np.arange(len(puntcel)), self._begin[sensorcel], self._aantal[sensorcel], self._volgorde)
+            # ... en dat voor elk punt in de puntcel
+            cel = puntcel[celpaar]
+            rij, punt = _uitklappen(np.arange(len(celpaar)), punt_begin[cel], punt_aantal[cel], punt_volgorde)
+            punten.append(punt)
+            sensoren.append(sensor[rij])
+        punt = np.concatenate(punten)
+        sensor = np.concatenate(sensoren)
+        return punt, sensor, self._afstanden(lat, lon, punt, sensor)
+
+    def _afstanden(self, lat, lon, punt, sensor):
+        return haversine_km(lat[punt], lon[punt], self.sensoren['lat'].to_numpy()[sensor], self.sensoren['lon'].to_numpy()[sensor])
+
+    def dichtstbijzijnde(self, lat, lon, max_km=None):
+        """
+        Het dichtstbijzijnde meetpunt voor elk punt, als DataFrame met 'sensor'
+        (code, categorisch) en 'afstand_km', in de volgorde en met de index van
+        de invoer. Punten zonder coördinaten of verder dan 'max_km' krijgen NaN.
+        """
+        index = lat.index if isinstance(lat, pd.Series) else None
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+
+        def kies_cellen(onder, boven):
+            # Een meetpuntcel die verder weg ligt dan de verste rand van de dichtste cel kan niet winnen
+            kandidaat = onder <= boven.min(axis=1, keepdims=True) * PROJECTIE_MARGE
+            if max_km is not None:
+                kandidaat &= onder <= max_km * PROJECTIE_MARGE
+            return kandidaat
+
+        punt, sensor, afstand = self._paren(lat, lon, kies_cellen)
+        # Per punt het paar met de kleinste afstand (zonder de paren te sorteren)
+        afstanden = np.full(len(lat), np.inf)
+        np.minimum.at(afstanden, punt, afstand)
+        winnaar = afstand == afstanden[punt]
+        if max_km is not None:
+            winnaar &= afstand <= max_km
+        codes = np.full(len(lat), -1, dtype=np.int64)
+        codes[punt[winnaar]] = sensor[winnaar]
+        afstanden[codes < 0] = np.nan
+        return pd.DataFrame({
+            'sensor': pd.Categorical.from_codes(codes, categories=self.sensoren['code']),
+            'afstand_km': afstanden,
+        }, index=index)
+
+    def binnen_straal(self, lat, lon, straal_km):
+        """
+        Alle (punt, meetpunt)-paren op hoogstens 'straal_km' afstand, als DataFrame
+        met 'punt' (index van de invoer, of positie), 'sensor' en 'afstand_km',
+        gesorteerd op punt en afstand.
+        """
+        index = lat.index if isinstance(lat, pd.Series) else pd.RangeIndex(len(lat))
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+
+        punt, sensor, afstand = self._paren(lat, lon, lambda onder, boven: onder <= straal_km * PROJECTIE_MARGE)
+        binnen = afstand <= straal_km
+        punt, sensor, afstand = punt[binnen], sensor[binnen], afstand[binnen]
+        volgorde = np.lexsort((afstand, punt))
+        return pd.DataFrame({
+            'punt': index[punt[volgorde]],
+            'sensor': pd.Categorical.from_codes(sensor[volgorde], categories=self.sensoren['code']),
+            'afstand_km': afstand[volgorde],
+        })
+
+    def coordinaten(self, codes):
+        """Lat en lon van de meetpunten met deze codes (bijvoorbeeld location_short); NaN als onbekend."""
+        codes = pd.Series(codes)
+        tabel = self.sensoren.set_index('code')
+        sleutels = codes.astype(object).where(codes.notna()).astype(str)
+        return pd.DataFrame({
+            'lat': sleutels.map(tabel['lat']).to_numpy(np.float64),
+            'lon': sleutels.map(tabel['lon']).to_numpy(np.float64),
+        }, index=codes.index)
+
+    def onbekende_codes(self, codes):
+        """Codes (bijvoorbeeld location_short uit de events) die niet in het register staan."""
+        codes = pd.Series(codes).dropna().astype(str).unique()
+        return sorted(set(codes) - set(self.sensoren['code']))
+
+
+def gedeeld_register(pad=DEFAULT_SENSOREN_CSV, cel_km=DEFAULT_CEL_KM):
+    """Het register uit 'pad', één keer per proces ingelezen tot het bestand verandert."""
+    pad = os.path.abspath(pad)
+    stat = os.stat(pad)
+    sleutel = (stat.st_mtime_ns, stat.st_size, cel_km)
+    with _gedeeld_lock:
+        entry = _gedeeld.get(pad)
+        if entry is None or entry[0] != sleutel:
+            entry = (sleutel, SensorRegister.uit_csv(pad, cel_km))
+            _gedeeld[pad] = entry
+        return entry[1]
@@ -0,0 +1,147 @@
+"""
+Gedeelde toegang tot de sensornet nina_events data voor alle tabbladen.
+
+Er is één geheugencache per proces (gedeeld door alle Streamlit-sessies en
+reruns) en daaronder de parquet-store van SensornetSync op schijf, die een
+herstart van Streamlit overleeft. Beide lagen verlopen na een TTL.
+"""
+import os
+import threading
+import time
+from collections import Counter, namedtuple
+
+import requests
+
+from compacte_tabellen import compact
+from meetpunten import span, tel
+from sensornet_fetch import DEFAULT_FIELDS, DEFAULT_LABELS, DEFAULT_LOCATIONS, DEFAULT_START
+from sensornet_sync import DEFAULT_STORE_DIR, SensornetSync
+
+# Na zoveel seconden wordt de data opnieuw gesynchroniseerd
+DEFAULT_TTL = 15 * 60
+
+SensornetQuery = namedtuple(
+    'SensornetQuery', ['start', 'end', 'labels', 'fields', 'locations'],
+    defaults=[DEFAULT_LABELS, DEFAULT_FIELDS, DEFAULT_LOCATIONS],
+)
+SensornetQuery.__doc__ = 'Events met start <= time < end (epoch seconden) voor de gegeven labels, velden en locaties.'
+
+# _lock beschermt alleen _memory, _stats en _laad_locks; het laden zelf gebeurt onder de lock per query
+_lock = threading.Lock()
+_memory = {}  # query -> (tijdstip van laden, DataFrame)
+_stats = Counter()
+_laad_locks = {}  # query -> Lock, zodat een query maar één keer tegelijk gesynchroniseerd wordt
+
+
+def make_query(start, end, labels=DEFAULT_LABELS, fields=DEFAULT_FIELDS, locations=DEFAULT_LOCATIONS):
+    """Maakt een SensornetQuery met hashbare, genormaliseerde argumenten."""
+    return SensornetQuery(int(start), int(end), tuple(sorted(labels)), tuple(fields), tuple(sorted(locations)))
+
+
+# De periode die het dashboard laat zien: 2025-01-01 t/m 2025-03-23
+DASHBOARD_QUERY = make_query(DEFAULT_START, 1742774400)
+
+
+def store_for(query, store_dir=DEFAULT_STORE_DIR):
+    """De SensornetSync-store in 'store_dir' waarin de events van 'query' staan."""
+    # Eén store per combinatie van labels en locaties, met alle velden
+    name = '-'.join(map(str, query.labels)) + '_' + '-'.join(query.locations)
+    fields = tuple(dict.fromkeys(DEFAULT_FIELDS + tuple(query.fields)))
+    return SensornetSync(os.path.join(store_dir, name), query.labels, fields, query.locations)
+
+
+def _tel(sleutel, aantal=1):
+    with _lock:
+        _stats[sleutel] += aantal
+
+
+def _uit_geheugen(query, ttl):
+    """De events van 'query' uit de geheugencache, of None als ze er niet (meer) in staan. Alleen onder _lock."""
+    entry = _memory.get(query)
+    if entry is None or time.time() - entry[0] >= ttl:
+        return None
+    _stats['memory_hits'] += 1
+    tel('sensornet_geheugen_hits')
+    return entry[1].copy(deep=False)
+
+
+def _load(query, ttl):
+    store = store_for(query)
+    state = store.load_state()
+    # Data van vóór de high-water mark verandert niet meer, die hoeft niet opnieuw gesynchroniseerd
+    up_to_date = state['time'] is not None and (
+        state['time'] >= query.end - 1
+        or (state['last_sync'] is not None and time.time() - state['last_sync'] < ttl)
+    )
+    if up_to_date:
+        _tel('disk_hits')
+        tel('sensornet_disk_hits')
+    else:
+        _tel('misses')
+        tel('sensornet_misses')
+        try:
+            with span('sensornet_sync'):
+                store.sync(query.end)
+        except requests.exceptions.RequestException:
+            _tel('network_errors')
+            tel('sensornet_netwerkfouten')
+            if state['time'] is None:
+                return None  # Geen netwerk en nog geen lokale kopie
+
+    fields = list(dict.fromkeys(('time',) + tuple(query.fields)))
+    with span('sensornet_store_laden'):
+        data = store.load(columns=fields)
+    data = data[(data['time'] >= query.start) & (data['time'] < query.end)].reset_index(drop=True)
+    data = compact(data)
+    _tel('rows_loaded', len(data))
+    tel('sensornet_rijen_geladen', len(data))
+    return data
+
+
+@span('get_events')
+def get_events(query=DASHBOARD_QUERY, ttl=DEFAULT_TTL):
+    """
+    Geeft de events voor 'query' terug als compacte DataFrame (zie
+    compacte_tabellen) met 'time' als int32 epoch-seconden, of None als de API
+    niet bereikbaar is en er nog niets lokaal staat. Gebruik
+    compacte_tabellen.tijden() of kalender() voor datetimes en kalendervelden.
+
+    Het resultaat is een ondiepe kopie van de cache: kolommen toevoegen of
+    vervangen is veilig, waarden in-place aanpassen niet.
+
+    Sessies die tegelijk dezelfde query opvragen wachten op één sync; andere
+    queries en cachehits wachten niet op het netwerk.
+    """
+    with _lock:
+        data = _uit_geheugen(query, ttl)
+        if data is not None:
+            return data
+        laad_lock = _laad_locks.setdefault(query, threading.Lock())
+
+    with laad_lock:
+        # Een andere sessie kan de query geladen hebben terwijl deze wachtte
+        with _lock:
+            data = _uit_geheugen(query, ttl)
+        if data is not None:
+            return data
+
+        data = _load(query, ttl)
+        if data is None:
+            return None
+        with _lock:
+            _memory[query] = (time.time(), data)
+        return data.copy(deep=False)
+
+
+def cache_stats():
+    """Geeft de hit/miss-tellers van de cache terug."""
+    with _lock:
+        stats = dict(_stats)
+        stats['memory_entries'] = len(_memory)
+    return stats
+
+
+def clear_cache():
+    """Leegt de geheugencache (de store op schijf blijft staan)."""
+    with _lock:
+        _memory.clear()
@@ -0,0 +1,255 @@
+import codecs
+import json
+
+import numpy as np
+import pandas as pd
+
+# Kolomtypes voor de velden van de nina_events stream
+INT64_FIELDS = ('id', 'time')
+FLOAT32_FIELDS = (
+    'SEL_dB', 'lasmax_dB', 'distance', 'altitude', 'windspeed', 'winddirection', 'duration', 'label',
+)
+# De SEL-energiewaarden lopen op tot ~1e10, daarvoor is float32 te grof
+FLOAT64_FIELDS = ('SEL', 'SELd', 'SELe', 'SELn', 'SELden')
+CATEGORICAL_FIELDS = (
+    'type', 'callsign', 'operator', 'location_short', 'location_long',
+    'registration', 'icao_type', 'hex_s', 'serial', 'tags',
+)
+
+# Standaard aantal rijen dat per keer naar de kolombuffers wordt overgezet
+DEFAULT_CHUNK_ROWS = 20_000
+# Standaard aantal bytes dat per keer van de response wordt gelezen
+DEFAULT_CHUNK_BYTES = 1 << 16
+
+_WHITESPACE = ' \t\r\n'
+_json_decoder = json.JSONDecoder()
+
+
+class _NumericBuffer:
+    def __init__(self, dtype):
+        self.dtype = dtype
+        self.chunks = []
+
+    def append(self, values):
+        if self.dtype == np.int64:
+            chunk = np.fromiter(values, dtype=np.int64, count=len(values))
+        else:
+            try:
+                chunk = np.array(values, dtype=self.dtype)  # None wordt NaN
+            except (TypeError, ValueError):
+                chunk = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(self.dtype)
+        self.chunks.append(chunk)
+
+    def finish(self):
+        if not self.chunks:
+            return np.empty(0, dtype=self.dtype)
+        return np.concatenate(self.chunks)
+
+
+class _CategoricalBuffer:
+    def __init__(self):
+        self.codes = {}
+        self.chunks = []
+
+    def append(self, values):
+        codes = self.codes
+        chunk = np.fromiter(
+            (-1 if v is None else codes.setdefault(v, len(codes)) for v in values),
+            dtype=np.int32, count=len(values),
+        )
+        self.chunks.append(chunk)
+
+    def finish(self):
+        codes = np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=np.int32)
+        return pd.Categorical.from_codes(codes, categories=list(self.codes))
+
+
+class _ObjectBuffer:
+    def __init__(self):
+        self.chunks = []
+
+    def append(self, values):
+        chunk = np.empty(len(values), dtype=object)
+        chunk[:] = values
+        self.chunks.append(chunk)
+
+    def finish(self):
+        return np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=object)
+
+
+def _make_buffer(field):
+    if field in INT64_FIELDS:
+        return _NumericBuffer(np.int64)
+    if field in FLOAT32_FIELDS:
+        return _NumericBuffer(np.float32)
+    if field in FLOAT64_FIELDS:
+        return _NumericBuffer(np.float64)
+    if field in CATEGORICAL_FIELDS:
+        return _CategoricalBuffer()
+    return _ObjectBuffer()
+
+
+class _TextReader:
+    """Leest JSON-waarden één voor één uit een reeks tekstfragmenten."""
+
+    def __init__(self, text_chunks):
+        self.text_chunks = iter(text_chunks)
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self):
+        if self.eof:
+            return False
+        try:
+            chunk = next(self.text_chunks)
+        except StopIteration:
+            self.eof = True
+            return False
+        # Gooi het al verwerkte deel van de buffer weg
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self, skip=''):
+        """Geeft het eerstvolgende teken na witruimte (en 'skip'-tekens) terug, of None bij het einde."""
+        ignore = _WHITESPACE + skip
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in ignore:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._read_more():
+                return None
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f'Ongeldige JSON: {char!r} verwacht, {found!r} gevonden')
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _json_decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # De waarde loopt door in het volgende fragment
+                if not self._read_more():
+                    raise
+                continue
+            # Een getal aan het einde van de buffer kan nog afgekapt zijn
+            if end == len(self.buf) and isinstance(obj, (int, float)) and self._read_more():
+                continue
+            self.pos = end
+            return obj
+
+
+class StreamingDecoder:
+    """
+    Decodeert een nina_events response in één keer van voor naar achter. De
+    'rows' worden per chunk_rows rijen direct in getypeerde kolombuffers gezet,
+    zodat het geheugengebruik naast het resultaat begrensd blijft door de chunkgrootte.
+    """
+
+    def __init__(self, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.chunk_rows = chunk_rows
+        self.headers = None
+        self.buffers = None
+        # Rijen die binnenkomen voordat 'metadata' bekend is
+        self.early_rows = []
+
+    def _flush(self, rows):
+        if not rows:
+            return
+        if self.headers is None:
+            self.early_rows.extend(rows)
+            return
+        columns = list(zip(*rows))
+        for buffer, values in zip(self.buffers, columns):
+            buffer.append(values)
+
+    def _set_metadata(self, metadata):
+        self.headers = [m['headers'] for m in metadata]
+        self.buffers = [_make_buffer(field) for field in self.headers]
+        early_rows, self.early_rows = self.early_rows, []
+        for i in range(0, len(early_rows), self.chunk_rows):
+            self._flush(early_rows[i:i + self.chunk_rows])
+
+    def _read_rows(self, reader):
+        reader.expect('[')
+        pending = []
+        if reader.peek() == ']':
+            reader.pos += 1
+            return
+        while True:
+            pending.append(reader.value())
+            if len(pending) >= self.chunk_rows:
+                self._flush(pending)
+                pending = []
+            sep = reader.peek()
+            reader.pos += 1
+            if sep == ']':
+                break
+            if sep != ',':
+                raise ValueError(f'Ongeldige JSON in rows: {sep!r}')
+        self._flush(pending)
+
+    def decode(self, text_chunks):
+        reader = _TextReader(text_chunks)
+        reader.expect('{')
+        while True:
+            if reader.peek(',') == '}':
+                break
+            key = reader.value()
+            reader.expect(':')
+            if key == 'rows':
+                self._read_rows(reader)
+            elif key == 'metadata':
+                self._set_metadata(reader.value())
+            else:
+                reader.value()  # Andere sleutels worden overgeslagen
+        if self.headers is None:
+            raise ValueError("Response bevat geen 'metadata'")
+        return pd.DataFrame({field: buffer.finish() for field, buffer in zip(self.headers, self.buffers)})
+
+
+def _iter_text(byte_chunks):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def decode_stream(byte_chunks, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Decodeert een reeks bytes-fragmenten van een stream-response naar een getypeerd DataFrame."""
+    return StreamingDecoder(chunk_rows).decode(_iter_text(byte_chunks))
+
+
+def decode_response(response, chunk_bytes=DEFAULT_CHUNK_BYTES, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Decodeert een requests-response (opgevraagd met stream=True) zonder de hele
+    body in het geheugen te laden. 'time' blijft in epoch seconden (int64).
+    """
+    return decode_stream(response.iter_content(chunk_bytes), chunk_rows)
+
+
+def concat_events(frames):
+    """
+    Plakt event-frames aan elkaar. pd.concat maakt van categorische kolommen met
+    verschillende categorieën gewone kolommen, die worden hier weer categorisch.
+    """
+    frames = [frame for frame in frames if len(frame.columns)]
+    if not frames:
+        return pd.DataFrame()
+    data = pd.concat(frames, ignore_index=True)
+    for col in CATEGORICAL_FIELDS:
+        if col in data.columns and not isinstance(data[col].dtype, pd.CategoricalDtype):
+            data[col] = data[col].astype('category')
+    return data
@@ -0,0 +1,119 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from sensornet_decode import concat_events, decode_response
+
+# Basis-URL van de nina_events stream van sensornet
+STREAM_URL = 'https://sensornet.nl/dataserver3/event/collection/nina_events/stream'
+
+# Standaard begin van de dataset (2025-01-01 00:00:00 UTC)
+DEFAULT_START = 1735689600
+
+DEFAULT_LABELS = (21, 32, 33, 34)
+DEFAULT_LOCATIONS = ('aalsmeer', 'schiphol')
+DEFAULT_FIELDS = (
+    'id', 'time', 'location_short', 'location_long', 'duration',
+    'SEL', 'SELd', 'SELe', 'SELn', 'SELden', 'SEL_dB', 'lasmax_dB',
+    'callsign', 'type', 'altitude', 'distance', 'winddirection', 'windspeed',
+    'label', 'hex_s', 'registration', 'icao_type', 'serial', 'operator', 'tags',
+)
+
+def build_stream_url(start, end, labels=DEFAULT_LABELS, fields=DEFAULT_FIELDS, locations=DEFAULT_LOCATIONS,
+                     base_url=STREAM_URL):
+    """
+    Bouwt de query-URL voor de nina_events stream voor events met
+    start <= time < end (epoch seconden).
+    """
+    params = [
+        ('conditions[0][]', 'time'), ('conditions[0][]', '>='), ('conditions[0][]', int(start)),
+        ('conditions[1][]', 'time'), ('conditions[1][]', '<'), ('conditions[1][]', int(end)),
+        ('conditions[2][]', 'label'), ('conditions[2][]', 'in'),
+    ]
+    params += [('conditions[2][2][]', label) for label in labels]
+    params += [('args[]', location) for location in locations]
+    params += [('fields[]', field) for field in fields]
+    return f'{base_url}?{urlencode(params)}'
+
+
+# Grootte van de tijdshards in seconden
+SHARD_SECONDS = {'day': 86400, 'hour': 3600}
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+
+class ShardFetchError(requests.exceptions.RequestException):
+    """Een shard kon ook na alle retries niet worden opgehaald."""
+
+
+def split_range(start, end, shard='day'):
+    """
+    Splitst [start, end) in aaneengesloten shards die op hele dagen of uren (UTC)
+    beginnen. De eerste en laatste shard kunnen korter zijn.
+    """
+    step = SHARD_SECONDS[shard]
+    start, end = int(start), int(end)
+    shards = []
+    shard_start = start
+    while shard_start < end:
+        shard_end = min((shard_start // step + 1) * step, end)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end
+    return shards
+
+
+class ShardedFetcher:
+    """
+    Haalt een tijdsbereik op in dag- of uurshards, parallel over een gedeelde
+    requests.Session met een connection pool. Mislukte shards worden opnieuw
+    geprobeerd met exponentiële backoff; het resultaat staat op volgorde van tijd.
+    """
+
+    def __init__(self, labels=DEFAULT_LABELS, fields=DEFAULT_FIELDS, locations=DEFAULT_LOCATIONS,
+                 shard='day', max_workers=DEFAULT_MAX_WORKERS, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, base_url=STREAM_URL, timeout=60, session=None):
+        self.labels = tuple(labels)
+        self.fields = tuple(fields)
+        self.locations = tuple(locations)
+        self.shard = shard
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.base_url = base_url
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            # Eén verbinding per worker, zodat verbindingen hergebruikt worden
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+    def fetch_shard(self, start, end):
+        url = build_stream_url(start, end, self.labels, self.fields, self.locations, self.base_url)
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(url, timeout=self.timeout, stream=True)
+                response.raise_for_status()  # Zorgt ervoor dat een HTTP-fout een uitzondering veroorzaakt
+                return decode_response(response)
+            except (requests.exceptions.RequestException, ValueError) as exc:
+                # ValueError: de verbinding viel weg midden in de body
+                if attempt == self.retries:
+                    raise ShardFetchError(f'Shard {start}-{end} mislukt na {attempt + 1} pogingen: {exc}') from exc
+                time.sleep(self.backoff * 2 ** attempt + random.uniform(0, self.backoff))
+
+    def fetch(self, start, end):
+        """Haalt alle events met start <= time < end op en plakt de shards op volgorde aan elkaar."""
+        shards = split_range(start, end, self.shard)
+        if not shards:
+            return concat_events([])
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(shards))) as pool:
+            # map() geeft de resultaten terug in de volgorde van de shards
+            frames = list(pool.map(lambda shard: self.fetch_shard(*shard), shards))
+        return concat_events(frames)
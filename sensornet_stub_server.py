@@ -0,0 +1,97 @@
+"""
+Lokale stand-in voor de sensornet nina_events stream. De server speelt
+data_klein.csv af in hetzelfde JSON-formaat als de echte API, met instelbare
+vertraging en foutkans, zodat de fetcher offline getest kan worden.
+
+    python sensornet_stub_server.py --port 8765 --latency 0.2 --fail-rate 0.1
+
+Zet daarna base_url='http://127.0.0.1:8765/stream' in ShardedFetcher.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+
+def load_replay_rows(csv_path='data_klein.csv'):
+    """Leest de CSV in als (epoch seconden, records) gesorteerd op tijd."""
+    data = pd.read_csv(csv_path, index_col=0)
+    data['time'] = pd.to_datetime(data['time']).astype('datetime64[s]').astype('int64')
+    data = data.sort_values('time', kind='stable').reset_index(drop=True)
+    data = data.astype(object).where(data.notna(), None)
+    return data['time'].to_numpy(np.int64), data
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # Wordt per server ingevuld door make_stub_server()
+    times = None
+    data = None
+    latency = 0.0
+    fail_rate = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            self.send_error(503, 'Gesimuleerde storing')
+            return
+
+        query = parse_qs(urlparse(self.path).query)
+        start = int(query['conditions[0][]'][2])
+        end = int(query['conditions[1][]'][2])
+        fields = query.get('fields[]', list(self.data.columns))
+
+        lo, hi = np.searchsorted(self.times, [start, end])
+        window = self.data.iloc[lo:hi]
+        columns = [window[field].tolist() if field in window.columns else [None] * len(window)
+                   for field in fields]
+        body = json.dumps({
+            'metadata': [{'headers': field} for field in fields],
+            'rows': [list(row) for row in zip(*columns)] if columns else [],
+        }).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Geen log-regel per request
+
+
+def make_stub_server(csv_path='data_klein.csv', port=0, latency=0.0, fail_rate=0.0):
+    """Maakt een (nog niet gestarte) stub-server. Met port=0 kiest het OS een vrije poort."""
+    times, data = load_replay_rows(csv_path)
+    handler = type('StubHandler', (_StubHandler,), {
+        'times': times, 'data': data, 'latency': latency, 'fail_rate': fail_rate,
+    })
+    return ThreadingHTTPServer(('127.0.0.1', port), handler)
+
+
+def start_stub_server(csv_path='data_klein.csv', port=0, latency=0.0, fail_rate=0.0):
+    """
+    Start de stub-server in een achtergrondthread.
+    Geeft (server, base_url) terug; stop hem met server.shutdown().
+    """
+    server = make_stub_server(csv_path, port, latency, fail_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/stream'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', default='data_klein.csv')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Vertraging per request in seconden')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Kans (0-1) op een 503 per request')
+    args = parser.parse_args()
+
+    server = make_stub_server(args.csv, args.port, args.latency, args.fail_rate)
+    print(f'Stub-server draait op http://127.0.0.1:{server.server_address[1]}/stream')
+    server.serve_forever()
@@ -0,0 +1,188 @@
+import json
+import os
+import time
+
+import pandas as pd
+import requests
+
+from sensornet_decode import concat_events
+from sensornet_fetch import DEFAULT_FIELDS, DEFAULT_LABELS, DEFAULT_LOCATIONS, DEFAULT_START, ShardedFetcher
+
+# Map waarin de lokale kopie van de events wordt bewaard
+DEFAULT_STORE_DIR = 'sensornet_store'
+
+# Na zoveel losse part-bestanden worden ze samengevoegd tot één bestand
+COMPACT_AFTER_PARTS = 20
+
+
+class SensornetSync:
+    """
+    Houdt een lokale, kolomgebaseerde (parquet) kopie van de nina_events stream bij.
+
+    De high-water mark (laatste 'time' en 'id') wordt in state.json bewaard, zodat
+    een volgende sync alleen de events ophaalt die daarna zijn binnengekomen.
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, labels=DEFAULT_LABELS, fields=DEFAULT_FIELDS,
+                 locations=DEFAULT_LOCATIONS, start=DEFAULT_START, session=None, fetcher=None):
+        self.store_dir = store_dir
+        self.labels = tuple(labels)
+        # 'id' en 'time' zijn nodig voor de high-water mark
+        self.fields = tuple(dict.fromkeys(('id', 'time') + tuple(fields)))
+        self.locations = tuple(locations)
+        self.start = int(start)
+        self.fetcher = fetcher or ShardedFetcher(self.labels, self.fields, self.locations, session=session)
+        self.state_path = os.path.join(store_dir, 'state.json')
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return {'time': None, 'id': None, 'parts': 0, 'last_sync': None}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)  # Atomisch, zodat een crash de state niet corrumpeert
+
+    def _part_paths(self):
+        if not os.path.isdir(self.store_dir):
+            return []
+        paths = sorted(
+            os.path.join(self.store_dir, name)
+            for name in os.listdir(self.store_dir)
+            if name.startswith('part-') and name.endswith('.parquet')
+        )
+        # Na een compactie die na het vervangen is onderbroken bevat het nieuwe bestand de oude parts al
+        compactie = self.load_state().get('compactie')
+        if compactie and os.path.exists(os.path.join(self.store_dir, compactie['doel'])):
+            paths = [path for path in paths if os.path.basename(path) not in compactie['vervangen']]
+        return paths
+
+    def _rond_compactie_af(self):
+        """Ruimt de resten op van een onderbroken compactie (zie compact)."""
+        state = self.load_state()
+        compactie = state.pop('compactie', None)
+        if compactie is None:
+            return
+        doel = os.path.join(self.store_dir, compactie['doel'])
+        if os.path.exists(doel):
+            resten = [os.path.join(self.store_dir, naam) for naam in compactie['vervangen']]
+        else:
+            resten = [doel + '.tmp']
+        for pad in resten:
+            if os.path.exists(pad):
+                os.remove(pad)
+        self._save_state(state)
+
+    # ------------------------------------------------------------------
+    # Lezen en schrijven
+    # ------------------------------------------------------------------
+    def load(self, columns=None, filters=None):
+        """
+        Leest alle lokaal opgeslagen events in (zonder netwerk). 'filters' gaat
+        door naar pd.read_parquet, bijvoorbeeld [('time', '>=', start), ('time', '<', end)];
+        omdat de parts op tijd gesorteerd zijn worden de andere rijgroepen niet gelezen.
+        """
+        paths = self._part_paths()
+        if not paths:
+            return pd.DataFrame(columns=list(columns or self.fields))
+        return concat_events([pd.read_parquet(path, columns=columns, filters=filters) for path in paths])
+
+    def fetch(self, start, end):
+        """Haalt de events met start <= time < end op van de API, per dag parallel."""
+        return self.fetcher.fetch(start, end)
+
+    def append(self, new_events):
+        """
+        Voegt events toe aan de store. Events op of vóór de high-water mark worden
+        overgeslagen, zodat een overlappende fetch geen dubbele rijen oplevert.
+        Geeft het aantal nieuw opgeslagen events terug.
+        """
+        state = self.load_state()
+        if state['time'] is not None and not new_events.empty:
+            is_new = (new_events['time'] > state['time']) | (
+                (new_events['time'] == state['time']) & (new_events['id'] > state['id'])
+            )
+            new_events = new_events[is_new]
+        if new_events.empty:
+            return 0
+
+        new_events = new_events.sort_values(['time', 'id'], kind='stable')
+        os.makedirs(self.store_dir, exist_ok=True)
+        part_path = os.path.join(self.store_dir, f'part-{state["parts"] + 1:06d}.parquet')
+        new_events.to_parquet(part_path, index=False)
+
+        last = new_events.iloc[-1]
+        state.update(time=int(last['time']), id=int(last['id']), parts=state['parts'] + 1)
+        self._save_state(state)
+
+        if len(self._part_paths()) > COMPACT_AFTER_PARTS:
+            self.compact()
+        return len(new_events)
+
+    def compact(self):
+        """
+        Voegt alle part-bestanden samen tot één gesorteerd bestand.
+
+        Het nieuwe bestand wordt onder een tijdelijke naam geschreven. Daarna
+        komt in de state welke parts het vervangt, en pas dan wordt het op zijn
+        plaats gezet en worden de oude parts verwijderd. Een crash laat zo
+        nooit een half bestand of dubbele rijen achter.
+        """
+        self._rond_compactie_af()
+        paths = self._part_paths()
+        if len(paths) <= 1:
+            return
+        data = self.load().sort_values(['time', 'id'], kind='stable')
+        state = self.load_state()
+        doel = f'part-{state["parts"] + 1:06d}.parquet'
+        target = os.path.join(self.store_dir, doel)
+        # Zonder .parquet-extensie, zodat load() een half geschreven bestand nooit meeleest
+        tmp_path = target + '.tmp'
+        data.to_parquet(tmp_path, index=False)
+        state.update(parts=state['parts'] + 1,
+                     compactie={'doel': doel, 'vervangen': [os.path.basename(path) for path in paths]})
+        self._save_state(state)
+        os.replace(tmp_path, target)
+        self._rond_compactie_af()
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+    def sync(self, end=None):
+        """
+        Haalt alleen de events op die nieuwer zijn dan de high-water mark en voegt
+        ze toe aan de store. Geeft het aantal nieuwe events terug.
+        """
+        end = int(time.time()) if end is None else int(end)
+        state = self.load_state()
+        # Vraag vanaf de laatste 'time' op (inclusief), events met hetzelfde
+        # tijdstip maar een hoger 'id' kunnen later nog binnenkomen
+        start = self.start if state['time'] is None else state['time']
+        if start >= end:
+            return 0
+
+        added = self.append(self.fetch(start, end))
+
+        state = self.load_state()
+        state['last_sync'] = time.time()
+        self._save_state(state)
+        return added
+
+    def load_synced(self, end=None):
+        """
+        Synchroniseert de store en leest hem in. Als het netwerk niet bereikbaar is,
+        wordt de lokale kopie teruggegeven (of None als er nog niets lokaal staat).
+        """
+        try:
+            self.sync(end)
+        except requests.exceptions.RequestException:
+            if not self._part_paths():
+                return None
+        return self.load()
@@ -0,0 +1,206 @@
+"""
+Samenvoegbare streaming-statistieken per groep (bijvoorbeeld per vliegtuigtype).
+
+Per groep worden count, min, max, gemiddelde, M2 (voor de variantie) en een
+histogram-sketch met vaste bakken van 0.1 dB bijgehouden. Het geheugen per groep
+is daardoor constant, onafhankelijk van het aantal events. Twee objecten (van
+verschillende shards of dagen) kunnen exact worden samengevoegd, en kwantielen
+zijn tot op de bakbreedte nauwkeurig.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from aggregaat_kubus import na_high_water_mark
+from meetpunten import span, tel
+from sensornet_sync import DEFAULT_STORE_DIR
+
+# Bereik en bakbreedte van de histogram-sketch in dB
+SKETCH_MIN = 0.0
+SKETCH_MAX = 150.0
+SKETCH_BREEDTE = 0.1
+SKETCH_BAKKEN = int(round((SKETCH_MAX - SKETCH_MIN) / SKETCH_BREEDTE))
+
+_gedeeld = {}
+_gedeeld_lock = threading.Lock()
+
+
+def _lege_arrays(n):
+    return {
+        'count': np.zeros(n, dtype=np.int64),
+        'min': np.full(n, np.inf),
+        'max': np.full(n, -np.inf),
+        'mean': np.zeros(n),
+        'm2': np.zeros(n),
+        'hist': np.zeros((n, SKETCH_BAKKEN), dtype=np.int32),
+    }
+
+
+def _bak(waarden):
+    bakken = np.floor((waarden - SKETCH_MIN) / SKETCH_BREEDTE).astype(np.int64)
+    # Waarden buiten het bereik tellen mee in de eerste of laatste bak
+    return np.clip(bakken, 0, SKETCH_BAKKEN - 1)
+
+
+class GroepsStatistieken:
+    """Streaming-statistieken met kwantielsketch voor elke groep."""
+
+    def __init__(self, groepen=(), arrays=None, tot_tijd=None, tot_id=None):
+        self.groepen = pd.Index(groepen, dtype=object)
+        self.arrays = arrays if arrays is not None else _lege_arrays(len(self.groepen))
+        # High-water mark voor bij_werken()
+        self.tot_tijd = tot_tijd
+        self.tot_id = tot_id
+        self._lock = threading.Lock()
+
+    @classmethod
+    def uit_waarden(cls, groepen, waarden):
+        """Bouwt de statistieken in één gevectoriseerde stap uit groeplabels en meetwaarden."""
+        waarden = np.asarray(waarden, dtype=np.float64)
+        groepen = pd.Series(groepen).astype(object).to_numpy()
+        geldig = ~np.isnan(waarden) & pd.notna(groepen)
+        codes, labels = pd.factorize(groepen[geldig])
+        waarden = waarden[geldig]
+        n = len(labels)
+
+        arrays = _lege_arrays(n)
+        count = np.bincount(codes, minlength=n)
+        som = np.bincount(codes, weights=waarden, minlength=n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, som / count, 0.0)
+        afwijking = waarden - mean[codes]
+        arrays['count'] = count.astype(np.int64)
+        arrays['mean'] = mean
+        arrays['m2'] = np.bincount(codes, weights=afwijking ** 2, minlength=n)
+        np.minimum.at(arrays['min'], codes, waarden)
+        np.maximum.at(arrays['max'], codes, waarden)
+        arrays['hist'] = np.bincount(
+            codes * SKETCH_BAKKEN + _bak(waarden), minlength=n * SKETCH_BAKKEN,
+        ).reshape(n, SKETCH_BAKKEN).astype(np.int32)
+        return cls(labels, arrays)
+
+    def merge(self, other):
+        """Voegt twee statistiekobjecten exact samen (formule van Chan voor gemiddelde en M2)."""
+        groepen = self.groepen.append(other.groepen)
+        arrays = {sleutel: np.concatenate([self.arrays[sleutel], other.arrays[sleutel]])
+                  for sleutel in self.arrays}
+        return _groepeer(groepen, arrays)
+
+    def samenvoegen(self, mapping):
+        """
+        Voegt groepen samen tot grotere groepen, bijvoorbeeld vliegtuigtypes tot
+        passagierscategorieën. 'mapping' is een dict of Series van groep naar nieuwe groep.
+        """
+        nieuwe_groepen = pd.Series(self.groepen, dtype=object).map(mapping)
+        geldig = nieuwe_groepen.notna().to_numpy()
+        arrays = {sleutel: waarden[geldig] for sleutel, waarden in self.arrays.items()}
+        return _groepeer(pd.Index(nieuwe_groepen[geldig], dtype=object), arrays)
+
+    def update(self, groepen, waarden):
+        nieuw = GroepsStatistieken.uit_waarden(groepen, waarden)
+        merged = self.merge(nieuw)
+        self.groepen, self.arrays = merged.groepen, merged.arrays
+
+    def bij_werken(self, events, groep_kolom, waarde_kolom):
+        """Werkt de statistieken bij met de events na de high-water mark."""
+        with self._lock:
+            events, mark = na_high_water_mark(events, self.tot_tijd, self.tot_id)
+            if events.empty:
+                return
+            with span('statistieken_bijwerken', rijen=len(events)):
+                self.update(events[groep_kolom], events[waarde_kolom])
+            tel('statistieken_rijen', len(events))
+            self.tot_tijd, self.tot_id = mark
+
+    def kwantielen(self, qs):
+        """Kwantielen uit de sketch, vorm (aantal groepen, len(qs)). Lineair geïnterpoleerd binnen een bak."""
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        cumulatief = np.cumsum(self.arrays['hist'], axis=1, dtype=np.int64)
+        totaal = cumulatief[:, -1:]
+        doel = qs[None, :] * totaal
+        resultaat = np.empty((len(self.groepen), len(qs)))
+        for i in range(len(self.groepen)):
+            bak = np.searchsorted(cumulatief[i], doel[i], side='left').clip(0, SKETCH_BAKKEN - 1)
+            voor = np.where(bak > 0, cumulatief[i, bak - 1], 0)
+            in_bak = np.maximum(cumulatief[i, bak] - voor, 1)
+            resultaat[i] = SKETCH_MIN + (bak + (doel[i] - voor) / in_bak) * SKETCH_BREEDTE
+        # Binnen het werkelijk waargenomen bereik houden
+        return np.clip(resultaat, self.arrays['min'][:, None], self.arrays['max'][:, None])
+
+    def samenvatting(self, qs=(0.25, 0.5, 0.75, 0.9)):
+        """Tabel met count, min, max, mean, std en de gevraagde kwantielen per groep."""
+        a = self.arrays
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(np.where(a['count'] > 1, a['m2'] / (a['count'] - 1), np.nan))
+        tabel = pd.DataFrame({
+            'groep': self.groepen, 'count': a['count'], 'min': a['min'], 'max': a['max'],
+            'mean': a['mean'], 'std': std,
+        })
+        for q, kolom in zip(qs, self.kwantielen(qs).T):
+            tabel[f'p{round(q * 100)}'] = kolom
+        return tabel
+
+    def box_statistieken(self):
+        """
+        Kwartielen en snorharen voor een boxplot (bijvoorbeeld go.Box met q1/median/q3).
+        De snorharen reiken tot 1.5 keer de interkwartielafstand, begrensd door min en max.
+        """
+        tabel = self.samenvatting((0.25, 0.5, 0.75)).rename(columns={'p25': 'q1', 'p50': 'median', 'p75': 'q3'})
+        iqr = tabel['q3'] - tabel['q1']
+        tabel['lowerfence'] = np.maximum(tabel['q1'] - 1.5 * iqr, tabel['min'])
+        tabel['upperfence'] = np.minimum(tabel['q3'] + 1.5 * iqr, tabel['max'])
+        return tabel
+
+    def opslaan(self, pad):
+        np.savez_compressed(
+            pad, groepen=np.asarray(self.groepen, dtype=str),
+            tot=np.array([str(self.tot_tijd), str(self.tot_id)]), **self.arrays,
+        )
+
+    @classmethod
+    def laden(cls, pad):
+        if not os.path.exists(pad):
+            return cls()
+        with np.load(pad) as f:
+            arrays = {sleutel: f[sleutel] for sleutel in ('count', 'min', 'max', 'mean', 'm2', 'hist')}
+            groepen = f['groepen']
+            tot_tijd, tot_id = f['tot']
+        if tot_tijd == 'None':
+            return cls(groepen, arrays)
+        return cls(groepen, arrays, pd.Timestamp(str(tot_tijd)), int(tot_id))
+
+
+def _groepeer(groepen, arrays):
+    """Telt rijen met hetzelfde groeplabel bij elkaar op."""
+    codes, labels = pd.factorize(groepen)
+    n = len(labels)
+    count = np.bincount(codes, weights=arrays['count'], minlength=n)
+    som = np.bincount(codes, weights=arrays['count'] * arrays['mean'], minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, som / count, 0.0)
+    # M2 van de samengevoegde groep: som van M2 plus de spreiding van de groepsgemiddelden
+    m2 = np.bincount(codes, weights=arrays['m2'] + arrays['count'] * (arrays['mean'] - mean[codes]) ** 2, minlength=n)
+    samengevoegd = _lege_arrays(n)
+    samengevoegd.update(count=count.astype(np.int64), mean=mean, m2=m2)
+    np.minimum.at(samengevoegd['min'], codes, arrays['min'])
+    np.maximum.at(samengevoegd['max'], codes, arrays['max'])
+    np.add.at(samengevoegd['hist'], codes, arrays['hist'])
+    return GroepsStatistieken(labels, samengevoegd)
+
+
+def gedeelde_statistieken(naam, store_dir=DEFAULT_STORE_DIR):
+    """
+    Statistieken die door alle sessies van dit proces worden gedeeld en naast de
+    sync-store op schijf worden bewaard (zie opslaan_gedeeld()).
+    """
+    with _gedeeld_lock:
+        if naam not in _gedeeld:
+            _gedeeld[naam] = GroepsStatistieken.laden(os.path.join(store_dir, f'stats-{naam}.npz'))
+        return _gedeeld[naam]
+
+
+def opslaan_gedeeld(naam, store_dir=DEFAULT_STORE_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    gedeelde_statistieken(naam, store_dir).opslaan(os.path.join(store_dir, f'stats-{naam}.npz'))
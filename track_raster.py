@@ -0,0 +1,104 @@
+"""
+Herbemonstert ADS-B tracks naar een vast tijdraster (standaard 1 s).
+
+De scrapes hebben onregelmatige tussenpozen (16 s, 30 s, soms minuten). Hier
+wordt elke vlucht lineair geïnterpoleerd op rastertijden die voor alle
+vluchten gelijk zijn (veelvouden van 'interval' sinds epoch), zodat
+koppelingen, animaties en footprints op tijd kunnen indexeren.
+
+Alles gebeurt in één keer over de samengevoegde, op (vlucht, tijd) gesorteerde
+puntenreeks, zonder lus per vlucht:
+
+  * een gat groter dan 'max_gat' knipt de track in delen; een raster wordt
+    nooit over een gat heen getrokken,
+  * elk trackpunt krijgt de rastertijden tot het volgende punt; met
+    np.repeat van de waarde en de helling per punt volgt de interpolatie
+    zonder zoekstap.
+"""
+import numpy as np
+import pandas as pd
+
+from meetpunten import span
+
+DEFAULT_INTERVAL = pd.Timedelta(seconds=1)
+# Tussen twee trackpunten die verder uit elkaar liggen wordt niet geïnterpoleerd
+DEFAULT_MAX_GAT = pd.Timedelta(minutes=5)
+RASTER_KOLOMMEN = ('Latitude', 'Longitude', 'Altitude_feet', 'Speed_kts')
+
+
+def _microseconden(tijden):
+    """Datetimes (naïef = UTC) als int64 microseconden sinds epoch."""
+    if tijden.dt.tz is not None:
+        tijden = tijden.dt.tz_convert('UTC').dt.tz_localize(None)
+    return tijden.dt.as_unit('us').to_numpy().astype(np.int64)
+
+
+@span('track_raster')
+def herbemonster(tracks, interval=DEFAULT_INTERVAL, max_gat=DEFAULT_MAX_GAT, kolommen=RASTER_KOLOMMEN,
+                 track_tijd='Time', track_callsign='FlightNumber'):
+    """
+    Tracks op een vast tijdraster, gesorteerd op vlucht en tijd, met kolommen:
+
+        FlightNumber    de vlucht (categorie)
+        Time            rastertijd, in de tijdzone van de invoer
+        deel            volgnummer van het doorlopende stuk track binnen de vlucht;
+                        het wordt hoger na elk gat groter dan 'max_gat'
+        <kolommen>      lineair geïnterpoleerd (dtype van de invoer)
+
+    Rastertijden vóór het eerste of na het laatste punt van een deel komen niet
+    voor. Punten zonder tijd of callsign tellen niet mee; ontbreekt een waarde
+    in een van de kolommen, dan is het geïnterpoleerde resultaat daar NaN.
+    """
+    kolommen = [kolom for kolom in kolommen if kolom in tracks.columns]
+    stap = int(pd.Timedelta(interval).total_seconds() * 1e6)
+    if stap <= 0:
+        raise ValueError(f'interval moet positief zijn, niet {interval!r}')
+    gat = int(pd.Timedelta(max_gat).total_seconds() * 1e6)
+
+    geldig = (tracks[track_tijd].notna() & tracks[track_callsign].notna()).to_numpy()
+    callsign = tracks[track_callsign][geldig]
+    code, vluchten = pd.factorize(callsign.astype(str), sort=True)
+    t = _microseconden(tracks[track_tijd][geldig])
+    volgorde = np.lexsort((t, code))
+    code, t = code[volgorde], t[volgorde]
+    rijen = np.flatnonzero(geldig)[volgorde]
+
+    # Een nieuw deel begint bij elke nieuwe vlucht en na elk te groot gat
+    nieuw_deel = np.ones(len(t), dtype=bool)
+    nieuw_deel[1:] = (code[1:] != code[:-1]) | (t[1:] - t[:-1] > gat)
+    deel = np.cumsum(nieuw_deel) - 1
+    laatste_van_deel = np.ones(len(t), dtype=bool)
+    laatste_van_deel[:-1] = nieuw_deel[1:]
+    deel_begin = np.flatnonzero(nieuw_deel)
+
+    # Elk punt krijgt de rastertijden vanaf zichzelf tot het volgende punt van zijn deel;
+    # het laatste punt van een deel alleen als het precies op het raster ligt
+    eerste = -(-t // stap)
+    aantal = np.where(laatste_van_deel, t % stap == 0, np.append(eerste[1:], 0) - eerste)
+    volgende = np.where(laatste_van_deel, np.arange(len(t)), np.arange(1, len(t) + 1))
+    duur = (t[volgende] - t).astype(np.float64)
+    # Rasterindex = eerste rasterindex van het punt + positie achter dat punt; zonder gat loopt hij door
+    begin = np.cumsum(aantal) - aantal
+    raster_t = (np.repeat(eerste - begin, aantal) + np.arange(aantal.sum())) * stap
+    verstreken = (raster_t - np.repeat(t, aantal)).astype(np.float64)
+
+    # Volgnummer van het deel binnen zijn vlucht
+    deel_code = code[deel_begin]
+    deel_nummer = np.arange(len(deel_begin)) - np.searchsorted(deel_code, deel_code, side='left')
+
+    tijd = pd.to_datetime(raster_t, unit='us')
+    tijdzone = tracks[track_tijd].dt.tz
+    if tijdzone is not None:
+        tijd = tijd.tz_localize('UTC').tz_convert(tijdzone)
+    raster = pd.DataFrame({
+        track_callsign: pd.Categorical.from_codes(np.repeat(code, aantal), categories=vluchten),
+        track_tijd: tijd,
+        'deel': np.repeat(deel_nummer[deel].astype(np.int32), aantal),
+    })
+    for kolom in kolommen:
+        waarden = tracks[kolom].to_numpy(np.float64, na_value=np.nan)[rijen]
+        # Helling per punt naar het volgende punt; 0 voor het laatste punt van een deel
+        helling = np.divide(waarden[volgende] - waarden, duur, out=np.zeros(len(t)), where=duur > 0)
+        geinterpoleerd = np.repeat(waarden, aantal) + np.repeat(helling, aantal) * verstreken
+        raster[kolom] = geinterpoleerd.astype(tracks[kolom].dtype if tracks[kolom].dtype.kind == 'f' else np.float64)
+    return raster
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sensornet_sync import DEFAULT_STORE_DIR
+
+# Capaciteit per vliegtuigtype (passagiers en vracht in ton)
+VLIEGTUIG_CAPACITEIT = {
+    'Boeing 737-800': {'passagiers': 189, 'vracht_ton': 20},
+    'Embraer ERJ 170-200 STD': {'passagiers': 80, 'vracht_ton': 7},
+    'Embraer ERJ190-100STD': {'passagiers': 98, 'vracht_ton': 8},
+    'Boeing 737-700': {'passagiers': 130, 'vracht_ton': 17},
+    'Airbus A320 214': {'passagiers': 180, 'vracht_ton': 20},
+    'Boeing 777-300ER': {'passagiers': 396, 'vracht_ton': 60},
+    'Boeing 737-900': {'passagiers': 220, 'vracht_ton': 25},
+    'Boeing 777-200': {'passagiers': 314, 'vracht_ton': 50},
+    'Airbus A319-111': {'passagiers': 156, 'vracht_ton': 16},
+    'Boeing 787-9': {'passagiers': 296, 'vracht_ton': 45},
+    'Airbus A320 214SL': {'passagiers': 180, 'vracht_ton': 20},
+    'Airbus SAS A330-203': {'passagiers': 277, 'vracht_ton': 45},
+    'Airbus A320 232SL': {'passagiers': 180, 'vracht_ton': 20},
+    'Airbus SAS A330-303': {'passagiers': 277, 'vracht_ton': 45},
+    'Boeing 737-8MAX': {'passagiers': 210, 'vracht_ton': 25},
+    'Airbus A321-232': {'passagiers': 220, 'vracht_ton': 30},
+    'Airbus A380 861': {'passagiers': 555, 'vracht_ton': 80},  # Aantal passagiers kan variëren afhankelijk van de configuratie
+    'Embraer ERJ190-100LR': {'passagiers': 98, 'vracht_ton': 8},
+    'Airbus A320 232': {'passagiers': 180, 'vracht_ton': 20},
+    'Embraer EMB-170 STD': {'passagiers': 70, 'vracht_ton': 7},
+    'Airbus A320-271N': {'passagiers': 180, 'vracht_ton': 20},
+    'Embraer EMB-195 LR': {'passagiers': 120, 'vracht_ton': 10},
+    'Airbus A320-251N': {'passagiers': 180, 'vracht_ton': 20},
+    'Boeing 737NG 958ER/W': {'passagiers': 160, 'vracht_ton': 20},
+    'Airbus A300 B4-622RF': {'passagiers': 266, 'vracht_ton': 40},
+    'Airbus A320 216': {'passagiers': 150, 'vracht_ton': 20},
+    'Airbus A330 323E': {'passagiers': 277, 'vracht_ton': 40},
+    'Airbus A319 112': {'passagiers': 156, 'vracht_ton': 20},
+    'Airbus A350 941': {'passagiers': 315, 'vracht_ton': 60},
+    'Airbus A330 302': {'passagiers': 277, 'vracht_ton': 40},
+    'Airbus A319 131': {'passagiers': 156, 'vracht_ton': 20},
+    'Boeing 787-8 Dreamliner': {'passagiers': 242, 'vracht_ton': 20},
+    'Airbus A330 323X': {'passagiers': 277, 'vracht_ton': 40},
+    'Boeing 737NG 8AS/W': {'passagiers': 160, 'vracht_ton': 20},
+    'Airbus A319 114': {'passagiers': 156, 'vracht_ton': 20},
+    'Boeing 777 3FXER': {'passagiers': 396, 'vracht_ton': 55}
+}
+
+# Grenzen van de passagierscategorieën (tot en met)
+PASSAGIERS_GRENZEN = [-np.inf, 100, 150, 200, 300, np.inf]
+PASSAGIERS_CATEGORIEEN = ['0-100 Passagiers', '101-150 Passagiers', '151-200 Passagiers', '201-300 Passagiers', '301+ Passagiers']
+
+DIMENSIE_KOLOMMEN = [
+    'manufacturer', 'model', 'family', 'variant', 'capaciteit_type',
+    'passagiers', 'vracht_ton', 'passagiers_categorie',
+]
+
+_FAMILY_RE = re.compile(r'([A-Za-z]{0,3}-?\d+)')
+
+# Geheugencache van gebouwde dimensies, per versie van de capaciteitstabel
+_dimensies = {}
+_dimensies_lock = threading.Lock()
+
+
+def normaliseer_type(types):
+    """
+    Maakt vliegtuigtypes vergelijkbaar: kleine letters, zonder spaties en leestekens,
+    zodat 'Embraer ERJ 190-100 STD' en 'Embraer ERJ190-100STD' dezelfde sleutel krijgen.
+    Het werk gebeurt alleen op de unieke waarden; het resultaat is categorisch.
+    """
+    types = pd.Series(types)
+    if isinstance(types.dtype, pd.CategoricalDtype):
+        codes, uniques = types.cat.codes.to_numpy(), types.cat.categories
+    else:
+        codes, uniques = pd.factorize(types)
+    keys = pd.Index(uniques, dtype=object).str.lower().str.replace(r'[^0-9a-z]', '', regex=True)
+    # Verschillende schrijfwijzen kunnen na normaliseren samenvallen
+    key_codes, key_uniques = pd.factorize(keys)
+    new_codes = np.where(codes >= 0, key_codes[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=key_uniques), index=types.index)
+
+
+def passagiers_categorie(passagiers):
+    """Deelt passagiersaantallen in de vaste categorieën in (0-100, 101-150, ..., 301+)."""
+    return pd.cut(pd.Series(passagiers), PASSAGIERS_GRENZEN, labels=PASSAGIERS_CATEGORIEEN)
+
+
+def _splits_type(type_str):
+    words = type_str.split()
+    manufacturer = words[0] if words else None
+    model = words[1] if len(words) > 1 else None
+    variant = ' '.join(words[1:]) or None
+    match = _FAMILY_RE.search(variant or '')
+    # Bijvoorbeeld 'Boeing 737-800' -> 'Boeing 737', 'Airbus SAS A330-303' -> 'Airbus A330'
+    family = f'{manufacturer} {match.group(1)}' if match else None
+    return manufacturer, model, family, variant
+
+
+def _capaciteit_versie(capaciteit):
+    return hashlib.sha1(json.dumps(capaciteit, sort_keys=True).encode()).hexdigest()[:8]
+
+
+def _bouw_dimensie(types, capaciteit):
+    """Bouwt de dimensie voor een lijst unieke typestrings."""
+    dim = pd.DataFrame(
+        [_splits_type(t) for t in types],
+        columns=['manufacturer', 'model', 'family', 'variant'],
+        index=pd.Index(types, name='type', dtype=object),
+    )
+    tabel = pd.DataFrame.from_dict(capaciteit, orient='index')
+    tabel['capaciteit_type'] = tabel.index
+    tabel.index = normaliseer_type(tabel.index.to_series()).astype(object).to_numpy()
+    tabel = tabel[~tabel.index.duplicated()]
+
+    keys = normaliseer_type(dim.index.to_series()).astype(object).to_numpy()
+    gekoppeld = tabel.reindex(keys)
+    dim['capaciteit_type'] = gekoppeld['capaciteit_type'].to_numpy()
+    dim['passagiers'] = gekoppeld['passagiers'].to_numpy(dtype=np.float64)
+    dim['vracht_ton'] = gekoppeld['vracht_ton'].to_numpy(dtype=np.float64)
+    dim['passagiers_categorie'] = passagiers_categorie(dim['passagiers']).to_numpy()
+    return dim
+
+
+def type_dimensie(types, capaciteit=VLIEGTUIG_CAPACITEIT, store_dir=DEFAULT_STORE_DIR):
+    """
+    Geeft de typedimensie terug voor de gegeven typestrings: één rij per uniek
+    type met fabrikant, familie, variant, stoelen, vracht en passagierscategorie.
+
+    De dimensie wordt op schijf bewaard; alleen nieuwe typestrings worden ontleed.
+    """
+    versie = _capaciteit_versie(capaciteit)
+    pad = os.path.join(store_dir, f'type_dimension-{versie}.parquet')
+    types = pd.Index(pd.unique(pd.Series(types).dropna().astype(str)), dtype=object)
+    with _dimensies_lock:
+        dim = _dimensies.get(versie)
+        if dim is None:
+            dim = pd.read_parquet(pad) if os.path.exists(pad) else _bouw_dimensie([], capaciteit)
+
+        nieuw = types.difference(dim.index)
+        if len(nieuw):
+            dim = pd.concat([dim, _bouw_dimensie(list(nieuw), capaciteit)])
+            os.makedirs(store_dir, exist_ok=True)
+            # Atomisch, zodat een ander proces nooit een half geschreven dimensie leest
+            tmp_pad = f'{pad}.{os.getpid()}.tmp'
+            dim.to_parquet(tmp_pad)
+            os.replace(tmp_pad, pad)
+        _dimensies[versie] = dim
+        return dim
+
+
+def koppel_type_dimensie(data, kolommen=DIMENSIE_KOLOMMEN, capaciteit=VLIEGTUIG_CAPACITEIT, type_kolom='type'):
+    """
+    Voegt kolommen uit de typedimensie toe aan 'data'. De koppeling gebeurt via
+    de categoriecode van de typekolom, dus alleen de unieke types worden opgezocht.
+    Tekstkolommen worden categorisch toegevoegd.
+    """
+    types = data[type_kolom]
+    if not isinstance(types.dtype, pd.CategoricalDtype):
+        types = types.astype('category')
+    categories = types.cat.categories.astype(str)
+    codes = types.cat.codes.to_numpy()
+
+    # Rij i van 'dim' hoort bij categoriecode i
+    dim = type_dimensie(categories, capaciteit).reindex(categories)
+    data = data.copy(deep=False)
+    for kolom in kolommen:
+        waarden = dim[kolom]
+        if pd.api.types.is_numeric_dtype(waarden):
+            data[kolom] = np.where(codes >= 0, waarden.to_numpy()[codes], np.nan)
+        else:
+            # Codes van de dimensiekolom doorgeven, zonder per rij strings te maken
+            if isinstance(waarden.dtype, pd.CategoricalDtype):
+                waarde_codes, uniques = waarden.cat.codes.to_numpy(), waarden.cat.categories
+            else:
+                waarde_codes, uniques = pd.factorize(waarden)
+            nieuwe_codes = np.where(codes >= 0, waarde_codes[codes], -1)
+            data[kolom] = pd.Categorical.from_codes(nieuwe_codes, categories=uniques)
+    return data
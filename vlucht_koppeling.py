@@ -0,0 +1,111 @@
+"""
+Koppelt sensor-events (NINA) aan ADS-B trackpunten van dezelfde callsign, voor
+alle callsigns tegelijk.
+
+Beide tabellen worden één keer gesorteerd op tijd, waarna pd.merge_asof per
+callsign het dichtstbijzijnde trackpunt (of het punt ervoor en erna) zoekt.
+Dat is O(n log n) in plaats van een filter en idxmin per vlucht.
+"""
+import numpy as np
+import pandas as pd
+
+from meetpunten import span
+
+# Standaard maximaal tijdsverschil tussen een event en een trackpunt
+DEFAULT_TOLERANTIE = pd.Timedelta(minutes=2)
+
+
+def _sorteer(tabel, tijd_kolom, callsign_kolom):
+    # '_rij' is de positie in de oorspronkelijke tabel, van vóór het wegfilteren van ontbrekende sleutels
+    tabel = tabel.assign(_rij=np.arange(len(tabel)))
+    # merge_asof kan niet met ontbrekende sleutels overweg en wil dezelfde callsign- en tijd-dtype aan beide kanten
+    tabel = tabel[tabel[tijd_kolom].notna() & tabel[callsign_kolom].notna()]
+    tijd = tabel[tijd_kolom]
+    if pd.api.types.is_datetime64_any_dtype(tijd):
+        tijd = tijd.dt.as_unit('us')
+    tabel = tabel.assign(_callsign=tabel[callsign_kolom].astype('str'), _tijd=tijd)
+    return tabel.sort_values('_tijd', kind='stable')
+
+
+@span('koppeling')
+def koppel_events_aan_tracks(events, tracks, tolerantie=DEFAULT_TOLERANTIE, modus='dichtstbij',
+                             event_tijd='time', event_callsign='callsign',
+                             track_tijd='Time', track_callsign='FlightNumber',
+                             track_kolommen=('Latitude', 'Longitude', 'Altitude_feet')):
+    """
+    Koppelt elk event aan de track van zijn callsign.
+
+    De tijdkolommen mogen datetimes, timedeltas of getallen zijn, zolang ze aan
+    beide kanten hetzelfde type hebben. Het resultaat heeft dezelfde rijen en
+    index als 'events'; events zonder trackpunt binnen 'tolerantie', of zonder
+    tijd of callsign, krijgen NaN in de trackkolommen.
+
+    modus='dichtstbij': voegt de trackkolommen van het dichtstbijzijnde punt toe,
+    plus 'track_tijd' en 'tijdsverschil' (track min event).
+
+    modus='omsluitend': voegt de punten direct vóór en na het event toe (suffix
+    '_voor' en '_na') en interpoleert de numerieke trackkolommen lineair naar
+    het moment van het event. Valt het event buiten de track, dan wordt het
+    dichtstbijzijnde van de twee punten gebruikt.
+    """
+    if modus not in ('dichtstbij', 'omsluitend'):
+        raise ValueError(f"Onbekende modus {modus!r}, kies 'dichtstbij' of 'omsluitend'")
+    track_kolommen = [kolom for kolom in track_kolommen if kolom in tracks.columns]
+
+    links = _sorteer(events, event_tijd, event_callsign)
+    rechts = _sorteer(tracks, track_tijd, track_callsign)[['_callsign', '_tijd'] + track_kolommen]
+    rechts = rechts.assign(track_tijd=rechts['_tijd'])
+
+    def asof(richting):
+        return pd.merge_asof(
+            links, rechts, on='_tijd', by='_callsign', direction=richting,
+            tolerance=tolerantie, suffixes=('', '_track'),
+        )
+
+    if modus == 'dichtstbij':
+        resultaat = asof('nearest')
+        resultaat['tijdsverschil'] = resultaat['track_tijd'] - resultaat['_tijd']
+        return _terug_naar_events(resultaat, events)
+
+    voor = asof('backward')
+    na = asof('forward')
+    resultaat = voor.drop(columns=track_kolommen + ['track_tijd'])
+    for kolom in track_kolommen + ['track_tijd']:
+        resultaat[kolom + '_voor'] = voor[kolom].to_numpy()
+        resultaat[kolom + '_na'] = na[kolom].to_numpy()
+
+    # Interpolatiegewicht tussen het punt ervoor (0) en erna (1)
+    t = _als_getal(resultaat['_tijd'])
+    t_voor = _als_getal(resultaat['track_tijd_voor'])
+    t_na = _als_getal(resultaat['track_tijd_na'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gewicht = np.where(t_na > t_voor, (t - t_voor) / (t_na - t_voor), 0.0)
+    gewicht = np.where(np.isnan(t_voor), 1.0, np.where(np.isnan(t_na), 0.0, gewicht))
+    for kolom in track_kolommen:
+        waarde_voor = pd.to_numeric(resultaat[kolom + '_voor'], errors='coerce').to_numpy(dtype=np.float64)
+        waarde_na = pd.to_numeric(resultaat[kolom + '_na'], errors='coerce').to_numpy(dtype=np.float64)
+        resultaat[kolom] = np.where(
+            gewicht <= 0, waarde_voor,
+            np.where(gewicht >= 1, waarde_na, waarde_voor + gewicht * (waarde_na - waarde_voor)),
+        )
+    return _terug_naar_events(resultaat, events)
+
+
+def _terug_naar_events(resultaat, events):
+    """Zet het resultaat terug in de volgorde en index van de events, inclusief de niet gekoppelde."""
+    # Events zonder tijd of callsign deden niet mee aan merge_asof; ze komen terug met NaN in de trackkolommen
+    ontbrekend = np.setdiff1d(np.arange(len(events)), resultaat['_rij'].to_numpy())
+    if len(ontbrekend):
+        resultaat = pd.concat([resultaat, events.iloc[ontbrekend].assign(_rij=ontbrekend)], ignore_index=True)
+    resultaat = resultaat.sort_values('_rij', kind='stable').drop(columns=['_callsign', '_tijd', '_rij'])
+    resultaat.index = events.index
+    return resultaat
+
+
+def _als_getal(tijden):
+    """Tijden als float (seconden voor datetimes en timedeltas), NaN voor ontbrekend."""
+    if pd.api.types.is_datetime64_any_dtype(tijden):
+        tijden = tijden - pd.Timestamp(0, tz=tijden.dt.tz)
+    if pd.api.types.is_timedelta64_dtype(tijden):
+        return tijden.dt.total_seconds().to_numpy(dtype=np.float64)
+    return pd.to_numeric(tijden, errors='coerce').to_numpy(dtype=np.float64)